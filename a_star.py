@@ -1,11 +1,20 @@
 import pygame
 import math
-import heapq
+import os
 import time
-from pygame import gfxdraw
 
-# Initial settings / Configurações iniciais
-pygame.init()
+import numpy as np
+
+import pathfinding
+from anytime import anytime_search
+from heuristics import field_cache
+from hpa import HierarchicalPlanner
+from incremental import DStarLite
+from instrumentation import Instrumentation
+from rendering import DETAIL_MIN_CELL, GridRenderer, ViewportRenderer
+from result_cache import path_cache
+from grid_map import GridMap, WALL, FREE
+from map_io import import_map, save_grid_map
 
 # Dimensions and proportions / Tamanhos e proporções
 SCREEN_WIDTH = 1000
@@ -28,16 +37,30 @@ COLORS = {
     'end': (230, 100, 100),
     'path': (85, 125, 245),
     'visited': (167, 132, 239),
+    'visited_backward': (236, 140, 180),
     'cell_text': (255, 235, 120),
-    'slider': (200, 200, 210)
+    'slider': (200, 200, 210),
+    'jump_point': (255, 170, 60),
+    'cluster_line': (30, 150, 140),
+    'entrance': (30, 150, 140),
+    'terrain': (196, 164, 120)
 }
 
-# Window configuration / Configuração da janela
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Premium A* Visualizer")
+# Display handles, created by init_display() / Recursos de tela, criados por init_display()
+screen = None
+font_small = None
+font_medium = None
+font_large = None
+font_title = None
+renderer = None  # Retained-mode grid renderer / Renderizador de grade em modo retido
+viewport_renderer = None  # Vectorized renderer for large or zoomed grids / Renderizador vetorizado para grades grandes ou com zoom
+active_renderer = None  # Renderer used on the last frame / Renderizador usado no último quadro
 
 # Global variables / Variáveis globais
 current_heuristic = 'euclidean'  # Current heuristic type / Tipo de heurística atual
+current_algorithm = 'astar'  # Search algorithm / Algoritmo de busca
+connectivity = 4  # 4 or 8 neighbors / 4 ou 8 vizinhos
+terrain_brush = False  # Left click paints costly terrain instead of walls / Clique esquerdo pinta terreno caro em vez de paredes
 animation_speed = 0.05  # Animation speed / Velocidade da animação
 show_values = True  # Whether to show cell values / Se deve mostrar valores das células
 show_visited = True  # Whether to show visited cells / Se deve mostrar células visitadas
@@ -45,6 +68,22 @@ dragging_start = False  # If start node is being dragged / Se o nó inicial est
 dragging_end = False  # If end node is being dragged / Se o nó final está sendo arrastado
 is_running = False  # If algorithm is running / Se o algoritmo está executando
 final_path = []  # Stores the final path / Armazena o caminho final
+jump_points = []  # Jump points of the last JPS search / Pontos de salto da última busca JPS
+animation = None  # Running SearchAnimation / SearchAnimation em execução
+planner = None  # D* Lite planner kept between edits / Planejador D* Lite mantido entre edições
+hierarchy = None  # HPA* planner kept between edits / Planejador HPA* mantido entre edições
+entrance_cache = None  # (planner, grid version, entrance array) / (planejador, versão da grade, array de entradas)
+hpa_refinement = 'near_optimal'  # HPA* refinement mode / Modo de refinamento do HPA*
+show_clusters = False  # Whether to show the HPA* cluster overlay / Se deve mostrar os clusters do HPA*
+full_rerun_count = None  # Expansions of a from-scratch A* run / Expansões de um A* do zero
+search_weight = 1.0  # Heuristic weight, 1 is plain A* / Peso da heurística, 1 é o A* comum
+anytime_solutions = []  # Solutions of the last ARA* run / Soluções da última execução do ARA*
+pending_query = None  # Cache key arguments of the running search / Argumentos de cache da busca em execução
+result_source = None  # 'cache' or 'subpath' when served from the cache / 'cache' ou 'subpath' se veio do cache
+direction_counts = None  # (forward, backward) expansions of a bidirectional search / Expansões (ida, volta) de uma busca bidirecional
+search_probe = Instrumentation()  # Counters of the animated search / Contadores da busca animada
+probe_active = False  # Whether search_probe describes the shown search / Se search_probe descreve a busca exibida
+status_message = None  # Notice shown in the statistics panel / Aviso exibido no painel de estatísticas
 g_values = {}  # Stores g values for cells / Armazena valores g das células
 path_length = 0  # Length of final path / Comprimento do caminho final
 visited_count = 0  # Number of visited cells / Número de células visitadas
@@ -53,23 +92,30 @@ visited_count = 0  # Number of visited cells / Número de células visitadas
 GRID_CONFIG = {
     'rows': 20,  # Number of rows / Número de linhas
     'cols': 20,  # Number of columns / Número de colunas
-    'cell_size': min(GRID_AREA_WIDTH // 20, SCREEN_HEIGHT // 20),  # Cell size / Tamanho da célula
-    'offset_x': 0,  # Horizontal offset / Deslocamento horizontal
-    'offset_y': 0  # Vertical offset / Deslocamento vertical
+    'cell_size': min(GRID_AREA_WIDTH // 20, SCREEN_HEIGHT // 20),  # Pixels per cell, fractional below 1 / Pixels por célula, fracionário abaixo de 1
+    'offset_x': 0,  # Horizontal pan in pixels / Deslocamento horizontal em pixels
+    'offset_y': 0  # Vertical pan in pixels / Deslocamento vertical em pixels
 }
+RETAINED_MAX_CELLS = 64 * 64  # Largest grid drawn by GridRenderer / Maior grade desenhada pelo GridRenderer
+MAX_CELL_SIZE = 64  # Zoom limit in pixels per cell / Limite de zoom em pixels por célula
+ZOOM_STEP = 2  # Zoom factor per wheel notch / Fator de zoom por passo da roda
+CLUSTER_SIZE = 5  # Smallest HPA* cluster side in cells / Menor lado do cluster do HPA* em células
+MAX_CLUSTERS_PER_SIDE = 64  # Larger grids get larger clusters / Grades maiores ganham clusters maiores
+LARGE_GRID_CELLS = 256 * 256  # Above this, skip work that would freeze the window / Acima disso, evita trabalho que trava a janela
+SEARCH_WEIGHTS = (1.0, 1.5, 2.0, 3.0, 5.0)  # Weights cycled by W / Pesos alternados por W
+ANYTIME_INITIAL_WEIGHT = 3.0  # Smallest first weight of ARA* / Menor peso inicial do ARA*
+ANYTIME_TIME_LIMIT = 0.05  # Deadline of the tightening ARA* passes, seconds / Prazo das passadas de refinamento do ARA*
+TERRAIN_COST = 5.0  # Cost of cells painted with the terrain brush / Custo das células pintadas com o pincel de terreno
+MAP_FILE = 'saved_map.gmap'  # File used by Save/Load Map / Arquivo usado por Salvar/Carregar Mapa
+STATS_FILE = 'search_stats.json'  # Counters written by the L key / Contadores gravados pela tecla L
+TRACE_FILE = 'search_trace.json'  # Chrome trace written by the L key / Trace do Chrome gravado pela tecla L
 
 # Initialize grid / Inicializa a grid
-grid = [[0 for _ in range(GRID_CONFIG['cols'])] for _ in range(GRID_CONFIG['rows'])]
+grid = GridMap(GRID_CONFIG['rows'], GRID_CONFIG['cols'])
 start_pos = (GRID_CONFIG['rows'] // 5, GRID_CONFIG['cols'] // 5)  # Start position / Posição inicial
 end_pos = (GRID_CONFIG['rows'] - GRID_CONFIG['rows'] // 5 - 1, 
            GRID_CONFIG['cols'] - GRID_CONFIG['cols'] // 5 - 1)  # End position / Posição final
 
-# Fonts / Fontes
-font_small = pygame.font.SysFont('Segoe UI', 14)
-font_medium = pygame.font.SysFont('Segoe UI', 16, bold=True)
-font_large = pygame.font.SysFont('Segoe UI', 20, bold=True)
-font_title = pygame.font.SysFont('Segoe UI', 24, bold=True)
-
 # Heuristic information / Informações das heurísticas
 HEURISTIC_DATA = {
     'manhattan': {
@@ -85,9 +131,33 @@ HEURISTIC_DATA = {
         'formula': "f(n) = g(n) + √((x₁ - x₂)² + (y₁ - y₂)²)",
         'best_for': "Movement in any direction",
         'complexity': "More precise but slightly slower"
+    },
+    'octile': {
+        'name': "Octile",
+        'desc': "Exact cost on an open 8-way grid: straight steps cost 1, diagonal steps √2.",
+        'formula': "f(n) = g(n) + max(Δx, Δy) + (√2 - 1)·min(Δx, Δy)",
+        'best_for': "8-direction movement with diagonal cost √2",
+        'complexity': "Tightest admissible choice for 8-way movement"
+    },
+    'chebyshev': {
+        'name': "Chebyshev",
+        'desc': "King-move distance: the larger coordinate difference. Admissible for 8-way movement.",
+        'formula': "f(n) = g(n) + max(|x₁ - x₂|, |y₁ - y₂|)",
+        'best_for': "8-direction movement",
+        'complexity': "Cheap but looser than octile"
     }
 }
 
+# Algorithm labels / Rótulos dos algoritmos
+ALGORITHM_NAMES = {
+    'astar': "A*",
+    'jps': "JPS, 8-way",
+    'incremental': "D* Lite",
+    'hierarchical': "HPA*",
+    'anytime': "ARA*",
+    'bidirectional': "Bidirectional MM"
+}
+
 class Button:
     """Button class for UI elements / Classe de botão para elementos de UI"""
     def __init__(self, x, y, width, height, text, color=None, hover_color=None):
@@ -162,6 +232,71 @@ class Slider:
             return True
         return False
 
+class SearchAnimation:
+    """Search advanced a few steps per frame / Busca avançada alguns passos por quadro
+    
+    Wraps a pathfinding.iter_search generator. With a delay, one expansion
+    is taken every `delay` seconds; with zero delay or fast-forward, steps
+    run until the frame budget is spent, so the window stays responsive.
+    Envolve um gerador de pathfinding.iter_search. Com atraso, uma expansão
+    ocorre a cada `delay` segundos; sem atraso ou em avanço rápido, os
+    passos rodam até esgotar o orçamento do quadro.
+    """
+    FRAME_BUDGET = 0.012  # Seconds of search per frame / Segundos de busca por quadro
+    
+    def __init__(self, steps, start_delay=1.0):
+        self.steps = steps  # Search generator / Gerador da busca
+        self.views = ({}, None)  # Latest (g_scores, explored) / Últimos (g_scores, explored)
+        self.result = None  # SearchResult once finished / SearchResult ao terminar
+        self.done = False  # Whether the search ended / Se a busca terminou
+        self.paused = False  # Paused state / Estado de pausa
+        self.fast_forward = False  # Ignore the delay / Ignora o atraso
+        self.pending_steps = 0  # Single steps requested while paused / Passos pedidos durante a pausa
+        self.next_step_at = time.perf_counter() + start_delay  # Time of the next step / Hora do próximo passo
+        
+    def step(self):
+        """Take one expansion, False once finished / Faz uma expansão, False ao terminar"""
+        if self.done:
+            return False
+        try:
+            self.views = next(self.steps)
+            return True
+        except StopIteration as stop:
+            self.result = stop.value
+            self.done = True
+            return False
+        
+    def advance(self, delay):
+        """Run the steps due this frame / Executa os passos devidos neste quadro"""
+        now = time.perf_counter()
+        if self.paused:
+            while self.pending_steps > 0 and self.step():
+                self.pending_steps -= 1
+            self.pending_steps = 0
+            return
+        if now < self.next_step_at:
+            return
+        
+        deadline = now + self.FRAME_BUDGET
+        if delay <= 0 or self.fast_forward:
+            while self.step() and time.perf_counter() < deadline:
+                pass
+            self.next_step_at = now
+            return
+        
+        # Do not pile up steps missed while paused / Não acumula passos perdidos durante a pausa
+        self.next_step_at = max(self.next_step_at, now - delay)
+        while self.next_step_at <= now and time.perf_counter() < deadline:
+            if not self.step():
+                return
+            self.next_step_at += delay
+        
+    def cancel(self):
+        """Stop the search without a result / Interrompe a busca sem resultado"""
+        self.steps.close()
+        self.done = True
+        self.result = None
+
 # Create UI elements / Criação dos elementos da interface
 buttons = [
     Button(GRID_AREA_WIDTH + 30, 40, 340, 45, "Start Search (Space)"),
@@ -170,20 +305,96 @@ buttons = [
     Button(GRID_AREA_WIDTH + 210, 220, 160, 40, "Euclidean (E)", 
            (180, 120, 80), (200, 140, 100)),
     Button(GRID_AREA_WIDTH + 30, 270, 340, 40, "Reset (R)"),
-    Button(GRID_AREA_WIDTH + 30, 320, 340, 40, "Clear Grid"),
+    Button(GRID_AREA_WIDTH + 30, 320, 108, 40, "Clear Grid"),
+    Button(GRID_AREA_WIDTH + 146, 320, 108, 40, "Save Map"),
+    Button(GRID_AREA_WIDTH + 262, 320, 108, 40, "Load Map"),
 ]
 
 grid_size_buttons = [
-    Button(GRID_AREA_WIDTH + 30, 105, 100, 35, "20x20"),
-    Button(GRID_AREA_WIDTH + 140, 105, 100, 35, "30x30"),
-    Button(GRID_AREA_WIDTH + 250, 105, 100, 35, "40x40")
+    Button(GRID_AREA_WIDTH + 30, 105, 75, 35, "20x20"),
+    Button(GRID_AREA_WIDTH + 113, 105, 75, 35, "30x30"),
+    Button(GRID_AREA_WIDTH + 196, 105, 75, 35, "40x40"),
+    Button(GRID_AREA_WIDTH + 279, 105, 91, 35, "2000x2000")
 ]
 
-speed_slider = Slider(GRID_AREA_WIDTH + 35, 160, 250, 20, 0.01, 0.5, 0.05)
+speed_slider = Slider(GRID_AREA_WIDTH + 35, 160, 250, 20, 0.0, 0.5, 0.05)
+
+def init_display():
+    """Start pygame, open the window and load fonts / Inicia o pygame, abre a janela e carrega fontes"""
+    global screen, font_small, font_medium, font_large, font_title, renderer, viewport_renderer
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Premium A* Visualizer")
+
+    font_small = pygame.font.SysFont('Segoe UI', 14)
+    font_medium = pygame.font.SysFont('Segoe UI', 16, bold=True)
+    font_large = pygame.font.SysFont('Segoe UI', 20, bold=True)
+    font_title = pygame.font.SysFont('Segoe UI', 24, bold=True)
+    
+    renderer = GridRenderer(screen, COLORS, font_small)
+    viewport_renderer = ViewportRenderer(screen, COLORS, font_small, (0, 0, GRID_AREA_WIDTH, SCREEN_HEIGHT))
+
+def fit_cell_size(rows, cols):
+    """Cell size showing the whole grid / Tamanho de célula que mostra a grade inteira
+    
+    Whole pixels while cells are at least one pixel wide, a fraction below
+    that, so large grids never get a zero cell size.
+    Pixels inteiros enquanto as células têm ao menos um pixel, uma fração
+    abaixo disso, para que grades grandes nunca tenham tamanho zero.
+    """
+    fit = min(GRID_AREA_WIDTH / cols, SCREEN_HEIGHT / rows)
+    return math.floor(fit) if fit >= 1 else fit
+
+def is_default_view():
+    """Whether the view shows the whole grid unpanned / Se a visão mostra a grade inteira sem deslocamento"""
+    return (GRID_CONFIG['cell_size'] == fit_cell_size(GRID_CONFIG['rows'], GRID_CONFIG['cols'])
+            and GRID_CONFIG['offset_x'] == 0 and GRID_CONFIG['offset_y'] == 0)
+
+def reset_view():
+    """Show the whole grid / Mostra a grade inteira"""
+    GRID_CONFIG['cell_size'] = fit_cell_size(GRID_CONFIG['rows'], GRID_CONFIG['cols'])
+    GRID_CONFIG['offset_x'] = 0
+    GRID_CONFIG['offset_y'] = 0
+
+def pan_view(d_x, d_y):
+    """Move the view, keeping part of the grid on screen / Move a visão, mantendo parte da grade na tela"""
+    cell_size = GRID_CONFIG['cell_size']
+    width = GRID_CONFIG['cols'] * cell_size
+    height = GRID_CONFIG['rows'] * cell_size
+    GRID_CONFIG['offset_x'] = min(max(GRID_CONFIG['offset_x'] + d_x, GRID_AREA_WIDTH // 2 - width), GRID_AREA_WIDTH // 2)
+    GRID_CONFIG['offset_y'] = min(max(GRID_CONFIG['offset_y'] + d_y, SCREEN_HEIGHT // 2 - height), SCREEN_HEIGHT // 2)
+
+def zoom_view(factor, anchor):
+    """Zoom around a screen point / Aplica zoom ao redor de um ponto da tela"""
+    old_size = GRID_CONFIG['cell_size']
+    fit = fit_cell_size(GRID_CONFIG['rows'], GRID_CONFIG['cols'])
+    new_size = min(max(old_size * factor, fit), max(MAX_CELL_SIZE, fit))
+    if new_size >= 1:
+        new_size = round(new_size)
+    if new_size == fit:
+        reset_view()
+        return
+    # Keep the point under the anchor in place / Mantém fixo o ponto sob a âncora
+    scale = new_size / old_size
+    GRID_CONFIG['cell_size'] = new_size
+    GRID_CONFIG['offset_x'] = round(anchor[0] - (anchor[0] - GRID_CONFIG['offset_x']) * scale)
+    GRID_CONFIG['offset_y'] = round(anchor[1] - (anchor[1] - GRID_CONFIG['offset_y']) * scale)
+    pan_view(0, 0)
+
+def cell_at(position):
+    """Grid cell under the mouse, or None / Célula sob o mouse, ou None"""
+    cell_size = GRID_CONFIG['cell_size']
+    row = math.floor((position[1] - GRID_CONFIG['offset_y']) / cell_size)
+    col = math.floor((position[0] - GRID_CONFIG['offset_x']) / cell_size)
+    if 0 <= row < GRID_CONFIG['rows'] and 0 <= col < GRID_CONFIG['cols']:
+        return row, col
+    return None
 
 def reset_grid(rows=None, cols=None):
     """Reset grid to initial state / Reinicia a grade para o estado inicial"""
-    global GRID_CONFIG, grid, start_pos, end_pos, is_running, final_path, path_length, visited_count
+    global GRID_CONFIG, grid, start_pos, end_pos, is_running, final_path, jump_points, path_length, visited_count
+    global planner, hierarchy, full_rerun_count, anytime_solutions, result_source, probe_active, status_message
     
     is_running = False
     rows = rows or GRID_CONFIG['rows']
@@ -192,117 +403,377 @@ def reset_grid(rows=None, cols=None):
     GRID_CONFIG = {
         'rows': rows,
         'cols': cols,
-        'cell_size': min(GRID_AREA_WIDTH // cols, SCREEN_HEIGHT // rows),
+        'cell_size': fit_cell_size(rows, cols),
         'offset_x': 0,
         'offset_y': 0
     }
     
-    grid = [[0 for _ in range(cols)] for _ in range(rows)]
+    grid = GridMap(rows, cols)
     start_pos = (rows // 5, cols // 5)
     end_pos = (rows - rows // 5 - 1, cols - cols // 5 - 1)
     final_path = []
+    jump_points = []
     path_length = 0
     visited_count = 0
+    planner = None
+    hierarchy = None
+    full_rerun_count = None
+    anytime_solutions = []
+    result_source = None
+    probe_active = False
+    status_message = None
 
-def calculate_heuristic(point_a, point_b, h_type):
-    """Calculate heuristic value between two points / Calcula valor heurístico entre dois pontos"""
-    x1, y1 = point_a
-    x2, y2 = point_b
+def save_map(path=MAP_FILE):
+    """Write the grid and endpoints to a .gmap file / Grava a grade e os extremos num arquivo .gmap"""
+    save_grid_map(grid, path, start_pos, end_pos)
+
+def load_map(path=MAP_FILE):
+    """Replace the grid with a map file / Substitui a grade por um arquivo de mapa
+    
+    Accepts every format of map_io.import_map; .gmap files are
+    memory-mapped copy-on-write, so painting never changes the file.
+    Aceita todos os formatos de map_io.import_map; arquivos .gmap são
+    mapeados em memória sem alterar o arquivo ao pintar.
+    """
+    global grid, start_pos, end_pos
     
-    if h_type == 'manhattan':
-        return abs(x1 - x2) + abs(y1 - y2)
-    return math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
+    new_grid, start, end = import_map(path)
+    reset_grid(new_grid.rows, new_grid.cols)
+    grid = new_grid
+    if start is not None:
+        start_pos = start
+    if end is not None:
+        end_pos = end
 
-def find_path(start, end, heuristic_type):
-    """Find path using A* algorithm / Encontra caminho usando algoritmo A*"""
-    global is_running, final_path, g_values, path_length, visited_count
+def report_load_error(path, error):
+    """Show why a map could not be loaded / Mostra por que um mapa não pôde ser carregado"""
+    global status_message
     
-    open_nodes = []
-    heapq.heappush(open_nodes, (0, start))
+    reason = error.strerror if isinstance(error, OSError) and error.strerror else str(error).split(': ')[-1]
+    status_message = f"Could not load {os.path.basename(path)}: {reason}"
+
+def set_cell(row, col, value):
+    """Change one grid cell and tell the planner / Altera uma célula e avisa o planejador"""
+    if grid.get(row, col) == value:
+        return
+    grid.set(row, col, value)
+    if planner is not None:
+        planner.update_cells([(row, col)])
+    if hierarchy is not None:
+        hierarchy.update_cells([(row, col)])
+
+def set_terrain(row, col, cost):
+    """Change the traversal cost of a free cell / Altera o custo de travessia de uma célula livre"""
+    set_cell(row, col, FREE)
+    if grid.get_cost(row, col) != cost:
+        grid.set_cost(row, col, cost)
+        if planner is not None:
+            planner.update_cells([(row, col)])
+        if hierarchy is not None:
+            hierarchy.update_cells([(row, col)])
+
+def count_full_rerun(start, end, heuristic_type):
+    """Expansions of a from-scratch A*, None on large grids / Expansões de um A* do zero, None em grades grandes
     
-    path_origin = {}
-    g_scores = {(row, col): float('inf') for row in range(GRID_CONFIG['rows']) for col in range(GRID_CONFIG['cols'])}
-    g_scores[start] = 0
+    The rerun is synchronous, so it is skipped where it would freeze the
+    window. A busca é síncrona e é pulada onde travaria a janela.
+    """
+    if grid.size > LARGE_GRID_CELLS:
+        return None
+    return pathfinding.find_path(grid, start, end, heuristic_type, connectivity=connectivity).visited_count
+
+def run_incremental_search(start, end, heuristic_type):
+    """Start repairing the D* Lite plan; the main loop runs it / Inicia o reparo do plano D* Lite; o laço principal o executa"""
+    global planner, final_path, jump_points, path_length, visited_count, full_rerun_count, is_running, animation
     
-    f_scores = {(row, col): float('inf') for row in range(GRID_CONFIG['rows']) for col in range(GRID_CONFIG['cols'])}
-    f_scores[start] = calculate_heuristic(start, end, heuristic_type)
+    if planner is None or planner.heuristic_type != heuristic_type or planner.connectivity != connectivity:
+        planner = DStarLite(grid, start, end, heuristic_type, connectivity)
+    else:
+        planner.set_goal(end)
+        planner.move_start(start)
     
-    explored = set()
+    final_path = []
+    jump_points = []
     path_length = 0
     visited_count = 0
+    full_rerun_count = None
     is_running = True
+    animation = SearchAnimation(incremental_steps(start, end, heuristic_type), start_delay=0.0)
+    animation.fast_forward = True
 
-    draw_interface(g_scores, None, path_length, visited_count)
-    pygame.display.flip()
-    time.sleep(1)
+def incremental_steps(start, end, heuristic_type):
+    """D* Lite repair as animation steps / Reparo do D* Lite como passos de animação
+    
+    Shows the expansion count in the note row while the repair runs, then
+    compares it with a full rerun. Mostra as expansões na linha de nota
+    durante o reparo e depois compara com uma nova busca.
+    """
+    global status_message, full_rerun_count
+    
+    steps = planner.iter_compute_path()
+    while True:
+        try:
+            expansions = next(steps)
+        except StopIteration as stop:
+            result = stop.value
+            break
+        status_message = f"D* Lite repair: {expansions:,} expansions"
+        yield {}, None
+    status_message = None
+    full_rerun_count = count_full_rerun(start, end, heuristic_type)
+    return result
 
-    while open_nodes and is_running:
-        _, current = heapq.heappop(open_nodes)
-        
-        if current == end:
-            path = []
-            while current in path_origin:
-                path.append(current)
-                current = path_origin[current]
-            final_path = path[::-1]
-            path_length = len(final_path)
-            is_running = False
-            return
-        
-        explored.add(current)
-        visited_count = len(explored)
-        if show_visited:
-            draw_interface(g_scores, explored, path_length, visited_count)
-            pygame.display.flip()
-            time.sleep(animation_speed)
-        
-        x, y = current
-        for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-            neighbor = (x + dx, y + dy)
-            
-            if (0 <= neighbor[0] < GRID_CONFIG['rows'] and 
-                0 <= neighbor[1] < GRID_CONFIG['cols'] and 
-                grid[neighbor[0]][neighbor[1]] != 1):
-                
-                tentative_g = g_scores[current] + 1
-                
-                if tentative_g < g_scores[neighbor]:
-                    path_origin[neighbor] = current
-                    g_scores[neighbor] = tentative_g
-                    f_scores[neighbor] = tentative_g + calculate_heuristic(neighbor, end, heuristic_type)
-                    heapq.heappush(open_nodes, (f_scores[neighbor], neighbor))
+def get_hierarchy(heuristic_type):
+    """HPA* planner for the current grid / Planejador HPA* da grade atual
+    
+    Large grids get larger clusters, built by queries as they reach them
+    (see hierarchical_steps) instead of up front. Grades grandes ganham
+    clusters maiores, montados pelas consultas conforme as alcançam.
+    """
+    global hierarchy
+    
+    if hierarchy is None or hierarchy.heuristic_type != heuristic_type or hierarchy.connectivity != connectivity:
+        cluster_size = max(CLUSTER_SIZE, -(-max(grid.rows, grid.cols) // MAX_CLUSTERS_PER_SIDE))
+        hierarchy = HierarchicalPlanner(grid, cluster_size, heuristic_type, connectivity,
+                                        precompute=grid.size <= LARGE_GRID_CELLS)
+    hierarchy.refinement = hpa_refinement
+    return hierarchy
+
+def run_hierarchical_search(start, end, heuristic_type):
+    """Start an HPA* query; the main loop runs it / Inicia uma consulta HPA*; o laço principal a executa"""
+    global final_path, jump_points, path_length, visited_count, full_rerun_count, is_running, animation
     
-    is_running = False
     final_path = []
+    jump_points = []
     path_length = 0
+    visited_count = 0
+    full_rerun_count = None
+    is_running = True
+    animation = SearchAnimation(hierarchical_steps(get_hierarchy(heuristic_type), start, end, heuristic_type),
+                                start_delay=0.0)
+    animation.fast_forward = True
+
+def hierarchical_steps(hpa_planner, start, end, heuristic_type):
+    """HPA* query as animation steps / Consulta HPA* como passos de animação
+    
+    Clusters the query reaches are built on the way, one local search per
+    step, and the count of built clusters is shown in the note row.
+    Os clusters alcançados são montados no caminho, e a contagem aparece
+    na linha de nota.
+    """
+    global status_message, full_rerun_count
+    
+    total = hpa_planner.cluster_rows * hpa_planner.cluster_cols
+    steps = hpa_planner.iter_find_path(start, end)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            result = stop.value
+            break
+        status_message = f"HPA* query: {len(hpa_planner.intra):,}/{total:,} clusters built"
+        yield {}, None
+    status_message = None
+    full_rerun_count = count_full_rerun(start, end, heuristic_type)
+    return result
+
+def run_anytime_search(start, end, heuristic_type):
+    """Improve a path with ARA* until the deadline / Melhora um caminho com ARA* até o prazo"""
+    global final_path, jump_points, path_length, visited_count, full_rerun_count, anytime_solutions
+    
+    anytime_solutions = anytime_search(grid, start, end, heuristic_type, ANYTIME_TIME_LIMIT,
+                                       max(search_weight, ANYTIME_INITIAL_WEIGHT), connectivity=connectivity)
+    full_rerun_count = count_full_rerun(start, end, heuristic_type)
+    
+    best = anytime_solutions[-1] if anytime_solutions else None
+    final_path = best.path[1:] if best else []
+    jump_points = []
+    path_length = best.path_length if best else 0
+    visited_count = best.total_expansions if best else 0
+
+def find_path(start, end, heuristic_type):
+    """Start a search; the main loop animates it / Inicia uma busca; o laço principal a anima"""
+    global is_running, final_path, jump_points, path_length, visited_count, full_rerun_count, animation
+    global anytime_solutions, pending_query, result_source, direction_counts, probe_active, status_message
+    
+    anytime_solutions = []
+    result_source = None
+    direction_counts = None
+    probe_active = False
+    status_message = None
+    if current_algorithm == 'anytime':
+        run_anytime_search(start, end, heuristic_type)
+        return
+    if current_algorithm == 'incremental':
+        run_incremental_search(start, end, heuristic_type)
+        return
+    if current_algorithm == 'hierarchical':
+        run_hierarchical_search(start, end, heuristic_type)
+        return
+    
+    full_rerun_count = None
+    if current_algorithm == 'jps' and grid.costs is not None:
+        final_path = []
+        jump_points = []
+        path_length = 0
+        visited_count = 0
+        status_message = "JPS needs uniform costs: clear terrain or use A*"
+        return
+    weight = search_weight if current_algorithm in ('astar', 'jps') else 1
+    pending_query = (start, end, heuristic_type, current_algorithm, connectivity, weight)
+    cached = path_cache.lookup(grid, *pending_query)
+    if cached is not None:
+        pending_query = None
+        finish_search(cached)
+        return
+    
+    final_path = []
+    jump_points = []
+    path_length = 0
+    visited_count = 0
+    is_running = True
+
+    search_probe.reset()
+    h_field = search_probe.field(field_cache.get)(grid.rows, grid.cols, end, heuristic_type)
+    probe_active = True
+    steps = pathfinding.iter_search(grid, start, end, heuristic_type, algorithm=current_algorithm,
+                                    connectivity=connectivity, h_field=h_field, weight=weight,
+                                    instrument=search_probe)
+    animation = SearchAnimation(steps, start_delay=1.0 if show_visited else 0.0)
+    animation.fast_forward = not show_visited
+
+def finish_search(result):
+    """Show the outcome of a finished search / Mostra o resultado de uma busca concluída"""
+    global is_running, final_path, jump_points, path_length, visited_count, animation, pending_query
+    global result_source, direction_counts, status_message
+    
+    animation = None
+    is_running = False
+    query, pending_query = pending_query, None
+    if result is None:
+        # Cancelled: drop any progress note / Cancelada: remove a nota de progresso
+        status_message = None
+        return
+    if hasattr(result, 'forward_expansions'):
+        direction_counts = (result.forward_expansions, result.backward_expansions)
+    if query is not None:
+        start, end, heuristic_type, algorithm, connectivity, weight = query
+        result = path_cache.store(grid, start, end, heuristic_type, result, algorithm, connectivity, weight)
+    source = getattr(result, 'source', 'search')
+    result_source = source if source != 'search' else None
+    final_path = result.path[1:]
+    jump_points = getattr(result, 'jump_points', None) or []
+    path_length = result.path_length
+    visited_count = result.visited_count
+
+def visible_entrances(hpa_planner):
+    """HPA* entrances inside the view / Entradas do HPA* dentro da visão
+    
+    The entrance list is rebuilt only when the grid changes, and nothing is
+    returned while cells are too small for markers.
+    A lista de entradas só é refeita quando a grade muda.
+    """
+    global entrance_cache
+    
+    cell_size = GRID_CONFIG['cell_size']
+    if cell_size < DETAIL_MIN_CELL:
+        return ()
+    if entrance_cache is None or entrance_cache[0] is not hpa_planner or entrance_cache[1] != grid.version:
+        nodes = np.fromiter(hpa_planner.inter_edges, np.int64, len(hpa_planner.inter_edges))
+        entrance_cache = (hpa_planner, grid.version, np.stack(np.divmod(nodes, grid.cols), axis=1))
+    cells = entrance_cache[2]
+    first_row = -GRID_CONFIG['offset_y'] / cell_size
+    first_col = -GRID_CONFIG['offset_x'] / cell_size
+    inside = ((cells[:, 0] >= math.floor(first_row)) & (cells[:, 0] < first_row + SCREEN_HEIGHT / cell_size) &
+              (cells[:, 1] >= math.floor(first_col)) & (cells[:, 1] < first_col + GRID_AREA_WIDTH / cell_size))
+    return [tuple(cell) for cell in cells[inside].tolist()]
 
 def draw_grid(g_values, explored=None):
-    """Draw the grid / Desenha a grade"""
-    for row in range(GRID_CONFIG['rows']):
-        for col in range(GRID_CONFIG['cols']):
-            rect = pygame.Rect(
-                col * GRID_CONFIG['cell_size'] + GRID_CONFIG['offset_x'],
-                row * GRID_CONFIG['cell_size'] + GRID_CONFIG['offset_y'],
-                GRID_CONFIG['cell_size'],
-                GRID_CONFIG['cell_size']
-            )
-            
-            if grid[row][col] == 1:
-                pygame.draw.rect(screen, COLORS['wall'], rect)
-            elif (row, col) == start_pos:
-                pygame.draw.rect(screen, COLORS['start'], rect)
-            elif (row, col) == end_pos:
-                pygame.draw.rect(screen, COLORS['end'], rect)
-            elif explored and (row, col) in explored:
-                pygame.draw.rect(screen, COLORS['visited'], rect)
-            else:
-                pygame.draw.rect(screen, COLORS['background'], rect)
-            
-            pygame.draw.rect(screen, COLORS['grid_line'], rect, 1)
-            if show_values and g_values.get((row, col), float('inf')) != float('inf'):
-                value_text = font_small.render(str(g_values[(row, col)]), True, COLORS['cell_text'])
-                screen.blit(value_text, (col * GRID_CONFIG['cell_size'] + 5 + GRID_CONFIG['offset_x'], 
-                                         row * GRID_CONFIG['cell_size'] + 5 + GRID_CONFIG['offset_y']))
+    """Draw the grid, returning changed rectangles / Desenha a grade, retornando os retângulos alterados
+    
+    Small grids in the default view use the retained GridRenderer; large
+    grids and zoomed or panned views use the vectorized ViewportRenderer.
+    Grades pequenas na visão padrão usam o GridRenderer; grades grandes e
+    visões com zoom usam o ViewportRenderer.
+    """
+    global active_renderer
+    
+    layout = (GRID_CONFIG['rows'], GRID_CONFIG['cols'], GRID_CONFIG['cell_size'],
+              GRID_CONFIG['offset_x'], GRID_CONFIG['offset_y'])
+    hpa_planner = get_hierarchy(current_heuristic) if show_clusters else None
+    entrances = visible_entrances(hpa_planner) if show_clusters else ()
+    small = GRID_CONFIG['rows'] * GRID_CONFIG['cols'] <= RETAINED_MAX_CELLS
+    chosen = renderer if small and is_default_view() else viewport_renderer
+    if chosen is not active_renderer:
+        renderer.invalidate()
+        active_renderer = chosen
+    return chosen.render(grid, layout, start_pos, end_pos, g_values, explored,
+                           final_path, jump_points, show_values, entrances,
+                           hpa_planner.cluster_size if show_clusters else None)
+
+def suboptimality_bound():
+    """Guaranteed cost ratio of the shown path / Razão de custo garantida do caminho exibido"""
+    if current_algorithm == 'anytime':
+        return anytime_solutions[-1].bound if anytime_solutions else 1.0
+    if current_algorithm in ('astar', 'jps'):
+        return search_weight
+    return 1.0
+
+def export_search_stats():
+    """Write the last search's counters and trace / Grava os contadores e o trace da última busca"""
+    global status_message
+    
+    if not probe_active:
+        status_message = "No stats to export: run A*, JPS or MM first"
+        return
+    try:
+        search_probe.save_json(STATS_FILE)
+        search_probe.save_chrome_trace(TRACE_FILE)
+    except OSError as error:
+        status_message = f"Could not export stats: {error.strerror}"
+        return
+    status_message = f"Stats saved to {STATS_FILE}"
+
+def draw_stats_overlay(path_length, visited_count):
+    """Live search counters in two columns / Contadores da busca ao vivo em duas colunas"""
+    counters = search_probe.counters if probe_active else {}
+    
+    def count(name):
+        return f"{counters[name]:,}" if name in counters else "-"
+    
+    note = ""
+    if status_message is not None:
+        note = status_message
+    elif full_rerun_count is not None:
+        note = f"Full rerun: {full_rerun_count:,} expansions"
+    elif result_source is not None:
+        note = (f"{'Cached' if result_source == 'cache' else 'Cached subpath'}, "
+                f"{path_cache.hits + path_cache.subpath_hits}/{path_cache.misses} hits/misses")
+    elif direction_counts is not None:
+        note = f"{direction_counts[0]:,} forward / {direction_counts[1]:,} backward expansions"
+    
+    heuristic_ms = search_probe.heuristic_ms if probe_active else None
+    h_time = f"h time: {heuristic_ms:.1f} ms" if heuristic_ms is not None else "h time: -"
+    
+    bound = suboptimality_bound()
+    cells = [
+        f"Visited: {visited_count:,}",
+        f"Path: {path_length if path_length > 0 else 'N/A'}" +
+        (f" (≤{bound:.2f}×)" if path_length > 0 and bound > 1 else ""),
+        f"Pushes: {count('pushes')}",
+        f"Stale pops: {count('stale_pops')}",
+        f"Max open: {count('max_open_size')}",
+        f"Reopened: {count('reopenings')}",
+        f"Neighbor checks: {count('neighbor_checks')}",
+        h_time,
+    ]
+    if note:
+        # The note takes the last row / A nota ocupa a última linha
+        cells = cells[:6]
+        screen.blit(font_small.render(note, True, COLORS['highlight']), (GRID_AREA_WIDTH + 30, 584))
+    for i, cell in enumerate(cells):
+        text = font_small.render(cell, True, COLORS['text'])
+        screen.blit(text, (GRID_AREA_WIDTH + 30 + (i % 2) * 175, 542 + (i // 2) * 14))
 
 def draw_config_panel(path_length, visited_count):
     """Draw configuration panel / Desenha painel de configuração"""
@@ -340,6 +811,10 @@ def draw_config_panel(path_length, visited_count):
     screen.blit(heuristic_name, (GRID_AREA_WIDTH + 30, 380))
     
     desc_lines = [HEURISTIC_DATA[current_heuristic]['desc'][i:i+55] for i in range(0, len(HEURISTIC_DATA[current_heuristic]['desc']), 40)]
+    if anytime_solutions:
+        # ARA* solutions replace the description / Soluções do ARA* substituem a descrição
+        desc_lines = [f"w={solution.weight:.2f}: cost {solution.cost:.1f}, ≤{solution.bound:.2f}× optimal, "
+                      f"{1000 * solution.elapsed:.0f} ms" for solution in anytime_solutions[-3:]]
     for i, line in enumerate(desc_lines[:3]):
         desc_text = font_small.render(line, True, COLORS['text'])
         screen.blit(desc_text, (GRID_AREA_WIDTH + 30, 410 + i * 20))
@@ -347,42 +822,34 @@ def draw_config_panel(path_length, visited_count):
     formula_text = font_medium.render(HEURISTIC_DATA[current_heuristic]['formula'], True, (30, 80, 160))
     screen.blit(formula_text, (GRID_AREA_WIDTH + 30, 480))
     
-    stats_text = font_large.render("Statistics:", True, COLORS['text'])
-    screen.blit(stats_text, (GRID_AREA_WIDTH + 30, 520))
-    
-    stats = [
-        f"Visited cells: {visited_count}",
-        f"Path length: {path_length if path_length > 0 else 'N/A'}"
-    ]
-    
-    for i, stat in enumerate(stats):
-        stat_line = font_medium.render(stat, True, COLORS['text'])
-        screen.blit(stat_line, (GRID_AREA_WIDTH + 30, 550 + i * 20))
+    state = ", paused" if animation is not None and animation.paused else ""
+    if current_algorithm == 'hierarchical':
+        state = ", exact" if hpa_refinement == 'exact' else ", near-optimal"
+    elif current_algorithm in ('astar', 'jps') and search_weight > 1:
+        state += f", w={search_weight:g}"
+    if connectivity == 8 and current_algorithm != 'jps':
+        state += ", 8-way"
+    stats_text = font_medium.render(f"Statistics ({ALGORITHM_NAMES[current_algorithm]}{state}):", True, COLORS['text'])
+    screen.blit(stats_text, (GRID_AREA_WIDTH + 30, 522))
+    draw_stats_overlay(path_length, visited_count)
 
 def draw_interface(g_values, explored=None, path_length=0, visited_count=0):
-    """Draw complete interface / Desenha interface completa"""
-    screen.fill(COLORS['background'])
-    
-    draw_grid(g_values, explored)
-    
-    for cell in final_path:
-        pygame.draw.rect(
-            screen, COLORS['path'],
-            (cell[1] * GRID_CONFIG['cell_size'] + GRID_CONFIG['offset_x'],
-             cell[0] * GRID_CONFIG['cell_size'] + GRID_CONFIG['offset_y'],
-             GRID_CONFIG['cell_size'],
-             GRID_CONFIG['cell_size'])
-        )
-    
+    """Draw complete interface, returning changed rectangles / Desenha a interface, retornando os retângulos alterados"""
+    dirty_rects = draw_grid(g_values, explored)
     draw_config_panel(path_length, visited_count)
+    dirty_rects.append(pygame.Rect(GRID_AREA_WIDTH, 0, CONFIG_AREA_WIDTH, SCREEN_HEIGHT))
+    return dirty_rects
 
 def main():
     """Main function / Função principal"""
     global current_heuristic, animation_speed, start_pos, end_pos
     global show_values, show_visited, dragging_start, dragging_end
-    global grid, final_path, g_values, path_length, visited_count, is_running
+    global grid, final_path, g_values, path_length, visited_count, is_running, current_algorithm, planner
+    global hierarchy, hpa_refinement, show_clusters, search_weight, connectivity, terrain_brush
     
+    init_display()
     running = True
+    panning = False
     clock = pygame.time.Clock()
     
     reset_grid()
@@ -412,18 +879,44 @@ def main():
                     elif "Reset" in button.text and not is_running:
                         reset_grid(GRID_CONFIG['rows'], GRID_CONFIG['cols'])
                     elif "Clear" in button.text and not is_running:
-                        grid = [[0 for _ in range(GRID_CONFIG['cols'])] for _ in range(GRID_CONFIG['rows'])]
+                        grid.clear()
+                        planner = None
+                        hierarchy = None
+                    elif "Save" in button.text and not is_running:
+                        save_map()
+                    elif "Load" in button.text and not is_running:
+                        try:
+                            load_map()
+                        except (OSError, ValueError) as error:
+                            report_load_error(MAP_FILE, error)
+            
+            if event.type == pygame.DROPFILE and not is_running:
+                try:
+                    load_map(event.file)
+                except (OSError, ValueError) as error:
+                    report_load_error(event.file, error)
             
             for button in grid_size_buttons:
                 if button.is_clicked(mouse_pos, event) and not is_running:
                     size = int(button.text.split('x')[0])
                     reset_grid(size, size)
             
-            if 0 <= mouse_pos[0] < GRID_AREA_WIDTH and 0 <= mouse_pos[1] < SCREEN_HEIGHT and not is_running:
-                row = (mouse_pos[1] - GRID_CONFIG['offset_y']) // GRID_CONFIG['cell_size']
-                col = (mouse_pos[0] - GRID_CONFIG['offset_x']) // GRID_CONFIG['cell_size']
+            in_grid_area = 0 <= mouse_pos[0] < GRID_AREA_WIDTH and 0 <= mouse_pos[1] < SCREEN_HEIGHT
+            # The view can move even during a search / A visão pode mudar mesmo durante a busca
+            if event.type == pygame.MOUSEWHEEL and in_grid_area:
+                zoom_view(ZOOM_STEP ** event.y, mouse_pos)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 2 and in_grid_area:
+                panning = True
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 2:
+                panning = False
+            elif event.type == pygame.MOUSEMOTION and panning:
+                pan_view(*event.rel)
+            
+            if in_grid_area and not is_running:
+                cell = cell_at(mouse_pos)
+                row, col = cell if cell is not None else (-1, -1)
                 
-                if event.type == pygame.MOUSEBUTTONDOWN:
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 3):
                     if 0 <= row < GRID_CONFIG['rows'] and 0 <= col < GRID_CONFIG['cols']:
                         if (row, col) == start_pos:
                             dragging_start = True
@@ -441,13 +934,15 @@ def main():
                             start_pos = (row, col)
                         elif dragging_end:
                             end_pos = (row, col)
+                        elif terrain_brush:
+                            set_terrain(row, col, TERRAIN_COST)
                         elif (row, col) not in (start_pos, end_pos):
-                            grid[row][col] = 1
+                            set_cell(row, col, WALL)
                 
                 elif pygame.mouse.get_pressed()[2]:
                     if 0 <= row < GRID_CONFIG['rows'] and 0 <= col < GRID_CONFIG['cols']:
                         if (row, col) not in (start_pos, end_pos):
-                            grid[row][col] = 0
+                            set_terrain(row, col, 1.0)
             
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE and not is_running:
@@ -460,19 +955,74 @@ def main():
                     current_heuristic = 'euclidean'
                     buttons[1].is_active = False
                     buttons[2].is_active = True
+                elif event.key == pygame.K_x and not is_running:
+                    current_heuristic = 'octile'
+                    buttons[1].is_active = False
+                    buttons[2].is_active = False
+                elif event.key == pygame.K_z and not is_running:
+                    current_heuristic = 'chebyshev'
+                    buttons[1].is_active = False
+                    buttons[2].is_active = False
+                elif event.key == pygame.K_d and not is_running:
+                    connectivity = 4 if connectivity == 8 else 8
+                elif event.key == pygame.K_t:
+                    terrain_brush = not terrain_brush
                 elif event.key == pygame.K_r and not is_running:
                     reset_grid(GRID_CONFIG['rows'], GRID_CONFIG['cols'])
+                elif event.key == pygame.K_j and not is_running:
+                    current_algorithm = 'astar' if current_algorithm == 'jps' else 'jps'
+                elif event.key == pygame.K_i and not is_running:
+                    current_algorithm = 'astar' if current_algorithm == 'incremental' else 'incremental'
+                elif event.key == pygame.K_h and not is_running:
+                    current_algorithm = 'astar' if current_algorithm == 'hierarchical' else 'hierarchical'
+                elif event.key == pygame.K_b and not is_running:
+                    current_algorithm = 'astar' if current_algorithm == 'bidirectional' else 'bidirectional'
+                elif event.key == pygame.K_a and not is_running:
+                    current_algorithm = 'astar' if current_algorithm == 'anytime' else 'anytime'
+                elif event.key == pygame.K_w and not is_running:
+                    search_weight = SEARCH_WEIGHTS[(SEARCH_WEIGHTS.index(search_weight) + 1) % len(SEARCH_WEIGHTS)]
+                elif event.key == pygame.K_o and not is_running:
+                    hpa_refinement = 'near_optimal' if hpa_refinement == 'exact' else 'exact'
+                elif event.key == pygame.K_c:
+                    show_clusters = not show_clusters
+                elif event.key == pygame.K_p and animation is not None:
+                    animation.paused = not animation.paused
+                elif event.key in (pygame.K_n, pygame.K_RIGHT) and animation is not None:
+                    animation.paused = True
+                    animation.pending_steps += 1
+                elif event.key == pygame.K_f and animation is not None:
+                    animation.fast_forward = not animation.fast_forward
+                elif event.key == pygame.K_ESCAPE and animation is not None:
+                    animation.cancel()
+                    finish_search(None)
                 elif event.key == pygame.K_v:
                     show_values = not show_values
-                elif event.key == pygame.K_UP and animation_speed > 0.01:
-                    animation_speed = max(0.01, animation_speed - 0.01)
+                elif event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                    zoom_view(ZOOM_STEP, (GRID_AREA_WIDTH // 2, SCREEN_HEIGHT // 2))
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    zoom_view(1 / ZOOM_STEP, (GRID_AREA_WIDTH // 2, SCREEN_HEIGHT // 2))
+                elif event.key == pygame.K_0:
+                    reset_view()
+                elif event.key == pygame.K_l and not is_running:
+                    export_search_stats()
+                elif event.key == pygame.K_UP and animation_speed > 0:
+                    animation_speed = max(0.0, animation_speed - 0.01)
                     speed_slider.value = animation_speed
                 elif event.key == pygame.K_DOWN and animation_speed < 0.5:
                     animation_speed = min(0.5, animation_speed + 0.01)
                     speed_slider.value = animation_speed
         
-        draw_interface(g_values, None, path_length, visited_count)
-        pygame.display.flip()
+        if animation is not None:
+            animation.advance(animation_speed)
+            if animation.done:
+                finish_search(animation.result)
+        
+        if animation is not None:
+            g_scores, explored = animation.views
+            visited_count = len(explored) if explored is not None else 0
+            pygame.display.update(draw_interface(g_scores, explored, path_length, visited_count))
+        else:
+            pygame.display.update(draw_interface(g_values, None, path_length, visited_count))
         clock.tick(60)
 
     pygame.quit()
@@ -0,0 +1,216 @@
+"""Anytime search with ARA* / Busca anytime com ARA*
+
+Anytime Repairing A* (Likhachev, Gordon & Thrun) runs a series of Weighted A*
+searches with a shrinking weight. Each pass reuses the g-values of the
+previous one: only nodes whose cost improved after they were expanded (the
+INCONS list) are requeued, so later passes are much cheaper than a fresh
+search. Every solution comes with a bound on its suboptimality, and the
+search stops at a deadline or once the bound reaches 1 (optimal).
+O ARA* executa uma série de buscas A* ponderadas com peso decrescente,
+reutilizando os valores g da passada anterior. Cada solução vem com um
+limite de subotimalidade, e a busca para num prazo ou quando o limite chega
+a 1 (ótimo).
+
+    for solution in iter_anytime_search(grid, (0, 0), (99, 99), 'octile', connectivity=8):
+        print(solution.weight, solution.cost, solution.bound)
+    solutions = anytime_search(grid, (0, 0), (99, 99), 'octile', time_limit=0.05, connectivity=8)
+"""
+import heapq
+import time
+
+import pathfinding
+from grid_map import WALL
+from pathfinding import INF, MOVES_4, MOVES_8, calculate_heuristic, trace_path
+
+
+class AnytimeSolution:
+    """One solution of an anytime search / Uma solução de uma busca anytime"""
+    def __init__(self, path, cost, weight, bound, visited_count, total_expansions, elapsed):
+        self.path = path  # Cells from start to end / Células do início ao fim
+        self.cost = cost  # Path cost / Custo do caminho
+        self.weight = weight  # Heuristic weight of the pass / Peso da heurística na passada
+        self.bound = bound  # cost <= bound * optimum / custo <= limite * ótimo
+        self.visited_count = visited_count  # Expansions in this pass / Expansões nesta passada
+        self.total_expansions = total_expansions  # Expansions since the start / Expansões desde o início
+        self.elapsed = elapsed  # Seconds since the start / Segundos desde o início
+
+    @property
+    def found(self):
+        """Whether a path was found / Se um caminho foi encontrado"""
+        return bool(self.path)
+
+    @property
+    def path_length(self):
+        """Number of steps in the path / Número de passos do caminho"""
+        return max(len(self.path) - 1, 0)
+
+    @property
+    def optimal(self):
+        """Whether the path is proven optimal / Se o caminho é comprovadamente ótimo"""
+        return self.bound <= 1
+
+
+def iter_anytime_search(grid, start, end, heuristic_type='euclidean', initial_weight=3.0, weight_step=0.5,
+                        deadline=None, connectivity=4, h_field=None, buffers=None):
+    """Yield ever better solutions with ARA* / Produz soluções cada vez melhores com ARA*
+
+    Yields an AnytimeSolution after every pass that reaches the goal. The
+    weight starts at `initial_weight` and drops by `weight_step` per pass
+    down to 1. The first pass always runs to completion; `deadline` is a
+    time.perf_counter() value after which the tightening passes make no
+    further expansions, and the last yielded solution then stands. Nothing
+    is yielded when the goal is unreachable. `h_field` holds precomputed
+    h-values and `buffers` reusable SearchBuffers, as for find_path. Grids
+    with `costs` are searched as weighted terrain (see terrain.py).
+    Produz uma AnytimeSolution após cada passada que alcança o objetivo. O
+    peso começa em `initial_weight` e cai `weight_step` por passada até 1.
+    A primeira passada sempre termina; após `deadline` (valor de
+    time.perf_counter()) as passadas seguintes não fazem mais expansões.
+    """
+    if initial_weight < 1:
+        raise ValueError(f"Weight must be at least 1, got {initial_weight}")
+    if weight_step <= 0:
+        raise ValueError(f"Weight step must be positive, got {weight_step}")
+    if connectivity not in (4, 8):
+        raise ValueError(f"Connectivity must be 4 or 8, got {connectivity}")
+    grid = pathfinding.as_grid_map(grid)
+    rows, cols, cells = grid.rows, grid.cols, grid.cells
+    if h_field is not None:
+        h_field = pathfinding.flat_values(h_field)
+
+    began = time.perf_counter()
+    deadline = INF if deadline is None else deadline
+    buffers = buffers or pathfinding._shared_buffers
+    generation = buffers.begin(grid.size)
+    # g is valid where seen matches; closed marks the current pass only
+    # g vale onde seen coincide; closed marca apenas a passada atual
+    g, parent, seen, closed = buffers.g, buffers.parent, buffers.seen, buffers.closed
+    moves = [(d_row, d_col, d_row * cols + d_col, cost)
+             for d_row, d_col, cost in (MOVES_8 if connectivity == 8 else MOVES_4)]
+    edges = None
+    h_scale = 1.0
+    if grid.costs is not None:
+        from terrain import edge_table
+        table = edge_table(grid, connectivity)
+        edges, h_scale = table.edges, table.min_cost
+
+    def heuristic(index):
+        if h_field is not None:
+            return h_field[index] * h_scale
+        return calculate_heuristic(divmod(index, cols), end, heuristic_type) * h_scale
+
+    def neighbors(current):
+        """(neighbor, step cost) pairs / Pares (vizinho, custo do passo)"""
+        if edges is not None:
+            for delta, move_costs in edges:
+                step_cost = move_costs[current]
+                if step_cost != INF:
+                    yield current + delta, step_cost
+            return
+        x, y = divmod(current, cols)
+        for d_row, d_col, delta, step_cost in moves:
+            row = x + d_row
+            col = y + d_col
+            if row < 0 or row >= rows or col < 0 or col >= cols:
+                continue
+            neighbor = current + delta
+            if cells[neighbor] == WALL:
+                continue
+            # Diagonals may not cut a wall corner / Diagonais não podem cortar o canto de uma parede
+            if d_row and d_col and (cells[current + d_col] == WALL or cells[current + d_row * cols] == WALL):
+                continue
+            yield neighbor, step_cost
+
+    start_index = start[0] * cols + start[1]
+    end_index = end[0] * cols + end[1]
+    g[start_index] = 0
+    parent[start_index] = -1
+    seen[start_index] = generation
+    open_nodes = [start_index]  # Nodes to queue at the next pass / Nós a enfileirar na próxima passada
+    incons = {}  # Nodes improved after their expansion, in order / Nós melhorados após a expansão, em ordem
+    expanded = []  # Nodes closed in the current pass / Nós fechados na passada atual
+    weight = initial_weight
+    total_expansions = 0
+    first_pass = True
+
+    while True:
+        # Reopen last pass's closed cells and rebuild the open list with the new weight
+        # Reabre as células fechadas e reconstrói a lista aberta com o novo peso
+        for node in expanded:
+            closed[node] = 0
+        expanded = []
+        heap = []
+        for node in dict.fromkeys(open_nodes + list(incons)):
+            h_score = heuristic(node)
+            heap.append((g[node] + weight * h_score, h_score, node))
+        heapq.heapify(heap)
+        incons = {}
+
+        expansions = 0
+        timed_out = False
+        while heap:
+            f, _, current = heap[0]
+            if closed[current] == generation:
+                # A cheaper entry of this node was expanded already / Uma entrada mais barata já foi expandida
+                heapq.heappop(heap)
+                continue
+            if seen[end_index] == generation and g[end_index] <= f:
+                break
+            if not first_pass and expansions & 63 == 0 and time.perf_counter() >= deadline:
+                timed_out = True
+                break
+            heapq.heappop(heap)
+            closed[current] = generation
+            expanded.append(current)
+            expansions += 1
+
+            current_g = g[current]
+            for neighbor, step_cost in neighbors(current):
+                tentative_g = current_g + step_cost
+                if seen[neighbor] == generation and tentative_g >= g[neighbor]:
+                    continue
+                g[neighbor] = tentative_g
+                parent[neighbor] = current
+                seen[neighbor] = generation
+                if closed[neighbor] == generation:
+                    incons[neighbor] = None
+                else:
+                    h_score = heuristic(neighbor)
+                    heapq.heappush(heap, (tentative_g + weight * h_score, h_score, neighbor))
+
+        total_expansions += expansions
+        first_pass = False
+        if timed_out or seen[end_index] != generation:
+            return
+
+        # Bound from the lowest f among open and inconsistent nodes / Limite pelo menor f entre abertos e inconsistentes
+        open_nodes = [node for node in dict.fromkeys(node for _, _, node in heap) if closed[node] != generation]
+        lowest_f = min((g[node] + heuristic(node) for node in open_nodes + list(incons)), default=INF)
+        cost = g[end_index]
+        bound = max(min(weight, cost / lowest_f), 1.0) if lowest_f > 0 else 1.0
+        path = trace_path(parent, start_index, end_index, cols)
+        yield AnytimeSolution(path, cost, weight, bound, expansions, total_expansions,
+                              time.perf_counter() - began)
+        if bound <= 1 or weight <= 1:
+            return
+        weight = max(1.0, min(weight - weight_step, bound))
+
+
+def anytime_search(grid, start, end, heuristic_type='euclidean', time_limit=0.1, initial_weight=3.0,
+                   weight_step=0.5, connectivity=4, h_field=None, on_solution=None, buffers=None):
+    """Run ARA* until a time limit / Executa o ARA* até um limite de tempo
+
+    Returns the list of AnytimeSolutions found within `time_limit` seconds,
+    best last, and at least the first one whenever the goal is reachable; `on_solution`, if given, is called with each one as it
+    arrives. Other arguments are as for iter_anytime_search.
+    Retorna a lista de AnytimeSolutions encontradas em `time_limit`
+    segundos, a melhor por último; `on_solution` é chamado a cada uma.
+    """
+    deadline = time.perf_counter() + time_limit
+    solutions = []
+    for solution in iter_anytime_search(grid, start, end, heuristic_type, initial_weight, weight_step,
+                                        deadline, connectivity, h_field, buffers):
+        solutions.append(solution)
+        if on_solution is not None:
+            on_solution(solution)
+    return solutions
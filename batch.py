@@ -0,0 +1,164 @@
+"""Batched pathfinding over a process pool / Busca de caminhos em lote com pool de processos
+
+The grid, with its per-cell costs if it has any, is copied once into a
+shared memory block that every worker maps read-only, so queries carry only
+their endpoints. Results are streamed back as they finish and the batch
+keeps throughput and latency statistics.
+A grade, com seus custos por célula, é copiada uma vez para um bloco de
+memória compartilhada lido por todos os processos, então as consultas levam apenas seus extremos. Os
+resultados chegam conforme terminam e o lote mantém estatísticas.
+
+    batch = PathBatch(grid, [((0, 0), (99, 99)), ((5, 5), (80, 10))], algorithm='jps')
+    for result in batch:
+        print(result.index, result.cost)
+    print(batch.stats.summary())
+"""
+import math
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import pathfinding
+from grid_map import GridMap
+
+# Per-worker state set by _init_worker / Estado de cada processo definido por _init_worker
+_worker_memory = None
+_worker_grid = None
+_worker_buffers = None
+_worker_options = None
+
+
+class BatchResult:
+    """Picklable outcome of one query / Resultado serializável de uma consulta"""
+    def __init__(self, index, start, end, path, cost, visited_count, latency):
+        self.index = index  # Position in the query list / Posição na lista de consultas
+        self.start = start  # Start cell / Célula inicial
+        self.end = end  # End cell / Célula final
+        self.path = path  # Cells from start to end / Células do início ao fim
+        self.cost = cost  # Path cost, inf if unreachable / Custo do caminho, inf se inalcançável
+        self.visited_count = visited_count  # Number of expansions / Número de expansões
+        self.latency = latency  # Seconds spent solving / Segundos gastos na resolução
+
+    @property
+    def found(self):
+        """Whether a path was found / Se um caminho foi encontrado"""
+        return bool(self.path)
+
+
+class BatchStats:
+    """Throughput and latency of a batch / Vazão e latência de um lote"""
+    def __init__(self):
+        self.latencies = []  # Per-query solve times / Tempos de resolução por consulta
+        self.found = 0  # Queries with a path / Consultas com caminho
+        self.started = None  # perf_counter at start / perf_counter no início
+        self.finished = None  # perf_counter at end / perf_counter no fim
+
+    def record(self, result):
+        """Add one finished query / Adiciona uma consulta concluída"""
+        self.latencies.append(result.latency)
+        self.found += result.found
+
+    @property
+    def count(self):
+        """Finished queries / Consultas concluídas"""
+        return len(self.latencies)
+
+    @property
+    def elapsed(self):
+        """Wall time so far in seconds / Tempo decorrido em segundos"""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def queries_per_second(self):
+        """Throughput / Vazão"""
+        elapsed = self.elapsed
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def percentile(self, percent):
+        """Nearest-rank latency percentile / Percentil de latência por posição mais próxima"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = math.ceil(percent / 100 * len(ordered))
+        return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+    def summary(self):
+        """Statistics as a dict / Estatísticas como dicionário"""
+        return {
+            'queries': self.count,
+            'found': self.found,
+            'elapsed_s': self.elapsed,
+            'queries_per_second': self.queries_per_second,
+            'latency_p50_s': self.percentile(50),
+            'latency_p90_s': self.percentile(90),
+            'latency_p99_s': self.percentile(99),
+            'latency_max_s': max(self.latencies, default=0.0),
+        }
+
+
+def _init_worker(memory_name, rows, cols, weighted, options):
+    """Attach the shared grid in a worker / Conecta a grade compartilhada no processo"""
+    global _worker_memory, _worker_grid, _worker_buffers, _worker_options
+    _worker_memory = shared_memory.SharedMemory(name=memory_name)
+    size = rows * cols
+    cells = _worker_memory.buf[:size].toreadonly()
+    costs = _worker_memory.buf[size:size + 8 * size].cast('d').toreadonly() if weighted else None
+    _worker_grid = GridMap(rows, cols, cells, costs)
+    _worker_buffers = pathfinding.SearchBuffers(rows * cols)
+    _worker_options = options
+
+
+def _solve(task):
+    """Run one query inside a worker / Executa uma consulta dentro do processo"""
+    index, start, end = task
+    began = time.perf_counter()
+    result = pathfinding.find_path(_worker_grid, start, end, buffers=_worker_buffers, **_worker_options)
+    latency = time.perf_counter() - began
+    return BatchResult(index, start, end, result.path, result.cost, result.visited_count, latency)
+
+
+class PathBatch:
+    """Many queries over one grid / Várias consultas sobre uma grade
+
+    Iterating runs the batch and yields BatchResult objects in completion
+    order; `stats` is updated as results arrive. Extra keyword arguments are
+    passed to pathfinding.find_path.
+    Iterar executa o lote e produz BatchResult na ordem de conclusão;
+    `stats` é atualizado conforme os resultados chegam.
+    """
+    def __init__(self, grid, queries, heuristic_type='euclidean', workers=None, chunksize=8, **options):
+        self.grid = pathfinding.as_grid_map(grid)  # Shared map / Mapa compartilhado
+        self.queries = list(queries)  # (start, end) pairs / Pares (início, fim)
+        self.workers = workers or os.cpu_count() or 1  # Pool size / Tamanho do pool
+        self.chunksize = chunksize  # Queries per task message / Consultas por mensagem
+        self.options = dict(options, heuristic_type=heuristic_type)  # find_path options / Opções do find_path
+        self.stats = BatchStats()  # Filled while iterating / Preenchido durante a iteração
+
+    def __iter__(self):
+        size = self.grid.size
+        weighted = self.grid.costs is not None
+        memory = shared_memory.SharedMemory(create=True, size=max(size + (8 * size if weighted else 0), 1))
+        try:
+            memory.buf[:size] = self.grid.cells
+            if weighted:
+                memory.buf[size:size + 8 * size] = memoryview(self.grid.costs).cast('B')
+            tasks = [(index, start, end) for index, (start, end) in enumerate(self.queries)]
+            self.stats = BatchStats()
+            self.stats.started = time.perf_counter()
+            with multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                      initargs=(memory.name, self.grid.rows, self.grid.cols, weighted,
+                                                self.options)) as pool:
+                for result in pool.imap_unordered(_solve, tasks, chunksize=self.chunksize):
+                    self.stats.record(result)
+                    yield result
+            self.stats.finished = time.perf_counter()
+        finally:
+            memory.close()
+            memory.unlink()
+
+    def run(self):
+        """Run the whole batch and return results in query order / Executa o lote e retorna em ordem"""
+        return sorted(self, key=lambda result: result.index)
@@ -0,0 +1,229 @@
+"""Headless benchmark for the search engine / Benchmark sem interface do motor de busca
+
+Runs search configurations over generated maps (corpus.py) or MovingAI
+`.map`/`.scen` files and reports expansions, heap pushes, wall time, peak
+memory and path-cost optimality per configuration, as a table and as JSON.
+Configurations with `landmarks` build ALT tables (landmarks.py) once per
+map, reported as `preprocess_s`, and pay for the per-query h-field in
+their query time.
+Executa configurações de busca sobre mapas gerados ou arquivos do MovingAI
+e relata expansões, inserções no heap, tempo, memória de pico e
+otimalidade do custo por configuração, em tabela e em JSON.
+
+    python benchmark.py --sizes 20 64 256 --kinds random maze --queries 20 --output results.json
+    python benchmark.py --scen maps/arena.map.scen --configs astar-octile jps-octile
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import pathfinding
+from corpus import MAP_KINDS, Scenario, generate_scenario
+from map_io import load_movingai_map, load_movingai_scenarios, scenario_map_path
+
+# Search configurations / Configurações de busca
+CONFIGS = {
+    'astar-manhattan': {'algorithm': 'astar', 'heuristic_type': 'manhattan', 'connectivity': 4},
+    'astar-euclidean': {'algorithm': 'astar', 'heuristic_type': 'euclidean', 'connectivity': 4},
+    'astar-octile': {'algorithm': 'astar', 'heuristic_type': 'octile', 'connectivity': 8},
+    'astar-euclidean-8': {'algorithm': 'astar', 'heuristic_type': 'euclidean', 'connectivity': 8},
+    'jps-octile': {'algorithm': 'jps', 'heuristic_type': 'octile', 'connectivity': 8},
+    'bidir-manhattan': {'algorithm': 'bidirectional', 'heuristic_type': 'manhattan', 'connectivity': 4},
+    'bidir-octile': {'algorithm': 'bidirectional', 'heuristic_type': 'octile', 'connectivity': 8},
+    'wastar2-octile': {'algorithm': 'astar', 'heuristic_type': 'octile', 'connectivity': 8, 'weight': 2},
+    'alt-manhattan': {'algorithm': 'astar', 'heuristic_type': 'manhattan', 'connectivity': 4, 'landmarks': 16},
+    'alt-octile': {'algorithm': 'astar', 'heuristic_type': 'octile', 'connectivity': 8, 'landmarks': 16},
+}
+
+# Optimal reference search per connectivity / Busca de referência ótima por conectividade
+REFERENCE_CONFIGS = {
+    4: {'algorithm': 'astar', 'heuristic_type': 'manhattan', 'connectivity': 4},
+    8: {'algorithm': 'astar', 'heuristic_type': 'octile', 'connectivity': 8},
+}
+
+DEFAULT_SIZES = (20, 64, 256, 1024)
+COST_TOLERANCE = 1e-6  # Slack when comparing float costs / Folga ao comparar custos
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile / Percentil por posição mais próxima"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = -(-percent * len(ordered) // 100)
+    return ordered[min(max(int(rank), 1), len(ordered)) - 1]
+
+
+def reference_costs(scenario, connectivity, buffers):
+    """Optimal cost of every query / Custo ótimo de cada consulta"""
+    costs = []
+    for start, end, optimal in scenario.queries:
+        if optimal is not None and connectivity == 8:
+            costs.append(optimal)
+        else:
+            costs.append(pathfinding.find_path(scenario.grid, start, end, buffers=buffers,
+                                               **REFERENCE_CONFIGS[connectivity]).cost)
+    return costs
+
+
+def measure_peak_memory(scenario, options, buffers, tables=None):
+    """Largest traced allocation of any query / Maior alocação rastreada entre as consultas"""
+    peak = 0
+    tracemalloc.start()
+    try:
+        for start, end, _ in scenario.queries:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            h_field = tables.h_field(end, options['heuristic_type']) if tables is not None else None
+            pathfinding.find_path(scenario.grid, start, end, buffers=buffers, h_field=h_field, **options)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_config(scenario, config_name, references, measure_memory=True):
+    """Benchmark one configuration on one scenario / Mede uma configuração num cenário"""
+    options = dict(CONFIGS[config_name])
+    landmark_count = options.pop('landmarks', None)
+    buffers = pathfinding.SearchBuffers(scenario.grid.size)
+    times, expansions, pushes, ratios = [], [], [], []
+    found = 0
+    mismatched = 0
+    tables = None
+    preprocess = 0.0
+    if landmark_count:
+        from landmarks import build_landmark_tables
+        began = time.perf_counter()
+        tables = build_landmark_tables(scenario.grid, landmark_count, options['connectivity'])
+        preprocess = time.perf_counter() - began
+
+    for (start, end, _), optimal in zip(scenario.queries, references):
+        began = time.perf_counter()
+        h_field = tables.h_field(end, options['heuristic_type']) if tables is not None else None
+        result = pathfinding.find_path(scenario.grid, start, end, buffers=buffers, h_field=h_field, **options)
+        times.append(time.perf_counter() - began)
+        expansions.append(result.visited_count)
+        pushes.append(result.pushes)
+        if result.found:
+            found += 1
+            ratios.append(result.cost / optimal if optimal > 0 else 1.0)
+        if result.found != (optimal != float('inf')):
+            mismatched += 1
+
+    row = {
+        'scenario': scenario.name,
+        'kind': scenario.kind,
+        'rows': scenario.grid.rows,
+        'cols': scenario.grid.cols,
+        'config': config_name,
+        **CONFIGS[config_name],
+        'queries': len(scenario.queries),
+        'found': found,
+        'reachability_mismatches': mismatched,
+        'expansions_mean': statistics.fmean(expansions) if expansions else 0.0,
+        'expansions_total': sum(expansions),
+        'pushes_mean': statistics.fmean(pushes) if pushes else 0.0,
+        'pushes_total': sum(pushes),
+        'time_total_s': sum(times),
+        'time_mean_ms': 1000 * statistics.fmean(times) if times else 0.0,
+        'time_p95_ms': 1000 * percentile(times, 95),
+        'suboptimality_mean': statistics.fmean(ratios) if ratios else 1.0,
+        'suboptimality_max': max(ratios, default=1.0),
+        'optimal_fraction': (sum(ratio <= 1 + COST_TOLERANCE for ratio in ratios) / len(ratios)
+                             if ratios else 1.0),
+        'buffer_bytes': buffer_bytes(buffers),
+        'preprocess_s': preprocess,
+        'peak_memory_bytes': None,
+    }
+    if measure_memory:
+        row['peak_memory_bytes'] = measure_peak_memory(scenario, options, buffers, tables)
+    return row
+
+
+def buffer_bytes(buffers):
+    """Memory held by reusable search buffers / Memória dos buffers reutilizáveis"""
+    arrays = (buffers.g, buffers.parent, buffers.seen, buffers.closed)
+    return sum(len(values) * values.itemsize for values in arrays)
+
+
+def movingai_scenarios(scen_path, limit=None):
+    """Group a `.scen` file into one scenario per map / Agrupa um `.scen` em um cenário por mapa"""
+    by_map = {}
+    for entry in load_movingai_scenarios(scen_path)[:limit]:
+        by_map.setdefault(scenario_map_path(scen_path, entry), []).append(entry)
+    for map_path, entries in by_map.items():
+        grid = load_movingai_map(map_path)
+        queries = [(entry.start, entry.end, entry.optimal_length) for entry in entries]
+        yield Scenario(map_path, 'movingai', grid, queries)
+
+
+def print_row(row, stream):
+    memory = row['peak_memory_bytes']
+    memory_text = f"{memory / 1024:9.1f}" if memory is not None else f"{'-':>9}"
+    print(f"{row['scenario']:<22} {row['config']:<18} {row['found']:>4}/{row['queries']:<4} "
+          f"{row['expansions_mean']:>11.1f} {row['pushes_mean']:>11.1f} {row['time_mean_ms']:>10.2f} "
+          f"{memory_text} {row['suboptimality_max']:>7.4f}", file=stream, flush=True)
+
+
+def main(argv=None):
+    """Command-line entry point / Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmark the A* search core")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="square map sizes to generate, up to 4096")
+    parser.add_argument('--kinds', nargs='+', default=list(MAP_KINDS), choices=MAP_KINDS,
+                        help="generated map families")
+    parser.add_argument('--queries', type=int, default=10, help="queries per generated map")
+    parser.add_argument('--seed', type=int, default=0, help="seed for maps and queries")
+    parser.add_argument('--configs', nargs='+', default=list(CONFIGS), choices=list(CONFIGS),
+                        help="search configurations to run")
+    parser.add_argument('--scen', nargs='*', default=[],
+                        help="MovingAI .scen files; replaces the generated corpus")
+    parser.add_argument('--scen-limit', type=int, default=None, help="queries to read per .scen file")
+    parser.add_argument('--no-memory', action='store_true', help="skip the peak-memory pass")
+    parser.add_argument('--output', help="write results as JSON to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    if args.scen:
+        scenarios = (scenario for path in args.scen for scenario in movingai_scenarios(path, args.scen_limit))
+    else:
+        scenarios = (generate_scenario(kind, size, args.queries, args.seed)
+                     for size in args.sizes for kind in args.kinds)
+
+    table = sys.stderr if args.output == '-' else sys.stdout
+    print(f"{'scenario':<22} {'config':<18} {'found':>9} {'expansions':>11} {'pushes':>11} "
+          f"{'mean ms':>10} {'peak KiB':>9} {'subopt':>7}", file=table)
+
+    rows = []
+    for scenario in scenarios:
+        references = {}
+        for config_name in args.configs:
+            connectivity = CONFIGS[config_name]['connectivity']
+            if connectivity not in references:
+                references[connectivity] = reference_costs(
+                    scenario, connectivity, pathfinding.SearchBuffers(scenario.grid.size))
+            row = run_config(scenario, config_name, references[connectivity], not args.no_memory)
+            rows.append(row)
+            print_row(row, table)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'seed': args.seed,
+        'results': rows,
+    }
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+    elif args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    main()
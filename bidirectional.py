@@ -0,0 +1,286 @@
+"""Bidirectional A* with MM / A* bidirecional com MM
+
+Grows a forward search from the start and a backward search from the goal,
+each guided by a front-to-end heuristic (distance to the opposite end).
+Following MM (Holte et al., "Bidirectional Search That Is Guaranteed to
+Meet in the Middle"), nodes are ordered by max(f, 2g), so neither side
+expands a node past half the optimal cost and the two frontiers meet in
+the middle instead of each flooding the whole map. The side whose best
+priority is lower goes next. `mu` keeps the best start-to-goal cost seen
+where the searches touch, and the search stops once
+mu <= max(C, fmin_forward, fmin_backward, gmin_forward + gmin_backward + eps),
+which proves it optimal for an admissible heuristic.
+Cresce uma busca a partir do início e outra a partir do objetivo. Como no
+MM, os nós são ordenados por max(f, 2g), de modo que as frentes se
+encontram no meio. `mu` guarda o melhor custo onde as buscas se tocam, e a
+busca termina quando nenhum caminho melhor é possível.
+
+    result = find_path(grid, start, end, 'octile', algorithm='bidirectional', connectivity=8)
+    print(result.forward_expansions, result.backward_expansions)
+"""
+import heapq
+import weakref
+
+import pathfinding
+from grid_map import WALL
+from pathfinding import (INF, ClosedSetView, GScoreView, MOVES_4, MOVES_8, SearchBuffers, SearchResult,
+                         calculate_heuristic)
+
+_backward_buffers = weakref.WeakKeyDictionary()  # forward buffers -> backward buffers / Buffers de ida -> de volta
+
+
+class BidirectionalResult(SearchResult):
+    """SearchResult with per-direction counts / SearchResult com contagens por direção"""
+    def __init__(self, path, cost, g_scores, explored, forward_expansions, backward_expansions, pushes=0,
+                 reopenings=0):
+        super().__init__(path, cost, g_scores, explored, forward_expansions + backward_expansions, pushes)
+        self.forward_expansions = forward_expansions  # Expansions from the start / Expansões a partir do início
+        self.backward_expansions = backward_expansions  # Expansions from the goal / Expansões a partir do objetivo
+        self.reopenings = reopenings  # Closed cells queued again / Células fechadas enfileiradas de novo
+
+
+class FrontierView:
+    """Cells expanded by either search / Células expandidas por qualquer uma das buscas
+
+    `forward` and `backward` are the ClosedSetViews of the two sides;
+    `backward` tells the frontiers apart for drawing.
+    `forward` e `backward` são as visões de cada lado; `backward` separa
+    as duas frentes para o desenho.
+    """
+    def __init__(self, forward, backward):
+        self.forward = forward  # Frontier grown from the start / Frente a partir do início
+        self.backward = backward  # Frontier grown from the goal / Frente a partir do objetivo
+
+    @property
+    def count(self):
+        """Expansions in both directions / Expansões nas duas direções"""
+        return self.forward.count + self.backward.count
+
+    def __contains__(self, cell):
+        return cell in self.forward or cell in self.backward
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        yield from self.forward
+        for cell in self.backward:
+            if cell not in self.forward:
+                yield cell
+
+
+class _BidirectionalGScores:
+    """Forward g where known, else backward g / g da ida quando conhecido, senão g da volta"""
+    def __init__(self, forward, backward):
+        self.forward = forward
+        self.backward = backward
+
+    def get(self, cell, default=None):
+        value = self.forward.get(cell)
+        if value is None:
+            value = self.backward.get(cell)
+        return default if value is None else value
+
+    def __getitem__(self, cell):
+        value = self.get(cell)
+        if value is None:
+            raise KeyError(cell)
+        return value
+
+    def __contains__(self, cell):
+        return self.get(cell) is not None
+
+
+def backward_buffers(buffers):
+    """Buffers of the backward side paired with `buffers` / Buffers do lado reverso ligados a `buffers`"""
+    paired = _backward_buffers.get(buffers)
+    if paired is None:
+        paired = _backward_buffers[buffers] = SearchBuffers()
+    return paired
+
+
+def iter_bidirectional_search(grid, start, end, heuristic_type, buffers, connectivity=4, h_field=None,
+                              instrument=None):
+    """Bidirectional A* as a generator / A* bidirecional como gerador
+
+    Reached through pathfinding.find_path(..., algorithm='bidirectional') or
+    iter_search(); yields (g_scores, explored) per expansion and returns a
+    BidirectionalResult. The forward side runs on `buffers`, the backward
+    side on backward_buffers(buffers). `h_field`, if given, only serves the
+    forward side; `instrument` is an optional
+    instrumentation.Instrumentation.
+    Usado por pathfinding.find_path(..., algorithm='bidirectional'). A ida
+    usa `buffers` e a volta backward_buffers(buffers).
+    """
+    grid = pathfinding.as_grid_map(grid)
+    rows, cols, cells, size = grid.rows, grid.cols, grid.cells, grid.size
+    moves = [(d_row, d_col, d_row * cols + d_col, cost)
+             for d_row, d_col, cost in (MOVES_8 if connectivity == 8 else MOVES_4)]
+    edges = None
+    h_scale = 1.0
+    if grid.costs is not None:
+        from terrain import edge_table
+        table = edge_table(grid, connectivity)
+        edges, h_scale = table.edges, table.min_cost
+    estimate = calculate_heuristic
+    if instrument is not None:
+        moves = instrument.moves(moves)
+        edges = instrument.moves(edges) if edges is not None else None
+        estimate = instrument.heuristic(calculate_heuristic)
+
+    def neighbors(current, backward):
+        """(neighbor, edge cost) pairs; backward follows edges in reverse / Pares (vizinho, custo)"""
+        if edges is not None:
+            # An edge p -> n is stored at p / Uma aresta p -> n fica guardada em p
+            for delta, move_costs in edges:
+                if backward:
+                    neighbor = current - delta
+                    if 0 <= neighbor < size and move_costs[neighbor] != INF:
+                        yield neighbor, move_costs[neighbor]
+                elif move_costs[current] != INF:
+                    yield current + delta, move_costs[current]
+            return
+        x, y = divmod(current, cols)
+        for d_row, d_col, delta, step_cost in moves:
+            row = x + d_row
+            col = y + d_col
+            if row < 0 or row >= rows or col < 0 or col >= cols:
+                continue
+            neighbor = current + delta
+            if cells[neighbor] == WALL:
+                continue
+            # Diagonals may not cut a wall corner / Diagonais não podem cortar o canto de uma parede
+            if d_row and d_col and (cells[current + d_col] == WALL or cells[current + d_row * cols] == WALL):
+                continue
+            yield neighbor, step_cost
+
+    start_index = start[0] * cols + start[1]
+    end_index = end[0] * cols + end[1]
+    targets = (end, start)
+
+    def heuristic(index, side):
+        if side == 0 and h_field is not None:
+            return h_field[index] * h_scale
+        return estimate(divmod(index, cols), targets[side], heuristic_type) * h_scale
+
+    sides = (buffers, backward_buffers(buffers))
+    generation = tuple(side_buffers.begin(size) for side_buffers in sides)
+    g = tuple(side_buffers.g for side_buffers in sides)  # Cost from each end / Custo desde cada ponta
+    parent = tuple(side_buffers.parent for side_buffers in sides)  # Predecessor per side / Antecessor por lado
+    seen = tuple(side_buffers.seen for side_buffers in sides)  # g stamps per side / Carimbos de g por lado
+    closed = tuple(side_buffers.closed for side_buffers in sides)  # Expansion stamps per side / Carimbos de expansão
+    # Per side: heaps by priority, f and g of (key, g, node) entries; an entry
+    # is stale once its node is closed or its g changed. Priority ties go to
+    # the larger g (stored negated), which keeps the search deep on plateaus.
+    # Por lado: heaps por prioridade, f e g; entradas obsoletas são ignoradas.
+    # Empates de prioridade favorecem o maior g.
+    queues = tuple(([], [], []) for _ in range(2))
+    expansions = [0, 0]
+    pushes = 0
+    reopenings = 0
+    epsilon = h_scale  # Cheapest edge cost / Custo da aresta mais barata
+    probe = instrument.queue_probe() if instrument is not None else None
+
+    g_scores = _BidirectionalGScores(*(GScoreView(side_buffers, stamp, cols)
+                                       for side_buffers, stamp in zip(sides, generation)))
+    views = tuple(ClosedSetView(side_buffers, stamp, cols, 0) for side_buffers, stamp in zip(sides, generation))
+    explored = FrontierView(*views)
+    progress = (g_scores, explored)
+
+    def push(side, index, g_value):
+        f = g_value + heuristic(index, side)
+        by_priority, by_f, by_g = queues[side]
+        heapq.heappush(by_priority, (max(f, 2 * g_value), -g_value, index))
+        heapq.heappush(by_f, (f, g_value, index))
+        heapq.heappush(by_g, (g_value, g_value, index))
+
+    def top(side, which):
+        """Smallest live key of one heap, or inf / Menor chave válida de um heap, ou inf"""
+        heap, side_g, side_closed, stamp = queues[side][which], g[side], closed[side], generation[side]
+        while heap:
+            key, g_value, index = heap[0]
+            if side_closed[index] != stamp and abs(g_value) == side_g[index]:
+                return key
+            heapq.heappop(heap)
+            if which == 0 and probe is not None:
+                probe.stale_pops += 1
+        return INF
+
+    for side, index in ((0, start_index), (1, end_index)):
+        g[side][index] = 0
+        parent[side][index] = -1
+        seen[side][index] = generation[side]
+        push(side, index, 0)
+        pushes += 1
+        if probe is not None:
+            probe.opened()
+
+    mu = INF  # Best start-to-goal cost through a meeting cell / Melhor custo por uma célula de encontro
+    meeting = -1
+    if start_index == end_index:
+        mu, meeting = 0, start_index
+
+    while True:
+        priority = (top(0, 0), top(1, 0))
+        if priority[0] == INF or priority[1] == INF:
+            break
+        lower_bound = max(min(priority), top(0, 1), top(1, 1), top(0, 2) + top(1, 2) + epsilon)
+        if mu <= lower_bound:
+            break
+
+        if priority[0] != priority[1]:
+            side = 0 if priority[0] < priority[1] else 1
+        else:
+            # Ties go to the smaller open list / Empates vão para a menor lista aberta
+            side = 0 if len(queues[0][0]) <= len(queues[1][0]) else 1
+        other = 1 - side
+        _, _, current = heapq.heappop(queues[side][0])
+        stamp = generation[side]
+        closed[side][current] = stamp
+        expansions[side] += 1
+        views[side].count += 1
+        if probe is not None:
+            probe.expanded(current)
+        yield progress
+
+        side_g, side_parent, side_seen, side_closed = g[side], parent[side], seen[side], closed[side]
+        other_g, other_seen, other_stamp = g[other], seen[other], generation[other]
+        current_g = side_g[current]
+        for neighbor, step_cost in neighbors(current, side == 1):
+            tentative_g = current_g + step_cost
+            if side_seen[neighbor] == stamp:
+                if tentative_g >= side_g[neighbor]:
+                    continue
+                # A cheaper route reopens a closed cell / Um caminho mais barato reabre uma célula fechada
+                if side_closed[neighbor] == stamp:
+                    side_closed[neighbor] = 0
+                    reopenings += 1
+                    if probe is not None:
+                        probe.opened(reopening=True)
+            else:
+                side_seen[neighbor] = stamp
+                if probe is not None:
+                    probe.opened()
+            side_g[neighbor] = tentative_g
+            side_parent[neighbor] = current
+            push(side, neighbor, tentative_g)
+            pushes += 1
+            if other_seen[neighbor] == other_stamp and tentative_g + other_g[neighbor] < mu:
+                mu = tentative_g + other_g[neighbor]
+                meeting = neighbor
+
+    if meeting < 0:
+        return BidirectionalResult([], INF, g_scores, explored, expansions[0], expansions[1], pushes,
+                                   reopenings)
+    path = []
+    current = meeting
+    while current != -1:
+        path.append(divmod(current, cols))
+        current = parent[0][current]
+    path.reverse()
+    current = parent[1][meeting]
+    while current != -1:
+        path.append(divmod(current, cols))
+        current = parent[1][current]
+    return BidirectionalResult(path, mu, g_scores, explored, expansions[0], expansions[1], pushes,
+                               reopenings)
@@ -0,0 +1,129 @@
+"""Generated benchmark maps / Mapas de benchmark gerados
+
+Deterministic map generators (random obstacles, mazes, rooms and open
+fields) and query sampling for benchmark.py. Every generator takes a seed
+and builds the map with NumPy, so 4096x4096 maps take seconds.
+Geradores determinísticos de mapas (obstáculos aleatórios, labirintos,
+salas e campos abertos) e sorteio de consultas para o benchmark.py.
+"""
+import numpy as np
+
+from grid_map import FREE, GridMap, WALL
+
+MAP_KINDS = ('random', 'maze', 'rooms', 'open')
+
+
+class Scenario:
+    """A map with queries to run on it / Um mapa com consultas a executar"""
+    def __init__(self, name, kind, grid, queries):
+        self.name = name  # Label used in reports / Rótulo usado nos relatórios
+        self.kind = kind  # Map family / Família do mapa
+        self.grid = grid  # GridMap to search / GridMap da busca
+        self.queries = queries  # (start, end, optimal cost or None) / (início, fim, custo ótimo ou None)
+
+
+def _to_grid(array):
+    rows, cols = array.shape
+    return GridMap(rows, cols, bytearray(array.astype(np.uint8).tobytes()))
+
+
+def random_map(rows, cols, density=0.25, seed=0):
+    """Independent random obstacles / Obstáculos aleatórios independentes"""
+    rng = np.random.default_rng(seed)
+    return _to_grid(np.where(rng.random((rows, cols)) < density, WALL, FREE))
+
+
+def open_map(rows, cols):
+    """Obstacle-free field / Campo sem obstáculos"""
+    return GridMap(rows, cols)
+
+
+def maze_map(rows, cols, corridor=1, seed=0):
+    """Perfect maze carved by randomized depth-first search / Labirinto perfeito escavado por DFS aleatória
+
+    Corridors are `corridor` cells wide and separated by one-cell walls.
+    Os corredores têm `corridor` células de largura.
+    """
+    rng = np.random.default_rng(seed)
+    pitch = corridor + 1
+    lattice_rows = max((rows - 1) // pitch, 1)
+    lattice_cols = max((cols - 1) // pitch, 1)
+    cells = np.full((rows, cols), WALL, dtype=np.uint8)
+
+    def room(i, j):
+        top, left = 1 + i * pitch, 1 + j * pitch
+        return slice(top, top + corridor), slice(left, left + corridor)
+
+    visited = np.zeros((lattice_rows, lattice_cols), dtype=bool)
+    visited[0, 0] = True
+    cells[room(0, 0)] = FREE
+    stack = [(0, 0)]
+    while stack:
+        i, j = stack[-1]
+        options = [(i + d_i, j + d_j) for d_i, d_j in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                   if 0 <= i + d_i < lattice_rows and 0 <= j + d_j < lattice_cols
+                   and not visited[i + d_i, j + d_j]]
+        if not options:
+            stack.pop()
+            continue
+        next_i, next_j = options[rng.integers(len(options))]
+        visited[next_i, next_j] = True
+        row_slice, col_slice = room(next_i, next_j)
+        cells[row_slice, col_slice] = FREE
+        # Open the wall between the two rooms / Abre a parede entre as duas salas
+        top = 1 + min(i, next_i) * pitch
+        left = 1 + min(j, next_j) * pitch
+        if next_i != i:
+            cells[top + corridor, left:left + corridor] = FREE
+        else:
+            cells[top:top + corridor, left + corridor] = FREE
+        stack.append((next_i, next_j))
+    return _to_grid(cells)
+
+
+def rooms_map(rows, cols, room_size=16, door_width=2, seed=0):
+    """Square rooms joined by doors / Salas quadradas ligadas por portas
+
+    Every wall segment between two rooms gets one door at a random spot.
+    Cada parede entre duas salas recebe uma porta em posição aleatória.
+    """
+    rng = np.random.default_rng(seed)
+    cells = np.zeros((rows, cols), dtype=np.uint8)
+    cells[::room_size, :] = WALL
+    cells[:, ::room_size] = WALL
+    span = max(room_size - 1 - door_width, 1)
+    for wall_row in range(room_size, rows, room_size):
+        for left in range(0, cols, room_size):
+            door = left + 1 + rng.integers(span)
+            cells[wall_row, door:min(door + door_width, cols)] = FREE
+    for wall_col in range(room_size, cols, room_size):
+        for top in range(0, rows, room_size):
+            door = top + 1 + rng.integers(span)
+            cells[door:min(door + door_width, rows), wall_col] = FREE
+    return _to_grid(cells)
+
+
+def sample_queries(grid, count, seed=0):
+    """Random pairs of free cells / Pares aleatórios de células livres"""
+    rng = np.random.default_rng(seed)
+    free = np.flatnonzero(np.frombuffer(bytes(grid.cells), dtype=np.uint8) != WALL)
+    if len(free) < 2:
+        return []
+    picks = rng.choice(free, size=(count, 2))
+    return [(grid.cell(int(start)), grid.cell(int(end)), None) for start, end in picks]
+
+
+def generate_scenario(kind, size, queries=10, seed=0):
+    """Build one generated scenario / Monta um cenário gerado"""
+    if kind == 'random':
+        grid = random_map(size, size, 0.25, seed)
+    elif kind == 'maze':
+        grid = maze_map(size, size, corridor=max(size // 256, 1), seed=seed)
+    elif kind == 'rooms':
+        room_size = max(size // 16, 8)
+        grid = rooms_map(size, size, room_size, max(room_size // 8, 1), seed)
+    elif kind == 'open':
+        grid = open_map(size, size)
+    else:
+        raise ValueError(f"Unknown map kind '{kind}', expected one of {MAP_KINDS}")
+    return Scenario(f"{kind}-{size}x{size}", kind, grid, sample_queries(grid, queries, seed))
@@ -0,0 +1,100 @@
+"""Flat occupancy grid / Grade de ocupação plana
+
+Cells are stored row-major in a single byte buffer and addressed by
+`row * cols + col`. Células são armazenadas por linha em um único buffer de
+bytes e endereçadas por `row * cols + col`.
+
+A grid may also carry `costs`, a per-cell traversal cost (see terrain.py);
+None means every free cell costs 1.
+Uma grade pode ter `costs`, o custo de travessia por célula; None significa
+custo 1 em todas as células livres.
+
+Every grid carries a `version` drawn from a process-wide counter; it changes
+on each mutation through set()/clear(), and code writing `cells` directly
+calls touch(). Two equal versions therefore always mean the same contents.
+Cada grade tem uma `version` tirada de um contador do processo, que muda a
+cada alteração; quem escreve em `cells` diretamente chama touch().
+"""
+from array import array
+from itertools import count
+
+FREE = 0  # Walkable cell / Célula livre
+WALL = 1  # Blocked cell / Célula bloqueada
+
+_versions = count(1)  # Process-wide grid version counter / Contador de versões de grade do processo
+
+
+class GridMap:
+    """Row-major byte grid / Grade de bytes em ordem de linhas"""
+    def __init__(self, rows, cols, cells=None, costs=None):
+        self.rows = rows  # Number of rows / Número de linhas
+        self.cols = cols  # Number of columns / Número de colunas
+        self.cells = cells if cells is not None else bytearray(rows * cols)  # Flat cell buffer / Buffer plano de células
+        self.costs = costs  # Per-cell cost buffer, None if uniform / Custo por célula, None se uniforme
+        self.version = next(_versions)  # Changes on every mutation / Muda a cada alteração
+
+    @classmethod
+    def from_rows(cls, rows_list):
+        """Build from a list of lists / Constrói a partir de uma lista de listas"""
+        rows = len(rows_list)
+        cols = len(rows_list[0]) if rows else 0
+        cells = bytearray(rows * cols)
+        for row, values in enumerate(rows_list):
+            cells[row * cols:(row + 1) * cols] = bytes(values)
+        return cls(rows, cols, cells)
+
+    @property
+    def size(self):
+        """Total number of cells / Número total de células"""
+        return self.rows * self.cols
+
+    def index(self, row, col):
+        """Flat index of a cell / Índice plano de uma célula"""
+        return row * self.cols + col
+
+    def cell(self, index):
+        """(row, col) of a flat index / (linha, coluna) de um índice plano"""
+        return divmod(index, self.cols)
+
+    def in_bounds(self, row, col):
+        """Whether a cell lies inside the grid / Se a célula está dentro da grade"""
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def get(self, row, col):
+        """Value of a cell / Valor de uma célula"""
+        return self.cells[row * self.cols + col]
+
+    def set(self, row, col, value):
+        """Set the value of a cell / Define o valor de uma célula"""
+        self.cells[row * self.cols + col] = value
+        self.version = next(_versions)
+
+    def get_cost(self, row, col):
+        """Traversal cost of a cell / Custo de travessia de uma célula"""
+        if self.costs is None:
+            return 1.0
+        return self.costs[row * self.cols + col]
+
+    def set_cost(self, row, col, cost):
+        """Set the traversal cost of a cell / Define o custo de travessia de uma célula"""
+        if cost <= 0:
+            raise ValueError(f"Cell cost must be positive, got {cost}")
+        if self.costs is None:
+            self.costs = array('d', [1.0]) * self.size
+        self.costs[row * self.cols + col] = cost
+        self.version = next(_versions)
+
+    def clear(self):
+        """Mark every cell as free with cost 1 / Marca todas as células como livres e com custo 1"""
+        self.cells[:] = bytes(self.size)
+        self.costs = None
+        self.version = next(_versions)
+
+    def touch(self):
+        """Record a change made directly to `cells` / Registra uma alteração feita direto em `cells`"""
+        self.version = next(_versions)
+
+    def to_rows(self):
+        """Copy into a list of lists / Copia para uma lista de listas"""
+        cols = self.cols
+        return [list(self.cells[row * cols:(row + 1) * cols]) for row in range(self.rows)]
@@ -0,0 +1,88 @@
+"""Precomputed heuristic fields / Campos heurísticos pré-calculados
+
+A heuristic field holds h(n) for every cell of a grid towards one goal,
+computed in a single vectorized NumPy pass. Passing it to
+pathfinding.find_path(..., h_field=field) turns heuristic evaluation in the
+inner loop into an array lookup. Fields are cached per (shape, goal,
+heuristic) with LRU eviction.
+Um campo heurístico guarda h(n) de todas as células até um objetivo,
+calculado em uma única passada vetorizada do NumPy. Campos ficam em cache
+por (forma, objetivo, heurística) com remoção LRU.
+
+    field = field_cache.get(grid.rows, grid.cols, end, 'octile')
+    result = find_path(grid, start, end, 'octile', connectivity=8, h_field=field)
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from pathfinding import SQRT2
+
+HEURISTIC_TYPES = ('manhattan', 'euclidean', 'octile', 'chebyshev')
+
+
+def heuristic_field(rows, cols, goal, h_type):
+    """h-values of every cell towards `goal` / Valores h de todas as células até `goal`
+
+    Uses the same arithmetic as pathfinding.calculate_heuristic, so values
+    match the scalar version exactly.
+    Usa a mesma aritmética de pathfinding.calculate_heuristic.
+    """
+    d_row = np.abs(np.arange(rows, dtype=np.float64) - goal[0])[:, None]
+    d_col = np.abs(np.arange(cols, dtype=np.float64) - goal[1])[None, :]
+
+    if h_type == 'manhattan':
+        field = d_row + d_col
+    elif h_type == 'euclidean':
+        field = np.sqrt(d_row ** 2 + d_col ** 2)
+    elif h_type == 'octile':
+        field = np.maximum(d_row, d_col) + (SQRT2 - 1) * np.minimum(d_row, d_col)
+    elif h_type == 'chebyshev':
+        field = np.maximum(d_row, d_col)
+    else:
+        raise ValueError(f"Unknown heuristic '{h_type}', expected one of {HEURISTIC_TYPES}")
+    return np.ascontiguousarray(field)
+
+
+class HeuristicFieldCache:
+    """LRU cache of heuristic fields / Cache LRU de campos heurísticos
+
+    Evicts the least recently used field once either `max_entries` or
+    `max_bytes` is exceeded.
+    Remove o campo usado há mais tempo quando `max_entries` ou `max_bytes`
+    é ultrapassado.
+    """
+    def __init__(self, max_entries=16, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries  # Field count limit / Limite de campos
+        self.max_bytes = max_bytes  # Memory limit / Limite de memória
+        self.entries = OrderedDict()  # (rows, cols, goal, h_type) -> field / Campos por chave
+        self.total_bytes = 0  # Memory held / Memória ocupada
+        self.hits = 0  # Lookups served from cache / Consultas atendidas pelo cache
+        self.misses = 0  # Lookups that built a field / Consultas que calcularam um campo
+
+    def get(self, rows, cols, goal, h_type):
+        """Cached field, building it on a miss / Campo em cache, calculado se ausente"""
+        key = (rows, cols, tuple(goal), h_type)
+        field = self.entries.get(key)
+        if field is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return field
+
+        self.misses += 1
+        field = heuristic_field(rows, cols, goal, h_type)
+        self.entries[key] = field
+        self.total_bytes += field.nbytes
+        while self.entries and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= evicted.nbytes
+        return field
+
+    def clear(self):
+        """Drop every cached field / Descarta todos os campos"""
+        self.entries.clear()
+        self.total_bytes = 0
+
+
+# Process-wide cache / Cache do processo
+field_cache = HeuristicFieldCache()
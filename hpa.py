@@ -0,0 +1,469 @@
+"""Hierarchical pathfinding (HPA*) / Busca hierárquica (HPA*)
+
+The grid is cut into square clusters. Wherever two neighboring clusters
+share a run of free cells along their border, one entrance (two for long
+runs) becomes a pair of abstract nodes joined by a one-step edge, and the
+nodes of each cluster are joined by their shortest in-cluster distances.
+A query links start and goal to the nodes of their clusters, searches the
+small abstract graph and then refines the abstract path into cells:
+'near_optimal' stitches the cached in-cluster paths together, 'exact' runs
+a flat A* pruned by the abstract cost, which is an upper bound.
+A grade é dividida em clusters quadrados. Cada trecho livre compartilhado
+entre clusters vizinhos vira uma entrada (duas em trechos longos), e os nós
+de cada cluster são ligados pelas distâncias mínimas dentro do cluster. A
+consulta busca no grafo abstrato e depois refina o caminho em células:
+'near_optimal' junta os caminhos guardados, 'exact' roda um A* completo
+podado pelo custo abstrato.
+
+On a grid with `costs` every edge is charged like terrain.py charges it
+(the entered cell's weight times the step length), so in-cluster distances
+are kept per direction and the heuristic is scaled by the cheapest cell.
+Numa grade com `costs` cada aresta custa como em terrain.py, as distâncias
+internas são guardadas por direção e a heurística é escalada pela célula
+mais barata.
+
+In-cluster distances are computed the first time a cluster is needed and
+kept until a cell inside it (or on its border) changes, so painting a wall
+only rebuilds the clusters around that cell.
+As distâncias internas são calculadas na primeira vez que o cluster é usado
+e mantidas até uma célula dele mudar.
+
+    planner = HierarchicalPlanner(grid, cluster_size=16)
+    result = planner.find_path((0, 0), (999, 999))
+    grid.set(5, 7, WALL)
+    planner.update_cells([(5, 7)])
+"""
+import heapq
+from array import array
+
+import pathfinding
+from grid_map import WALL
+from pathfinding import INF, MOVES_4, MOVES_8, calculate_heuristic
+
+REFINEMENTS = ('near_optimal', 'exact')
+LONG_ENTRANCE = 6  # Runs this long get an entrance at each end / Trechos deste tamanho ganham entrada em cada ponta
+BOUND_SLACK = 1e-9  # Relative slack on the exact-mode bound / Folga relativa no limite do modo exato
+
+
+class HierarchicalResult:
+    """Outcome of one hierarchical query / Resultado de uma consulta hierárquica"""
+    def __init__(self, path, cost, abstract_path, visited_count, refined_expansions=0):
+        self.path = path  # Cells from start to goal / Células do início ao objetivo
+        self.cost = cost  # Path cost, inf if unreachable / Custo do caminho, inf se inalcançável
+        self.abstract_path = abstract_path  # Abstract nodes crossed / Nós abstratos percorridos
+        self.visited_count = visited_count  # Abstract plus refinement expansions / Expansões abstratas e de refinamento
+        self.refined_expansions = refined_expansions  # Expansions of the exact refinement / Expansões do refinamento exato
+
+    @property
+    def found(self):
+        """Whether a path was found / Se um caminho foi encontrado"""
+        return bool(self.path)
+
+    @property
+    def path_length(self):
+        """Number of steps in the path / Número de passos do caminho"""
+        return max(len(self.path) - 1, 0)
+
+
+class HierarchicalPlanner:
+    """HPA* planner bound to one grid / Planejador HPA* ligado a uma grade
+
+    The grid is read live: change cells on it, then report them through
+    update_cells() before the next query. With `precompute`, every
+    cluster is built up front; otherwise clusters are built on first use,
+    or step by step through iter_build(), which suits very large maps.
+    A grade é lida diretamente: altere as células e informe-as por
+    update_cells(). Com `precompute`, todos os clusters são montados de
+    início; senão, no primeiro uso ou passo a passo por iter_build().
+    """
+    def __init__(self, grid, cluster_size=16, heuristic_type=None, connectivity=4,
+                 refinement='near_optimal', precompute=True):
+        if connectivity not in (4, 8):
+            raise ValueError(f"Connectivity must be 4 or 8, got {connectivity}")
+        if refinement not in REFINEMENTS:
+            raise ValueError(f"Unknown refinement '{refinement}', expected one of {REFINEMENTS}")
+        if cluster_size < 2:
+            raise ValueError(f"Cluster size must be at least 2, got {cluster_size}")
+        self.grid = pathfinding.as_grid_map(grid)  # Map being planned on / Mapa do planejamento
+        self.cluster_size = cluster_size  # Cluster side in cells / Lado do cluster em células
+        self.connectivity = connectivity  # 4 or 8 neighbors / 4 ou 8 vizinhos
+        self.heuristic_type = heuristic_type or ('octile' if connectivity == 8 else 'manhattan')  # Heuristic name / Nome da heurística
+        self.refinement = refinement  # 'near_optimal' or 'exact' / 'near_optimal' ou 'exact'
+        self.moves = MOVES_8 if connectivity == 8 else MOVES_4  # (d_row, d_col, cost) moves / Movimentos
+        self.cluster_rows = -(-self.grid.rows // cluster_size)  # Clusters per column / Clusters por coluna
+        self.cluster_cols = -(-self.grid.cols // cluster_size)  # Clusters per row / Clusters por linha
+        self.entrances = {}  # Border -> [(cell_a, cell_b)] flat index pairs / Borda -> pares de índices
+        self.inter_edges = {}  # node -> {node across a border: cost} / nó -> {nó do outro lado: custo}
+        self.intra = {}  # cluster -> (edges, paths) built lazily / cluster -> (arestas, caminhos) sob demanda
+        self.buffers = pathfinding.SearchBuffers(self.grid.size)  # Buffers for exact refinement / Buffers do refinamento exato
+        self.rebuilt_clusters = 0  # Clusters built since creation / Clusters montados desde a criação
+        for border in self._all_borders():
+            self._scan_border(border)
+        if precompute:
+            for _ in self.iter_build():
+                pass
+
+    def cluster_of(self, cell):
+        """Cluster holding a cell / Cluster que contém uma célula"""
+        return cell[0] // self.cluster_size, cell[1] // self.cluster_size
+
+    def cluster_bounds(self, cluster):
+        """(top, left, bottom, right) cell range, end exclusive / Intervalo de células, fim exclusivo"""
+        size = self.cluster_size
+        top, left = cluster[0] * size, cluster[1] * size
+        return top, left, min(top + size, self.grid.rows), min(left + size, self.grid.cols)
+
+    def abstract_nodes(self):
+        """Cells that are abstract nodes / Células que são nós abstratos"""
+        cols = self.grid.cols
+        return [divmod(node, cols) for node in self.inter_edges]
+
+    def _all_borders(self):
+        for cluster_row in range(self.cluster_rows):
+            for cluster_col in range(self.cluster_cols):
+                if cluster_row + 1 < self.cluster_rows:
+                    yield (cluster_row, cluster_col), (cluster_row + 1, cluster_col)
+                if cluster_col + 1 < self.cluster_cols:
+                    yield (cluster_row, cluster_col), (cluster_row, cluster_col + 1)
+
+    def _cluster_borders(self, cluster):
+        cluster_row, cluster_col = cluster
+        if cluster_row > 0:
+            yield (cluster_row - 1, cluster_col), cluster
+        if cluster_row + 1 < self.cluster_rows:
+            yield cluster, (cluster_row + 1, cluster_col)
+        if cluster_col > 0:
+            yield (cluster_row, cluster_col - 1), cluster
+        if cluster_col + 1 < self.cluster_cols:
+            yield cluster, (cluster_row, cluster_col + 1)
+
+    def _scan_border(self, border):
+        """Place entrances along one border / Posiciona as entradas de uma borda"""
+        for node_a, node_b in self.entrances.pop(border, ()):
+            del self.inter_edges[node_a][node_b]
+            del self.inter_edges[node_b][node_a]
+            for node in (node_a, node_b):
+                if not self.inter_edges[node]:
+                    del self.inter_edges[node]
+
+        first, second = border
+        cols, cells = self.grid.cols, self.grid.cells
+        top, left, bottom, right = self.cluster_bounds(first)
+        if first[0] != second[0]:
+            # Horizontal border: first is above second / Borda horizontal: first fica acima de second
+            side_a = [(bottom - 1) * cols + col for col in range(left, right)]
+            step = cols
+        else:
+            side_a = [row * cols + right - 1 for row in range(top, bottom)]
+            step = 1
+
+        pairs = []
+        run = []
+        for cell in side_a + [None]:
+            if cell is not None and cells[cell] != WALL and cells[cell + step] != WALL:
+                run.append(cell)
+                continue
+            if run:
+                picks = (run[0], run[-1]) if len(run) >= LONG_ENTRANCE else (run[len(run) // 2],)
+                pairs.extend((cell_a, cell_a + step) for cell_a in picks)
+                run = []
+        self.entrances[border] = pairs
+        costs = self.grid.costs
+        for node_a, node_b in pairs:
+            # Entering a cell costs its weight / Entrar numa célula custa seu peso
+            self.inter_edges.setdefault(node_a, {})[node_b] = 1 if costs is None else costs[node_b]
+            self.inter_edges.setdefault(node_b, {})[node_a] = 1 if costs is None else costs[node_a]
+
+    def _cluster_nodes(self, cluster):
+        nodes = set()
+        for border in self._cluster_borders(cluster):
+            side = 0 if border[0] == cluster else 1
+            nodes.update(pair[side] for pair in self.entrances[border])
+        return nodes
+
+    def _adjacency(self, bounds, reverse=False):
+        """Free neighbors of every free cell inside a cluster / Vizinhos livres de cada célula livre do cluster
+
+        Costs are for moving into the neighbor, or out of it with `reverse`.
+        Os custos são para entrar no vizinho, ou sair dele com `reverse`.
+        """
+        top, left, bottom, right = bounds
+        cols, cells, costs = self.grid.cols, self.grid.cells, self.grid.costs
+        adjacency = {}
+        for row in range(top, bottom):
+            for col in range(left, right):
+                current = row * cols + col
+                if cells[current] == WALL:
+                    continue
+                neighbors = []
+                for d_row, d_col, step_cost in self.moves:
+                    next_row, next_col = row + d_row, col + d_col
+                    if not (top <= next_row < bottom and left <= next_col < right):
+                        continue
+                    neighbor = next_row * cols + next_col
+                    if cells[neighbor] == WALL:
+                        continue
+                    # Diagonals may not cut a wall corner / Diagonais não podem cortar o canto de uma parede
+                    if d_row and d_col and (cells[current + d_col] == WALL or cells[current + d_row * cols] == WALL):
+                        continue
+                    if costs is not None:
+                        step_cost *= costs[current if reverse else neighbor]
+                    neighbors.append((neighbor, step_cost))
+                adjacency[current] = neighbors
+        return adjacency
+
+    @staticmethod
+    def _local_search(source, adjacency, targets=None):
+        """Dijkstra from `source` inside a cluster / Dijkstra a partir de `source` dentro de um cluster
+
+        Stops early once every cell in `targets` is settled.
+        Para assim que todas as células de `targets` forem consolidadas.
+        """
+        distance = {source: 0}
+        parent = {source: -1}
+        settled = set()
+        remaining = set(targets) if targets else None
+        queue = [(0, source)]
+        while queue:
+            cost, current = heapq.heappop(queue)
+            if current in settled:
+                continue
+            settled.add(current)
+            if remaining is not None:
+                remaining.discard(current)
+                if not remaining:
+                    break
+            for neighbor, step_cost in adjacency[current]:
+                new_cost = cost + step_cost
+                if new_cost < distance.get(neighbor, INF):
+                    distance[neighbor] = new_cost
+                    parent[neighbor] = current
+                    heapq.heappush(queue, (new_cost, neighbor))
+        return distance, parent
+
+    def _cluster_graph(self, cluster):
+        """In-cluster edges and paths, built on first use / Arestas e caminhos internos, montados no primeiro uso"""
+        graph = self.intra.get(cluster)
+        if graph is not None:
+            return graph
+        return _drain(self._iter_cluster_graph(cluster))
+
+    def _iter_cluster_graph(self, cluster):
+        """Build a cluster, yielding after each local search / Monta um cluster, produzindo após cada busca local"""
+        adjacency = self._adjacency(self.cluster_bounds(cluster))
+        nodes = sorted(self._cluster_nodes(cluster))
+        # Weighted distances differ by direction / Distâncias com pesos dependem da direção
+        directed = self.grid.costs is not None
+        edges = {node: {} for node in nodes}
+        paths = {}
+        for position, source in enumerate(nodes):
+            targets = [node for node in nodes if node != source] if directed else nodes[position + 1:]
+            if not targets:
+                break
+            distance, parent = self._local_search(source, adjacency, targets)
+            for target in targets:
+                cost = distance.get(target)
+                if cost is None:
+                    continue
+                edges[source][target] = cost
+                if not directed:
+                    edges[target][source] = cost
+                # Arrays keep the garbage collector from rescanning every path
+                # Arrays evitam que o coletor de lixo reexamine cada caminho
+                paths[source, target] = array('i', _trace(parent, target))
+            yield
+        graph = (edges, paths)
+        self.intra[cluster] = graph
+        self.rebuilt_clusters += 1
+        return graph
+
+    def iter_build(self):
+        """Build every missing cluster, one per step / Monta cada cluster ausente, um por passo
+
+        Yields (built, total) cluster counts after each local search inside
+        a cluster, so the work can be spread over frames; queries afterwards
+        build nothing.
+        Produz as contagens (montados, total) após cada busca local.
+        """
+        total = self.cluster_rows * self.cluster_cols
+        for cluster_row in range(self.cluster_rows):
+            for cluster_col in range(self.cluster_cols):
+                if (cluster_row, cluster_col) in self.intra:
+                    continue
+                for _ in self._iter_cluster_graph((cluster_row, cluster_col)):
+                    yield len(self.intra), total
+                yield len(self.intra), total
+
+    def update_cells(self, cells):
+        """Rebuild the clusters around changed cells / Remonta os clusters em volta das células alteradas"""
+        borders = set()
+        clusters = set()
+        for row, col in cells:
+            cluster = self.cluster_of((row, col))
+            clusters.add(cluster)
+            top, left, bottom, right = self.cluster_bounds(cluster)
+            # Border cells also change the entrances they face / Células de borda mudam as entradas vizinhas
+            for border in self._cluster_borders(cluster):
+                other = border[1] if border[0] == cluster else border[0]
+                if ((other[0] < cluster[0] and row == top) or (other[0] > cluster[0] and row == bottom - 1) or
+                        (other[1] < cluster[1] and col == left) or (other[1] > cluster[1] and col == right - 1)):
+                    borders.add(border)
+                    clusters.add(other)
+        for border in borders:
+            self._scan_border(border)
+        for cluster in clusters:
+            self.intra.pop(cluster, None)
+        return len(clusters)
+
+    def _endpoint_edges(self, index, cluster, extra_target=None, reverse=False):
+        """Distances from a query cell to its cluster's nodes / Distâncias de uma célula da consulta aos nós do cluster
+
+        With `reverse` they are distances from the nodes to the cell, and
+        parents point towards it.
+        Com `reverse` são distâncias dos nós até a célula.
+        """
+        nodes = self._cluster_nodes(cluster)
+        nodes.discard(index)
+        targets = nodes | {extra_target} if extra_target is not None else nodes
+        adjacency = self._adjacency(self.cluster_bounds(cluster), reverse)
+        distance, parent = self._local_search(index, adjacency, targets)
+        return {node: distance[node] for node in nodes if node in distance}, distance, parent
+
+    def _abstract_search(self, start_index, goal_index, start_edges, goal_edges):
+        """A* over the abstract graph, yielding after each expansion / A* no grafo abstrato, produzindo a cada expansão"""
+        cols = self.grid.cols
+        goal = divmod(goal_index, cols)
+        heuristic_type = self.heuristic_type
+        h_scale = self._cost_scale()
+        size = self.cluster_size
+        distance = {start_index: 0}
+        parent = {start_index: -1}
+        closed = set()
+        queue = [(calculate_heuristic(divmod(start_index, cols), goal, heuristic_type) * h_scale, start_index)]
+        expansions = 0
+        while queue:
+            _, current = heapq.heappop(queue)
+            if current in closed:
+                continue
+            if current == goal_index:
+                return _trace(parent, goal_index), distance[goal_index], expansions
+            closed.add(current)
+            expansions += 1
+            yield
+            current_cost = distance[current]
+            row, col = divmod(current, cols)
+            graph = self.intra.get((row // size, col // size))
+            if graph is None:
+                graph = yield from self._iter_cluster_graph((row // size, col // size))
+            successors = [self.inter_edges.get(current, {}), graph[0].get(current, {})]
+            if current == start_index:
+                successors.append(start_edges)
+            if current in goal_edges:
+                successors.append({goal_index: goal_edges[current]})
+            for edges in successors:
+                for neighbor, cost in edges.items():
+                    new_cost = current_cost + cost
+                    if neighbor not in closed and new_cost < distance.get(neighbor, INF):
+                        distance[neighbor] = new_cost
+                        parent[neighbor] = current
+                        h_score = calculate_heuristic(divmod(neighbor, cols), goal, heuristic_type) * h_scale
+                        heapq.heappush(queue, (new_cost + h_score, neighbor))
+        return [], INF, expansions
+
+    def _cost_scale(self):
+        """Cheapest free cell, which keeps the heuristic admissible / Célula livre mais barata"""
+        if self.grid.costs is None:
+            return 1.0
+        from terrain import edge_table
+        return edge_table(self.grid, self.connectivity).min_cost
+
+    def _refine(self, abstract_path, start_parent, goal_parent):
+        """Stitch cached paths into a cell path / Junta os caminhos guardados num caminho de células"""
+        size, cols = self.cluster_size, self.grid.cols
+        path = [abstract_path[0]]
+        last = len(abstract_path) - 2
+        for position, (node_a, node_b) in enumerate(zip(abstract_path, abstract_path[1:])):
+            row_a, col_a = divmod(node_a, cols)
+            row_b, col_b = divmod(node_b, cols)
+            cluster = (row_a // size, col_a // size)
+            if cluster != (row_b // size, col_b // size):
+                segment = [node_a, node_b]
+            elif position == 0:
+                segment = _trace(start_parent, node_b)
+            elif position == last:
+                segment = _trace(goal_parent, node_a)[::-1]
+            else:
+                paths = self._cluster_graph(cluster)[1]
+                segment = paths[node_a, node_b] if (node_a, node_b) in paths else paths[node_b, node_a][::-1]
+            path.extend(segment[1:])
+        return path
+
+    def find_path(self, start, goal):
+        """Answer one query / Responde uma consulta"""
+        return _drain(self.iter_find_path(start, goal))
+
+    def iter_find_path(self, start, goal):
+        """find_path() as a generator / find_path() como gerador
+
+        Yields after each abstract expansion, each local search of a
+        cluster built on the way and each expansion of an exact
+        refinement, and returns the HierarchicalResult through
+        StopIteration.value, like pathfinding.iter_search.
+        Produz após cada passo e devolve o HierarchicalResult em
+        StopIteration.value.
+        """
+        cols = self.grid.cols
+        start, goal = tuple(start), tuple(goal)
+        start_index = start[0] * cols + start[1]
+        goal_index = goal[0] * cols + goal[1]
+        if self.grid.cells[start_index] == WALL or self.grid.cells[goal_index] == WALL:
+            return HierarchicalResult([], INF, [], 0)
+        if start_index == goal_index:
+            return HierarchicalResult([start], 0, [start], 0)
+
+        start_cluster, goal_cluster = self.cluster_of(start), self.cluster_of(goal)
+        same_cluster = start_cluster == goal_cluster
+        start_edges, start_distance, start_parent = self._endpoint_edges(
+            start_index, start_cluster, goal_index if same_cluster else None)
+        goal_edges, _, goal_parent = self._endpoint_edges(goal_index, goal_cluster, reverse=True)
+        if same_cluster and goal_index in start_distance:
+            # Direct in-cluster route, kept if the abstract one is no shorter / Rota interna direta
+            start_edges[goal_index] = start_distance[goal_index]
+
+        abstract_path, cost, expansions = yield from self._abstract_search(start_index, goal_index, start_edges,
+                                                                           goal_edges)
+        if not abstract_path:
+            return HierarchicalResult([], INF, [], expansions)
+        abstract_cells = [divmod(node, cols) for node in abstract_path]
+
+        if self.refinement == 'exact':
+            result = yield from pathfinding.iter_search(self.grid, start, goal, self.heuristic_type, self.buffers,
+                                                        connectivity=self.connectivity,
+                                                        cost_bound=cost * (1 + BOUND_SLACK) + BOUND_SLACK)
+            return HierarchicalResult(result.path, result.cost, abstract_cells,
+                                      expansions + result.visited_count, result.visited_count)
+
+        if len(abstract_path) == 2 and same_cluster:
+            cell_path = _trace(start_parent, goal_index)
+        else:
+            cell_path = self._refine(abstract_path, start_parent, goal_parent)
+        return HierarchicalResult([divmod(index, cols) for index in cell_path], cost, abstract_cells, expansions)
+
+
+def _drain(steps):
+    """Run a generator to the end and return its value / Executa um gerador até o fim e retorna seu valor"""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def _trace(parent, end):
+    path = [end]
+    current = parent[end]
+    while current != -1:
+        path.append(current)
+        current = parent[current]
+    path.reverse()
+    return path
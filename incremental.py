@@ -0,0 +1,291 @@
+"""Incremental replanning with D* Lite / Replanejamento incremental com D* Lite
+
+D* Lite (Koenig & Likhachev) searches backwards from the goal and keeps its
+g/rhs values between calls. After cells flip between free and wall, or the
+start moves, only the vertices whose costs actually changed are repaired,
+so small edits cost a small number of expansions instead of a full rerun.
+Moving the goal invalidates every stored distance and restarts the planner.
+On a grid with `costs` a move costs the entered cell's weight times the step
+length, as in terrain.py, and cost changes are reported like wall changes.
+O D* Lite busca a partir do objetivo e guarda seus valores g/rhs entre
+chamadas. Depois que células mudam ou o início se move, apenas os vértices
+afetados são reparados. Mover o objetivo reinicia o planejador. Mudanças
+de custo de células são informadas como mudanças de paredes.
+
+    planner = DStarLite(grid, start, end, 'manhattan')
+    result = planner.compute_path()
+    grid.set(5, 7, WALL)
+    planner.update_cells([(5, 7)])
+    result = planner.compute_path()   # repairs around (5, 7) only
+"""
+import heapq
+from array import array
+
+import pathfinding
+import terrain
+from grid_map import WALL
+from pathfinding import INF, MOVES_4, MOVES_8, calculate_heuristic
+
+KEY_TOLERANCE = 1e-9  # Relative gap under which keys count as tied / Diferença relativa abaixo da qual as chaves empatam
+
+
+class IncrementalResult:
+    """Outcome of one planning call / Resultado de uma chamada de planejamento"""
+    def __init__(self, path, cost, visited_count, total_expansions):
+        self.path = path  # Cells from start to goal / Células do início ao objetivo
+        self.cost = cost  # Path cost, inf if unreachable / Custo do caminho, inf se inalcançável
+        self.visited_count = visited_count  # Expansions in this call / Expansões nesta chamada
+        self.total_expansions = total_expansions  # Expansions since the last reset / Expansões desde o último reinício
+
+    @property
+    def found(self):
+        """Whether a path was found / Se um caminho foi encontrado"""
+        return bool(self.path)
+
+    @property
+    def path_length(self):
+        """Number of steps in the path / Número de passos do caminho"""
+        return max(len(self.path) - 1, 0)
+
+
+class DStarLite:
+    """D* Lite planner bound to one grid / Planejador D* Lite ligado a uma grade
+
+    The grid is read live: change cells on it, then report them through
+    update_cells() before the next compute_path().
+    A grade é lida diretamente: altere as células e informe-as por
+    update_cells() antes do próximo compute_path().
+    """
+    def __init__(self, grid, start, goal, heuristic_type='manhattan', connectivity=4):
+        if connectivity not in (4, 8):
+            raise ValueError(f"Connectivity must be 4 or 8, got {connectivity}")
+        self.grid = pathfinding.as_grid_map(grid)  # Map being planned on / Mapa do planejamento
+        self.heuristic_type = heuristic_type  # Heuristic name / Nome da heurística
+        self.connectivity = connectivity  # 4 or 8 neighbors / 4 ou 8 vizinhos
+        self.moves = MOVES_8 if connectivity == 8 else MOVES_4  # (d_row, d_col, cost) moves / Movimentos
+        self.start = tuple(start)  # Current start / Início atual
+        self.goal = tuple(goal)  # Current goal / Objetivo atual
+        self.total_expansions = 0  # Expansions since the last reset / Expansões desde o último reinício
+        self.reset()
+
+    def reset(self):
+        """Drop all stored distances / Descarta todas as distâncias guardadas"""
+        size = self.grid.size
+        self.h_scale = self._cost_scale()  # Cheapest cell cost, scales the heuristic / Menor custo de célula, escala a heurística
+        self.g = array('d', [INF]) * size  # Settled cost to goal / Custo consolidado até o objetivo
+        self.rhs = array('d', [INF]) * size  # One-step lookahead cost / Custo com um passo de antecipação
+        self.key_primary = array('d', [INF]) * size  # Queued key, first part / Chave na fila, primeira parte
+        self.key_secondary = array('d', [INF]) * size  # Queued key, second part / Chave na fila, segunda parte
+        self.queued = bytearray(size)  # Whether a node is in the queue / Se o nó está na fila
+        self.queue = []  # (k1, k2, node) entries, stale ones skipped / Entradas (k1, k2, nó)
+        self.queued_count = 0  # Live queue entries / Entradas válidas na fila
+        self.km = 0.0  # Key modifier for start moves / Modificador de chave para movimentos do início
+        self.last_start = self.start  # Start at the last key update / Início na última atualização de chave
+        self.total_expansions = 0
+
+        self.goal_index = self._index(self.goal)  # Flat index of the goal / Índice plano do objetivo
+        self.rhs[self.goal_index] = 0.0
+        self._push(self.goal_index, self._heuristic(self.goal_index), 0.0)
+
+    def _index(self, cell):
+        return cell[0] * self.grid.cols + cell[1]
+
+    def _cost_scale(self):
+        """Cheapest free cell, walls excluded / Célula livre mais barata, sem paredes"""
+        if self.grid.costs is None:
+            return 1.0
+        return terrain.edge_table(self.grid, self.connectivity).min_cost
+
+    def _heuristic(self, index):
+        return calculate_heuristic(self.start, divmod(index, self.grid.cols), self.heuristic_type) * self.h_scale
+
+    def _neighbors(self, index):
+        """(neighbor, cost) pairs, cost inf when blocked / Pares (vizinho, custo), inf se bloqueado"""
+        grid = self.grid
+        rows, cols, cells, costs = grid.rows, grid.cols, grid.cells, grid.costs
+        row, col = divmod(index, cols)
+        blocked = cells[index] == WALL
+        for d_row, d_col, step_cost in self.moves:
+            next_row, next_col = row + d_row, col + d_col
+            if not (0 <= next_row < rows and 0 <= next_col < cols):
+                continue
+            neighbor = next_row * cols + next_col
+            if (blocked or cells[neighbor] == WALL or
+                    (d_row and d_col and (cells[row * cols + next_col] == WALL or
+                                          cells[next_row * cols + col] == WALL))):
+                yield neighbor, INF
+            elif costs is not None:
+                yield neighbor, step_cost * costs[neighbor]
+            else:
+                yield neighbor, step_cost
+
+    def _key(self, index):
+        best = min(self.g[index], self.rhs[index])
+        return best + self._heuristic(index) + self.km, best
+
+    def _push(self, index, primary, secondary):
+        if not self.queued[index]:
+            self.queued[index] = 1
+            self.queued_count += 1
+        self.key_primary[index] = primary
+        self.key_secondary[index] = secondary
+        heapq.heappush(self.queue, (primary, secondary, index))
+        if len(self.queue) > 1024 and len(self.queue) > 4 * self.queued_count:
+            self._compact()
+
+    def _remove(self, index):
+        if self.queued[index]:
+            self.queued[index] = 0
+            self.queued_count -= 1
+
+    def _compact(self):
+        """Drop stale queue entries / Remove entradas obsoletas da fila"""
+        self.queue = [(primary, secondary, index) for primary, secondary, index in self.queue
+                      if self.queued[index] and self.key_primary[index] == primary
+                      and self.key_secondary[index] == secondary]
+        heapq.heapify(self.queue)
+
+    def _top(self):
+        """Best live entry without removing it / Melhor entrada válida sem removê-la"""
+        queue = self.queue
+        while queue:
+            primary, secondary, index = queue[0]
+            if (self.queued[index] and self.key_primary[index] == primary
+                    and self.key_secondary[index] == secondary):
+                return queue[0]
+            heapq.heappop(queue)
+        return None
+
+    def _update_vertex(self, index):
+        if index != self.goal_index:
+            self.rhs[index] = min((cost + self.g[neighbor] for neighbor, cost in self._neighbors(index)),
+                                  default=INF)
+        if self.g[index] != self.rhs[index]:
+            self._push(index, *self._key(index))
+        else:
+            self._remove(index)
+
+    def _compute_shortest_path(self):
+        """Expand until the start is consistent, yielding the expansions so far after each one
+        Expande até o início ficar consistente, produzindo as expansões a cada uma"""
+        start_index = self._index(self.start)
+        g, rhs = self.g, self.rhs
+        expansions = 0
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            if not _key_below(top, self._key(start_index)) and rhs[start_index] == g[start_index]:
+                break
+
+            old_primary, old_secondary, index = heapq.heappop(self.queue)
+            new_key = self._key(index)
+            if (old_primary, old_secondary) < new_key:
+                self._push(index, *new_key)
+                continue
+
+            self._remove(index)
+            expansions += 1
+            self.total_expansions += 1
+            if g[index] > rhs[index]:
+                g[index] = rhs[index]
+                for neighbor, _ in self._neighbors(index):
+                    self._update_vertex(neighbor)
+            else:
+                g[index] = INF
+                self._update_vertex(index)
+                for neighbor, _ in self._neighbors(index):
+                    self._update_vertex(neighbor)
+            yield expansions
+        return expansions
+
+    def update_cells(self, cells):
+        """Repair after cells flipped on the grid / Repara depois que células mudaram na grade
+
+        Walls and cost changes are both repaired locally, except a cost
+        below the heuristic scale, which would make stored keys overestimate
+        and restarts the planner.
+        Paredes e custos são reparados localmente, exceto um custo menor que
+        a escala da heurística, que reinicia o planejador.
+        """
+        grid_cells, costs = self.grid.cells, self.grid.costs
+        if costs is not None and any(grid_cells[index] != WALL and costs[index] < self.h_scale
+                                     for index in map(self._index, cells)):
+            self.reset()
+            return
+        touched = set()
+        for cell in cells:
+            index = self._index(cell)
+            touched.add(index)
+            touched.update(neighbor for neighbor, _ in self._neighbors(index))
+        for index in touched:
+            self._update_vertex(index)
+
+    def move_start(self, start):
+        """Move the start, keeping stored distances / Move o início, mantendo as distâncias"""
+        start = tuple(start)
+        if start == self.start:
+            return
+        self.km += calculate_heuristic(self.last_start, start, self.heuristic_type) * self.h_scale
+        self.last_start = start
+        self.start = start
+
+    def set_goal(self, goal):
+        """Move the goal; this restarts the planner / Move o objetivo; isto reinicia o planejador"""
+        goal = tuple(goal)
+        if goal != self.goal:
+            self.goal = goal
+            self.reset()
+
+    def compute_path(self):
+        """Repair as needed and return the current path / Repara o necessário e retorna o caminho"""
+        steps = self.iter_compute_path()
+        while True:
+            try:
+                next(steps)
+            except StopIteration as stop:
+                return stop.value
+
+    def iter_compute_path(self):
+        """compute_path() as a generator / compute_path() como gerador
+
+        Yields the expansion count of this call after every expansion and
+        returns the IncrementalResult through StopIteration.value, like
+        pathfinding.iter_search, so a long repair can be spread over many
+        frames. Every yield leaves the planner consistent: closing the
+        generator early is safe, and the next call resumes the repair.
+        Produz o número de expansões após cada uma e devolve o
+        IncrementalResult em StopIteration.value. Fechar o gerador no meio é
+        seguro; a próxima chamada retoma o reparo.
+        """
+        expansions = yield from self._compute_shortest_path()
+
+        start_index = self._index(self.start)
+        goal_index = self.goal_index
+        cost = self.g[start_index]
+        if cost == INF:
+            return IncrementalResult([], INF, expansions, self.total_expansions)
+
+        cols = self.grid.cols
+        path = [self.start]
+        current = start_index
+        for _ in range(self.grid.size):
+            if current == goal_index:
+                break
+            current = min(self._neighbors(current), key=lambda pair: (pair[1] + self.g[pair[0]], pair[0]))[0]
+            path.append(divmod(current, cols))
+        return IncrementalResult(path, cost, expansions, self.total_expansions)
+
+
+def _key_below(key, bound):
+    """Whether `key` sorts before `bound`, ties included / Se `key` vem antes de `bound`, empates incluídos
+
+    Keys summed along different routes can differ by rounding alone; a
+    vertex whose key ties the start's is expanded rather than left stale.
+    Chaves somadas por rotas diferentes podem diferir só por arredondamento;
+    um vértice empatado com o início é expandido.
+    """
+    slack = KEY_TOLERANCE * max(1.0, abs(bound[0]))
+    if key[0] < bound[0] - slack:
+        return True
+    return key[0] <= bound[0] + slack and key[1] < bound[1] + slack
@@ -0,0 +1,324 @@
+"""Search instrumentation / Instrumentação da busca
+
+Pass an Instrumentation to pathfinding.find_path(..., instrument=probe) or
+iter_search() to count what the search core does: expansions, open-set
+pushes, decrease-keys, stale pops, reopenings, the largest open-set size,
+neighbor checks and the time spent computing the heuristic. Neighbor checks
+are counted where the search generates candidates: every move (or terrain
+table entry) it examines, and for JPS every pruned direction it jumps
+along. Heuristic time covers heuristics computed during the search plus,
+when the caller fetches an `h_field` through field(), the time that took;
+with neither, `heuristic_ms` is None. With `timing`
+the setup and expansion phases are timed as well, and `on_event`
+receives 'start', 'expand' and 'finish' events as they happen.
+Passe um Instrumentation para find_path(..., instrument=probe) ou
+iter_search() para contar o que o núcleo de busca faz. Vizinhos
+verificados são contados onde a busca gera candidatos; o tempo da
+heurística inclui o campo `h_field` obtido por field(). Com `timing` as
+fases também são cronometradas, e `on_event` recebe eventos 'start',
+'expand' e 'finish'.
+
+Without an instrument nothing changes in the search: the hooks are bound
+once when a search starts, so the uninstrumented inner loop runs exactly
+the code it always did. With one, the open set and heuristic are wrapped,
+which makes that search noticeably slower; heuristic time includes the
+timer overhead.
+Sem instrumento a busca não muda: os ganchos são ligados uma vez no início.
+Com instrumento, a lista aberta e a heurística são envolvidas e a busca fica
+mais lenta.
+
+    probe = Instrumentation(timing=True)
+    result = find_path(grid, start, end, 'octile', connectivity=8, instrument=probe)
+    probe.save_json('stats.json')
+    probe.save_chrome_trace('trace.json')   # chrome://tracing, Perfetto or speedscope
+"""
+import json
+import time
+
+COUNTERS = ('expansions', 'pushes', 'decrease_keys', 'stale_pops', 'reopenings', 'max_open_size',
+            'neighbor_checks', 'heuristic_calls')
+
+
+class _CountedMoves:
+    """Move list that counts the moves a search examines / Lista de movimentos que conta os examinados"""
+    def __init__(self, moves, counters):
+        self.moves = moves
+        self.counters = counters
+
+    def __iter__(self):
+        counters = self.counters
+        for move in self.moves:
+            counters['neighbor_checks'] += 1
+            yield move
+
+
+class _OpenSetProbe:
+    """Counting wrapper around an open set / Envoltório que conta operações da lista aberta"""
+    def __init__(self, inner, instrument, closed, generation):
+        self.inner = inner
+        self.instrument = instrument
+        self.closed = closed  # Closed stamps of the search / Carimbos de fechados da busca
+        self.generation = generation
+        self.size = 0  # Live open nodes / Nós abertos válidos
+        self.last_popped = -1  # Node returned by the last pop / Nó devolvido pelo último pop
+
+    @property
+    def pushes(self):
+        return self.inner.pushes
+
+    @property
+    def stale_pops(self):
+        return self.inner.stale_pops
+
+    def push(self, node, f, h):
+        counters = self.instrument.counters
+        if self.closed[node] == self.generation:
+            counters['reopenings'] += 1
+        self.inner.push(node, f, h)
+        self.size += 1
+        if self.size > counters['max_open_size']:
+            counters['max_open_size'] = self.size
+
+    def decrease_key(self, node, f, h):
+        self.inner.decrease_key(node, f, h)
+        self.instrument.counters['decrease_keys'] += 1
+
+    def pop(self):
+        node = self.inner.pop()
+        if node >= 0:
+            self.size -= 1
+        self.last_popped = node
+        return node
+
+
+class _QueueProbe:
+    """Counts reported by a search that keeps its own queues / Contagens de uma busca com filas próprias"""
+    def __init__(self, counters):
+        self.counters = counters
+        self.size = 0  # Live open nodes / Nós abertos válidos
+        self.last_popped = -1  # Node expanded last / Último nó expandido
+        self.stale_pops = 0  # Stale entries skipped / Entradas obsoletas ignoradas
+
+    def opened(self, reopening=False):
+        """A node joined the open set / Um nó entrou na lista aberta"""
+        counters = self.counters
+        if reopening:
+            counters['reopenings'] += 1
+        self.size += 1
+        if self.size > counters['max_open_size']:
+            counters['max_open_size'] = self.size
+
+    def expanded(self, node):
+        """A node left the open set for expansion / Um nó saiu da lista aberta para ser expandido"""
+        self.size -= 1
+        self.last_popped = node
+
+
+class Instrumentation:
+    """Counters, timings and events of searches / Contadores, tempos e eventos de buscas
+
+    Counters add up over every search run with this instrument; call
+    reset() between searches to measure them one by one.
+    Os contadores somam todas as buscas feitas com este instrumento; use
+    reset() entre buscas para medi-las separadamente.
+    """
+    def __init__(self, timing=False, on_event=None, sample_every=1):
+        self.timing = timing  # Record phase spans / Registra intervalos das fases
+        self.on_event = on_event  # on_event(name, data) callback / Callback on_event(nome, dados)
+        self.sample_every = sample_every  # Expansions between trace samples / Expansões entre amostras do trace
+        self.reset()
+
+    def reset(self):
+        """Zero every counter and drop recorded spans / Zera os contadores e descarta os intervalos"""
+        self.counters = dict.fromkeys(COUNTERS, 0)  # Counter values / Valores dos contadores
+        self.heuristic_time = 0.0  # Seconds spent in the heuristic / Segundos gastos na heurística
+        self.field_time = None  # Seconds to fetch the h field, None without one / Segundos para obter o campo h
+        self.phase_times = {}  # Seconds per phase / Segundos por fase
+        self.spans = []  # (phase, begin, end) in perf_counter seconds / Intervalos das fases
+        self.samples = []  # (time, expansions, open size) / Amostras para o trace
+        self.origin = time.perf_counter()  # Zero of trace timestamps / Zero dos tempos do trace
+
+    # Hooks used by the search core / Ganchos usados pelo núcleo de busca
+
+    def open_set(self, open_nodes, closed, generation):
+        """Wrap an open set for counting / Envolve uma lista aberta para contagem"""
+        self._open_probe = _OpenSetProbe(open_nodes, self, closed, generation)
+        return self._open_probe
+
+    def queue_probe(self):
+        """Counter for a search with its own queues / Contador para uma busca com filas próprias
+
+        The search calls opened() and expanded() on it and adds to
+        `stale_pops` itself, as bidirectional.py does.
+        A busca chama opened() e expanded() e soma `stale_pops` ela mesma.
+        """
+        self._open_probe = _QueueProbe(self.counters)
+        return self._open_probe
+
+    def heuristic(self, function):
+        """Wrap a heuristic to time it / Envolve uma heurística para cronometrá-la"""
+        clock = time.perf_counter
+        counters = self.counters
+
+        def timed(point_a, point_b, h_type):
+            began = clock()
+            value = function(point_a, point_b, h_type)
+            self.heuristic_time += clock() - began
+            counters['heuristic_calls'] += 1
+            return value
+        return timed
+
+    def field(self, function):
+        """Wrap an h-field getter to time it / Envolve a obtenção de um campo h para cronometrá-la"""
+        clock = time.perf_counter
+
+        def timed(*args):
+            began = clock()
+            values = function(*args)
+            self.field_time = (self.field_time or 0.0) + clock() - began
+            return values
+        return timed
+
+    def moves(self, moves):
+        """Wrap a move list to count neighbor checks / Envolve uma lista de movimentos para contar vizinhos"""
+        return _CountedMoves(moves, self.counters)
+
+    def successors(self, function):
+        """Wrap a successor generator to count neighbor checks / Envolve um gerador de sucessores"""
+        counters = self.counters
+
+        def counted(*args):
+            for successor in function(*args):
+                counters['neighbor_checks'] += 1
+                yield successor
+        return counted
+
+    def wrap(self, steps, grid):
+        """Instrumented view of a search generator / Visão instrumentada de um gerador de busca
+
+        Time spent by the caller between expansions (drawing, sleeping) is
+        not counted in any phase.
+        O tempo gasto por quem chama entre as expansões não entra em fase
+        nenhuma.
+        """
+        self._open_probe = None
+        clock = time.perf_counter
+        counters = self.counters
+        rows, cols = grid.rows, grid.cols
+        emit = self.on_event
+        if emit is not None:
+            emit('start', {'rows': rows, 'cols': cols})
+
+        began = resumed = clock()
+        phase = 'setup'
+        try:
+            while True:
+                try:
+                    progress = next(steps)
+                except StopIteration as stop:
+                    result = stop.value
+                    break
+                now = clock()
+                self._record(phase, resumed, now)
+                phase = 'expand'
+
+                counters['expansions'] += 1
+                probe = self._open_probe
+                node = probe.last_popped if probe is not None else -1
+                open_size = probe.size if probe is not None else 0
+                if self.timing and counters['expansions'] % self.sample_every == 0:
+                    self.samples.append((now, counters['expansions'], open_size))
+                if emit is not None:
+                    emit('expand', {'cell': divmod(node, cols) if node >= 0 else None,
+                                    'expansions': counters['expansions'], 'open_size': open_size})
+                yield progress
+                resumed = clock()
+        finally:
+            steps.close()
+
+        ended = clock()
+        self._record(phase, resumed, ended)
+        if self.timing:
+            self.spans.append(('search', began, ended))
+        probe = self._open_probe
+        counters['pushes'] += getattr(result, 'pushes', 0)
+        if probe is not None:
+            counters['stale_pops'] += probe.stale_pops
+        if emit is not None:
+            emit('finish', {'found': result.found, 'cost': result.cost, **self.stats()})
+        return result
+
+    def _record(self, phase, began, ended):
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + ended - began
+        if self.timing and phase == 'setup':
+            self.spans.append((phase, began, ended))
+
+    # Export / Exportação
+
+    @property
+    def heuristic_ms(self):
+        """Heuristic and h-field time in ms, None if neither ran / Tempo da heurística e do campo, ou None"""
+        if not self.counters['heuristic_calls'] and self.field_time is None:
+            return None
+        return 1000 * (self.heuristic_time + (self.field_time or 0.0))
+
+    def stats(self):
+        """Counters and timings as a plain dict / Contadores e tempos como dicionário
+
+        `heuristic_ms` is None when no heuristic was computed during the
+        search and no h field was fetched through field().
+        `heuristic_ms` é None quando nenhuma heurística foi calculada nem
+        obtida por field().
+        """
+        stats = dict(self.counters)
+        stats['heuristic_ms'] = self.heuristic_ms
+        stats['phase_ms'] = {phase: 1000 * seconds for phase, seconds in self.phase_times.items()}
+        return stats
+
+    def to_json(self, indent=2):
+        """Stats as a JSON string / Estatísticas como texto JSON"""
+        return json.dumps(self.stats(), indent=indent)
+
+    def save_json(self, path):
+        """Write the stats as JSON / Grava as estatísticas em JSON"""
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(self.to_json())
+
+    def chrome_trace(self):
+        """Trace Event Format dict / Dicionário no formato Trace Event
+
+        Phases become complete ('X') events and samples become counter ('C')
+        events, readable by chrome://tracing, Perfetto and speedscope.
+        Fases viram eventos 'X' e amostras viram contadores 'C'.
+        """
+        def micros(moment):
+            return (moment - self.origin) * 1e6
+
+        events = [{'name': phase, 'cat': 'search', 'ph': 'X', 'ts': micros(began),
+                   'dur': (ended - began) * 1e6, 'pid': 1, 'tid': 1}
+                  for phase, began, ended in self.spans]
+        events += [{'name': 'search', 'ph': 'C', 'ts': micros(moment), 'pid': 1,
+                    'args': {'expansions': expansions, 'open_size': open_size}}
+                   for moment, expansions, open_size in self.samples]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': self.stats()}
+
+    def save_chrome_trace(self, path):
+        """Write a Chrome trace JSON file / Grava um arquivo de trace do Chrome"""
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(self.chrome_trace(), handle)
+
+    def collapsed_stacks(self):
+        """Folded stacks for flamegraph.pl / Pilhas dobradas para o flamegraph.pl
+
+        One 'search;phase microseconds' line per phase, with heuristic time
+        nested under expansion.
+        """
+        phase_us = {phase: int(seconds * 1e6) for phase, seconds in self.phase_times.items()}
+        heuristic_us = int(self.heuristic_time * 1e6)
+        lines = []
+        for phase, micros in phase_us.items():
+            if phase == 'expand' and self.counters['heuristic_calls']:
+                lines.append(f"search;expand;heuristic {min(heuristic_us, micros)}")
+                micros = max(micros - heuristic_us, 0)
+            lines.append(f"search;{phase} {micros}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,210 @@
+"""Jump Point Search / Busca por pontos de salto
+
+Jump Point Search (Harabor & Grastien) for uniform-cost 8-connected grids
+where diagonal moves may not cut wall corners. Straight and diagonal runs are
+scanned without touching the open set and only jump points are expanded, so
+open areas cost a handful of expansions instead of a flood fill. With a
+consistent heuristic (octile or euclidean) the path cost equals that of
+8-connected A* in `pathfinding`.
+Busca por pontos de salto para grades 8-conectadas de custo uniforme, sem
+cortar cantos. Apenas pontos de salto são expandidos, e o custo do caminho é
+igual ao do A* 8-conectado com heurística consistente.
+"""
+from grid_map import WALL
+from pathfinding import (INF, SQRT2, ClosedSetView, GScoreView, SearchResult,
+                         as_grid_map, calculate_heuristic, resolve_open_set, trace_path)
+
+# All eight directions / Todas as oito direções
+DIRECTIONS_8 = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+
+def expand_jump_path(points):
+    """Fill the straight/diagonal runs between jump points / Preenche os trechos entre pontos de salto"""
+    if not points:
+        return []
+    path = [points[0]]
+    for (row, col), (next_row, next_col) in zip(points, points[1:]):
+        d_row, d_col = _sign(next_row - row), _sign(next_col - col)
+        while (row, col) != (next_row, next_col):
+            row += d_row
+            col += d_col
+            path.append((row, col))
+    return path
+
+
+def iter_jump_point_search(grid, start, end, heuristic_type, buffers, open_set='auto', h_field=None, weight=1,
+                           instrument=None):
+    """Jump Point Search as a generator / Busca por pontos de salto como gerador
+
+    Reached through pathfinding.find_path(..., algorithm='jps') or
+    iter_search(); yields (g_scores, explored) per expansion and returns the
+    SearchResult. The result's `explored` holds the expanded jump points and
+    `jump_points` every jump point that was generated. `h_field` is an
+    optional flat sequence of precomputed h-values; `weight` scales h as in
+    Weighted A*; `instrument` is an optional instrumentation.Instrumentation.
+    Usado por pathfinding.find_path(..., algorithm='jps') ou iter_search().
+    """
+    grid = as_grid_map(grid)
+    rows, cols = grid.rows, grid.cols
+    cells = grid.cells
+
+    generation = buffers.begin(grid.size)
+    g, parent, seen, closed = buffers.g, buffers.parent, buffers.seen, buffers.closed
+    g_scores = GScoreView(buffers, generation, cols)
+    explored = ClosedSetView(buffers, generation, cols, 0)
+
+    start_index = start[0] * cols + start[1]
+    end_index = end[0] * cols + end[1]
+
+    def walkable(row, col):
+        return 0 <= row < rows and 0 <= col < cols and cells[row * cols + col] != WALL
+
+    def jump(row, col, d_row, d_col):
+        """Scan from a cell until a jump point, or -1 / Varre a partir de uma célula até um ponto de salto, ou -1"""
+        while True:
+            row += d_row
+            col += d_col
+            if not walkable(row, col):
+                return -1
+            index = row * cols + col
+            if index == end_index:
+                return index
+            if d_row and d_col:
+                # A diagonal stops where a straight scan finds something / A diagonal para onde uma varredura reta encontra algo
+                if jump(row, col, d_row, 0) >= 0 or jump(row, col, 0, d_col) >= 0:
+                    return index
+                if not (walkable(row + d_row, col) and walkable(row, col + d_col)):
+                    return -1
+            elif d_row:
+                # Forced neighbor: side open, side behind blocked / Vizinho forçado: lado livre, lado de trás bloqueado
+                if ((walkable(row, col - 1) and not walkable(row - d_row, col - 1)) or
+                        (walkable(row, col + 1) and not walkable(row - d_row, col + 1))):
+                    return index
+            elif ((walkable(row - 1, col) and not walkable(row - 1, col - d_col)) or
+                    (walkable(row + 1, col) and not walkable(row + 1, col - d_col))):
+                return index
+
+    def successor_directions(row, col, parent_index):
+        """Directions left after pruning / Direções que restam após a poda"""
+        if parent_index < 0:
+            return [(d_row, d_col) for d_row, d_col in DIRECTIONS_8
+                    if not (d_row and d_col) or (walkable(row + d_row, col) and walkable(row, col + d_col))]
+
+        parent_row, parent_col = divmod(parent_index, cols)
+        d_row, d_col = _sign(row - parent_row), _sign(col - parent_col)
+        directions = []
+        if d_row and d_col:
+            vertical_open = walkable(row + d_row, col)
+            horizontal_open = walkable(row, col + d_col)
+            if vertical_open:
+                directions.append((d_row, 0))
+            if horizontal_open:
+                directions.append((0, d_col))
+            if vertical_open and horizontal_open:
+                directions.append((d_row, d_col))
+        elif d_row:
+            left_open = walkable(row, col - 1)
+            right_open = walkable(row, col + 1)
+            if walkable(row + d_row, col):
+                directions.append((d_row, 0))
+                if left_open:
+                    directions.append((d_row, -1))
+                if right_open:
+                    directions.append((d_row, 1))
+            if left_open:
+                directions.append((0, -1))
+            if right_open:
+                directions.append((0, 1))
+        else:
+            up_open = walkable(row - 1, col)
+            down_open = walkable(row + 1, col)
+            if walkable(row, col + d_col):
+                directions.append((0, d_col))
+                if up_open:
+                    directions.append((-1, d_col))
+                if down_open:
+                    directions.append((1, d_col))
+            if up_open:
+                directions.append((-1, 0))
+            if down_open:
+                directions.append((1, 0))
+        return directions
+
+    g[start_index] = 0
+    parent[start_index] = -1
+    seen[start_index] = generation
+
+    open_nodes = buffers.open_set(resolve_open_set(open_set, heuristic_type, 8, weight))
+    open_nodes.reset(generation)
+    heuristic = calculate_heuristic
+    if instrument is not None:
+        open_nodes = instrument.open_set(open_nodes, closed, generation)
+        heuristic = instrument.heuristic(calculate_heuristic)
+        successor_directions = instrument.successors(successor_directions)
+    if h_field is not None:
+        start_h = h_field[start_index] * weight
+    else:
+        start_h = heuristic(start, end, heuristic_type) * weight
+    open_nodes.push(start_index, start_h, start_h)
+    pop, push, decrease_key = open_nodes.pop, open_nodes.push, open_nodes.decrease_key
+    jump_points = [start_index]
+    progress = (g_scores, explored)
+    closed_count = 0
+    found = False
+
+    while True:
+        current = pop()
+        if current < 0:
+            break
+
+        if current == end_index:
+            found = True
+            break
+
+        closed[current] = generation
+        closed_count += 1
+        explored.count = closed_count
+        yield progress
+
+        row, col = divmod(current, cols)
+        current_g = g[current]
+        for d_row, d_col in successor_directions(row, col, parent[current]):
+            point = jump(row, col, d_row, d_col)
+            if point < 0 or closed[point] == generation:
+                continue
+
+            point_row, point_col = divmod(point, cols)
+            steps = max(abs(point_row - row), abs(point_col - col))
+            tentative_g = current_g + steps * (SQRT2 if d_row and d_col else 1)
+            if seen[point] != generation:
+                parent[point] = current
+                g[point] = tentative_g
+                seen[point] = generation
+                jump_points.append(point)
+                if h_field is not None:
+                    h_score = h_field[point]
+                else:
+                    h_score = heuristic((point_row, point_col), end, heuristic_type)
+                h_score *= weight
+                push(point, tentative_g + h_score, h_score)
+            elif tentative_g < g[point]:
+                parent[point] = current
+                g[point] = tentative_g
+                if h_field is not None:
+                    h_score = h_field[point]
+                else:
+                    h_score = heuristic((point_row, point_col), end, heuristic_type)
+                h_score *= weight
+                decrease_key(point, tentative_g + h_score, h_score)
+
+    explored.count = closed_count
+    buffers.closed_count = closed_count
+    jump_cells = [divmod(point, cols) for point in jump_points]
+    if not found:
+        return SearchResult([], INF, g_scores, explored, closed_count, open_nodes.pushes, jump_cells)
+    path = expand_jump_path(trace_path(parent, start_index, end_index, cols))
+    return SearchResult(path, g[end_index], g_scores, explored, closed_count, open_nodes.pushes, jump_cells)
@@ -0,0 +1,522 @@
+"""Landmark (ALT) heuristics and first-move tables / Heurísticas de marcos (ALT) e tabelas de primeiro movimento
+
+Preprocessing for many queries on a static map. A few landmark cells are
+picked around the edge of the map and a Dijkstra search from each one
+stores its distance to every cell. By the triangle inequality, for any
+landmark L the distance from n to the goal t is at least
+d(L, t) - d(L, n) and d(n, L) - d(t, L), and the largest of these bounds
+over all landmarks (ALT: A*, Landmarks, Triangle inequality) is an
+admissible heuristic that knows about walls, unlike the geometric ones in
+pathfinding.calculate_heuristic. The landmark searches are independent, so
+they run on a process pool with the grid in shared memory, as in batch.py.
+Pré-processamento para muitas consultas num mapa estático. Alguns marcos
+são escolhidos na borda do mapa e uma busca de Dijkstra a partir de cada um
+guarda sua distância a todas as células. Pela desigualdade triangular, isso
+dá uma heurística admissível que conhece as paredes. As buscas dos marcos
+são independentes e rodam num pool de processos.
+
+A first-move table goes further: for every pair of cells it stores the
+first step of an optimal path, so a query becomes a walk of table lookups
+with no search at all. Each source's row is run-length encoded over the
+targets in row-major order, with walls as wildcards that extend the
+current run. Building it takes one Dijkstra per free cell, so it is meant
+for small maps (see FIRST_MOVE_MAX_CELLS).
+Uma tabela de primeiro movimento guarda, para cada par de células, o
+primeiro passo de um caminho ótimo, e uma consulta vira uma sequência de
+leituras sem busca. Cada linha é comprimida por run-length. Construí-la
+exige um Dijkstra por célula livre, então serve para mapas pequenos.
+
+Both are saved with a digest of the grid contents: loading them for a grid
+that has changed since raises ValueError, and landmark_tables() rebuilds
+them whenever GridMap.version moves on.
+Ambos são gravados com um resumo do conteúdo da grade: carregá-los para
+uma grade alterada gera ValueError, e landmark_tables() os refaz sempre que
+GridMap.version muda.
+
+    tables = landmark_tables(grid, count=16, connectivity=8, path='arena.alt')
+    result = find_path(grid, start, end, 'octile', connectivity=8, h_field=tables.h_field(end, 'octile'))
+"""
+import bisect
+import hashlib
+import heapq
+import math
+import multiprocessing
+import os
+import struct
+import weakref
+from array import array
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from grid_map import GridMap, WALL
+from pathfinding import INF, MOVES_4, MOVES_8, as_grid_map
+from result_cache import CachedResult
+
+ALT_MAGIC = b'ALTL'  # First bytes of a landmark file / Primeiros bytes de um arquivo de marcos
+FIRST_MOVE_MAGIC = b'FMDB'  # First bytes of a first-move file / Primeiros bytes de um arquivo de primeiro movimento
+FORMAT_VERSION = 1  # Version of both formats / Versão dos dois formatos
+# magic, version, rows, cols, connectivity, count, directed, min cost, grid digest
+HEADER = struct.Struct('<4sI5id32s')
+HEADER_SIZE = 128  # Header bytes, keeping the tables 8-byte aligned / Bytes de cabeçalho, mantendo as tabelas alinhadas
+NO_MOVE = 255  # First move of an unreachable target / Primeiro movimento de um alvo inalcançável
+FIRST_MOVE_MAX_CELLS = 4096  # Largest map for a first-move table / Maior mapa para uma tabela de primeiro movimento
+
+_tables = weakref.WeakKeyDictionary()  # grid -> {(count, connectivity): LandmarkTables} / Tabelas por grade
+
+# Per-worker grid set by _init_worker / Grade de cada processo definida por _init_worker
+_worker_memory = None
+_worker_grid = None
+
+
+def grid_digest(grid):
+    """Digest of a grid's size, cells and costs / Resumo do tamanho, células e custos de uma grade"""
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(struct.pack('<ii', grid.rows, grid.cols))
+    digest.update(grid.cells)
+    if grid.costs is not None:
+        digest.update(grid.costs)
+    return digest.digest()
+
+
+def dijkstra(grid, source, connectivity=4, reverse=False, first_moves=None):
+    """Cost from `source` to every cell / Custo de `source` até cada célula
+
+    With `reverse`, the cost from every cell to `source` instead; the two
+    differ only on weighted terrain, where a move costs the weight of the
+    cell it enters. `first_moves`, a bytearray of grid.size, receives the
+    index into MOVES_4/MOVES_8 of the first step from `source` towards each
+    cell, NO_MOVE where there is none.
+    Com `reverse`, o custo de cada célula até `source`. `first_moves`
+    recebe o índice do primeiro passo a partir de `source` rumo a cada
+    célula.
+    """
+    rows, cols, cells, costs, size = grid.rows, grid.cols, grid.cells, grid.costs, grid.size
+    moves = [(d_row, d_col, d_row * cols + d_col, length)
+             for d_row, d_col, length in (MOVES_8 if connectivity == 8 else MOVES_4)]
+    distances = array('d', [INF]) * size
+    distances[source] = 0.0
+    heap = [(0.0, source)]
+
+    while heap:
+        distance, current = heapq.heappop(heap)
+        if distance > distances[current]:
+            continue
+        x, y = divmod(current, cols)
+        entered = 1.0 if costs is None else costs[current]
+        for move, (d_row, d_col, delta, length) in enumerate(moves):
+            row = x + d_row
+            col = y + d_col
+            if row < 0 or row >= rows or col < 0 or col >= cols:
+                continue
+            neighbor = current + delta
+            if cells[neighbor] == WALL:
+                continue
+            # Diagonals may not cut a wall corner / Diagonais não podem cortar o canto de uma parede
+            if d_row and d_col and (cells[current + d_col] == WALL or cells[current + d_row * cols] == WALL):
+                continue
+            if costs is None:
+                step = length
+            else:
+                # Reversed, the move runs from neighbor into current / Invertido, o passo vai do vizinho para current
+                step = length * (entered if reverse else costs[neighbor])
+            candidate = distance + step
+            if candidate < distances[neighbor]:
+                distances[neighbor] = candidate
+                if first_moves is not None:
+                    first_moves[neighbor] = move if current == source else first_moves[current]
+                heapq.heappush(heap, (candidate, neighbor))
+    return distances
+
+
+def select_landmarks(grid, count):
+    """Free cells spread around the map's edge / Células livres espalhadas pela borda do mapa
+
+    Planar selection: the free cells are split into `count` angular sectors
+    around their centroid and the cell farthest from it is taken in each.
+    Seleção planar: as células livres são divididas em setores ao redor do
+    centroide e a mais distante dele é escolhida em cada setor.
+    """
+    free = np.flatnonzero(np.frombuffer(grid.cells, np.uint8) != WALL)
+    if free.size == 0:
+        return []
+    rows, cols = np.divmod(free, grid.cols)
+    d_row = rows - rows.mean()
+    d_col = cols - cols.mean()
+    sector = ((np.arctan2(d_row, d_col) + math.pi) / (2 * math.pi) * count).astype(np.int64) % count
+    radius = d_row * d_row + d_col * d_col
+    landmarks = []
+    for index in range(count):
+        members = np.flatnonzero(sector == index)
+        if members.size:
+            landmarks.append(int(free[members[np.argmax(radius[members])]]))
+    return landmarks
+
+
+def _init_worker(memory_name, rows, cols, weighted):
+    """Attach the shared grid in a worker / Conecta a grade compartilhada no processo"""
+    global _worker_memory, _worker_grid
+    _worker_memory = shared_memory.SharedMemory(name=memory_name)
+    size = rows * cols
+    cells = _worker_memory.buf[:size].toreadonly()
+    costs = _worker_memory.buf[size:size + 8 * size].cast('d') if weighted else None
+    _worker_grid = GridMap(rows, cols, cells, costs)
+
+
+def _landmark_task(task):
+    """Distance rows of one landmark / Linhas de distância de um marco"""
+    landmark, connectivity, directed = task
+    forward = dijkstra(_worker_grid, landmark, connectivity)
+    backward = dijkstra(_worker_grid, landmark, connectivity, reverse=True) if directed else None
+    return landmark, forward.tobytes(), backward.tobytes() if backward is not None else None
+
+
+def _first_move_task(task):
+    """Compressed first-move rows of a range of sources / Linhas comprimidas de uma faixa de origens"""
+    sources, connectivity = task
+    return [(source, *_first_move_row(_worker_grid, source, connectivity)) for source in sources]
+
+
+def _first_move_row(grid, source, connectivity):
+    """Run-length encoded first moves from one cell / Primeiros movimentos de uma célula em run-length
+
+    Returns (run starts, run moves). Walls and the source itself take the
+    move of the current run, since no query ever asks for them.
+    Paredes e a própria origem herdam o movimento da sequência atual.
+    """
+    cells = grid.cells
+    moves = bytearray([NO_MOVE]) * grid.size
+    if cells[source] != WALL:
+        dijkstra(grid, source, connectivity, first_moves=moves)
+    starts = array('I')
+    values = bytearray()
+    for target, move in enumerate(moves):
+        if (cells[target] == WALL or target == source) and values:
+            continue
+        if not values or values[-1] != move:
+            starts.append(target)
+            values.append(move)
+    return starts.tobytes(), bytes(values)
+
+
+def _map_pool(grid, function, tasks, workers):
+    """Run tasks against a shared copy of the grid / Executa tarefas sobre uma cópia compartilhada da grade
+
+    Yields results in completion order; with one worker everything runs in
+    this process. Produz os resultados na ordem de conclusão.
+    """
+    global _worker_grid
+    if workers <= 1 or len(tasks) <= 1:
+        _worker_grid = grid
+        try:
+            yield from map(function, tasks)
+        finally:
+            _worker_grid = None
+        return
+
+    size = grid.size
+    weighted = grid.costs is not None
+    memory = shared_memory.SharedMemory(create=True, size=max(size + (8 * size if weighted else 0), 1))
+    try:
+        memory.buf[:size] = grid.cells
+        if weighted:
+            memory.buf[size:size + 8 * size] = memoryview(grid.costs).cast('B')
+        with multiprocessing.Pool(workers, initializer=_init_worker,
+                                  initargs=(memory.name, grid.rows, grid.cols, weighted)) as pool:
+            yield from pool.imap_unordered(function, tasks)
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def _write_header(handle, magic, grid_shape, connectivity, count, directed, min_cost, digest):
+    rows, cols = grid_shape
+    header = HEADER.pack(magic, FORMAT_VERSION, rows, cols, connectivity, count, int(directed), min_cost, digest)
+    handle.write(header.ljust(HEADER_SIZE, b'\0'))
+
+
+def _read_header(path, magic):
+    """Header fields of a preprocessed file / Campos do cabeçalho de um arquivo pré-processado"""
+    with open(path, 'rb') as handle:
+        data = handle.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE:
+        raise ValueError(f"{path}: too short for a header")
+    fields = HEADER.unpack_from(data)
+    if fields[0] != magic or fields[1] != FORMAT_VERSION:
+        raise ValueError(f"{path}: not a version {FORMAT_VERSION} {magic.decode()} file")
+    return fields[2:]
+
+
+def _check_grid(path, grid, rows, cols, digest):
+    if grid is not None and (grid.rows, grid.cols) == (rows, cols) and grid_digest(grid) != digest:
+        raise ValueError(f"{path}: built for a different version of this map")
+    if grid is not None and (grid.rows, grid.cols) != (rows, cols):
+        raise ValueError(f"{path}: built for a {rows}x{cols} map, got {grid.rows}x{grid.cols}")
+
+
+class LandmarkTables:
+    """Distances between landmarks and every cell / Distâncias entre os marcos e cada célula
+
+    `forward[i, n]` is the cost from landmark i to cell n and
+    `backward[i, n]` the cost from n to the landmark; on uniform-cost grids
+    both are the same array. Tables are only admissible for searches with
+    the connectivity they were built for.
+    `forward[i, n]` é o custo do marco i até n e `backward[i, n]` o custo
+    de n até o marco. As tabelas só são admissíveis para buscas com a
+    conectividade usada na construção.
+    """
+    def __init__(self, rows, cols, connectivity, landmarks, forward, backward, min_cost, digest):
+        self.rows = rows  # Grid rows / Linhas da grade
+        self.cols = cols  # Grid columns / Colunas da grade
+        self.connectivity = connectivity  # 4 or 8 / 4 ou 8
+        self.landmarks = landmarks  # Flat landmark indices / Índices planos dos marcos
+        self.forward = forward  # (count, size) costs from landmarks / Custos a partir dos marcos
+        self.backward = backward  # (count, size) costs to landmarks / Custos até os marcos
+        self.min_cost = min_cost  # Cheapest free cell, 1 on uniform grids / Célula livre mais barata
+        self.digest = digest  # grid_digest() of the source grid / Resumo da grade de origem
+        self.version = None  # GridMap.version the tables match / Versão da grade correspondente
+
+    @property
+    def directed(self):
+        """Whether costs depend on direction / Se os custos dependem da direção"""
+        return self.backward is not self.forward
+
+    def h_field(self, goal, heuristic_type=None):
+        """ALT heuristic towards `goal` for every cell / Heurística ALT até `goal` para todas as células
+
+        Suitable as find_path(..., h_field=...). With `heuristic_type` the
+        larger of the landmark bound and that geometric heuristic is used.
+        On weighted terrain the field is in units of the cheapest cell, as
+        terrain.py expects. Cells whose bound is undefined (other
+        components) fall back to the geometric value or 0.
+        Serve como find_path(..., h_field=...). Com `heuristic_type` usa o
+        maior entre o limite dos marcos e a heurística geométrica.
+        """
+        target = goal[0] * self.cols + goal[1]
+        field = np.zeros(self.rows * self.cols)
+        if self.landmarks:
+            with np.errstate(invalid='ignore'):
+                bounds = np.maximum(self.forward[:, target, None] - self.forward,
+                                    self.backward - self.backward[:, target, None])
+            # Unreachable landmarks give inf or nan, which bound nothing / Marcos inalcançáveis não limitam nada
+            bounds[~np.isfinite(bounds)] = 0.0
+            np.max(bounds, axis=0, out=field)
+            np.maximum(field, 0.0, out=field)
+        if self.min_cost != 1.0:
+            field /= self.min_cost
+        if heuristic_type is not None:
+            from heuristics import heuristic_field
+            np.maximum(field, heuristic_field(self.rows, self.cols, goal, heuristic_type).ravel(), out=field)
+        return field
+
+    def save(self, path):
+        """Write the tables to a file / Grava as tabelas num arquivo"""
+        with open(path, 'wb') as handle:
+            _write_header(handle, ALT_MAGIC, (self.rows, self.cols), self.connectivity, len(self.landmarks),
+                          self.directed, self.min_cost, self.digest)
+            handle.write(array('q', self.landmarks).tobytes())
+            handle.write(np.ascontiguousarray(self.forward, np.float64).tobytes())
+            if self.directed:
+                handle.write(np.ascontiguousarray(self.backward, np.float64).tobytes())
+
+    @classmethod
+    def load(cls, path, grid=None):
+        """Memory-map tables from a file / Mapeia tabelas de um arquivo em memória
+
+        With `grid`, raises ValueError unless the file was built from the
+        same contents. Com `grid`, gera ValueError se o arquivo foi feito
+        para outro conteúdo.
+        """
+        rows, cols, connectivity, count, directed, min_cost, digest = _read_header(path, ALT_MAGIC)
+        _check_grid(path, grid, rows, cols, digest)
+        size = rows * cols
+        expected = HEADER_SIZE + 8 * count + 8 * count * size * (2 if directed else 1)
+        if os.path.getsize(path) < expected:
+            raise ValueError(f"{path}: expected {expected} bytes, file is truncated")
+        landmarks = [int(value) for value in np.fromfile(path, np.int64, count, offset=HEADER_SIZE)]
+        offset = HEADER_SIZE + 8 * count
+        forward = np.memmap(path, np.float64, 'r', offset, (count, size)) if count else np.zeros((0, size))
+        backward = forward
+        if directed and count:
+            backward = np.memmap(path, np.float64, 'r', offset + 8 * count * size, (count, size))
+        return cls(rows, cols, connectivity, landmarks, forward, backward, min_cost, digest)
+
+
+def build_landmark_tables(grid, count=8, connectivity=4, workers=None):
+    """Pick landmarks and run their Dijkstra searches / Escolhe os marcos e executa seus Dijkstras
+
+    One task per landmark on a pool of `workers` processes (default: one per
+    CPU). Uma tarefa por marco num pool de `workers` processos.
+    """
+    grid = as_grid_map(grid)
+    if connectivity not in (4, 8):
+        raise ValueError(f"Connectivity must be 4 or 8, got {connectivity}")
+    landmarks = select_landmarks(grid, count)
+    directed = grid.costs is not None
+    size = grid.size
+    forward = np.empty((len(landmarks), size))
+    backward = np.empty((len(landmarks), size)) if directed else forward
+    order = {landmark: row for row, landmark in enumerate(landmarks)}
+
+    tasks = [(landmark, connectivity, directed) for landmark in landmarks]
+    for landmark, forward_bytes, backward_bytes in _map_pool(grid, _landmark_task, tasks,
+                                                             workers or os.cpu_count() or 1):
+        forward[order[landmark]] = np.frombuffer(forward_bytes, np.float64)
+        if directed:
+            backward[order[landmark]] = np.frombuffer(backward_bytes, np.float64)
+
+    min_cost = 1.0
+    if directed:
+        free_costs = np.frombuffer(grid.costs, np.float64)[np.frombuffer(grid.cells, np.uint8) != WALL]
+        min_cost = float(free_costs.min()) if free_costs.size else 1.0
+    tables = LandmarkTables(grid.rows, grid.cols, connectivity, landmarks, forward, backward, min_cost,
+                            grid_digest(grid))
+    tables.version = grid.version
+    return tables
+
+
+def landmark_tables(grid, count=8, connectivity=4, path=None, workers=None):
+    """Landmark tables matching the grid's current contents / Tabelas de marcos do conteúdo atual da grade
+
+    Kept per grid in memory and rebuilt once GridMap.version changes. With
+    `path`, a file built for the same contents is loaded instead of
+    rebuilding, and freshly built tables are written there.
+    Guardadas por grade em memória e refeitas quando a versão muda. Com
+    `path`, um arquivo do mesmo conteúdo é carregado em vez de refazer, e
+    tabelas novas são gravadas nele.
+    """
+    grid = as_grid_map(grid)
+    per_grid = _tables.setdefault(grid, {})
+    key = (count, connectivity)
+    tables = per_grid.get(key)
+    if tables is not None and tables.version == grid.version:
+        return tables
+
+    tables = None
+    if path is not None and os.path.exists(path):
+        try:
+            loaded = LandmarkTables.load(path, grid)
+        except ValueError:
+            loaded = None
+        if loaded is not None and (len(loaded.landmarks), loaded.connectivity) == key:
+            tables = loaded
+            tables.version = grid.version
+    if tables is None:
+        tables = build_landmark_tables(grid, count, connectivity, workers)
+        if path is not None:
+            tables.save(path)
+    per_grid[key] = tables
+    return tables
+
+
+class FirstMoveTable:
+    """Compressed optimal first moves between all cells / Primeiros movimentos ótimos comprimidos entre todas as células
+
+    Row `source` spans runs offsets[source]:offsets[source + 1]; run i
+    covers targets from starts[i] up to the next run with move moves[i].
+    A linha `source` ocupa as sequências offsets[source]:offsets[source + 1].
+    """
+    def __init__(self, rows, cols, connectivity, offsets, starts, moves, digest):
+        self.rows = rows  # Grid rows / Linhas da grade
+        self.cols = cols  # Grid columns / Colunas da grade
+        self.connectivity = connectivity  # 4 or 8 / 4 ou 8
+        self.offsets = offsets  # First run of each source, size + 1 entries / Primeira sequência de cada origem
+        self.starts = starts  # First target of each run / Primeiro alvo de cada sequência
+        self.moves = moves  # Move index of each run / Índice do movimento de cada sequência
+        self.digest = digest  # grid_digest() of the source grid / Resumo da grade de origem
+
+    @property
+    def runs(self):
+        """Stored runs, a measure of size / Sequências guardadas, uma medida do tamanho"""
+        return len(self.starts)
+
+    def first_move(self, source, target):
+        """Index of the first move from source to target / Índice do primeiro movimento da origem ao alvo"""
+        low, high = self.offsets[source], self.offsets[source + 1]
+        return self.moves[bisect.bisect_right(self.starts, target, low, high) - 1]
+
+    def find_path(self, grid, start, end):
+        """Optimal path by table lookups / Caminho ótimo por consultas à tabela
+
+        Returns a CachedResult with source 'first_move' and no expansions.
+        Retorna um CachedResult com origem 'first_move' e sem expansões.
+        """
+        grid = as_grid_map(grid)
+        cols = self.cols
+        moves = MOVES_8 if self.connectivity == 8 else MOVES_4
+        current = start[0] * cols + start[1]
+        target = end[0] * cols + end[1]
+        if grid.cells[current] == WALL or grid.cells[target] == WALL:
+            return CachedResult([], INF, 0, source='first_move')
+        path = [tuple(start)]
+        cost = 0.0
+        while current != target:
+            move = self.first_move(current, target)
+            if move == NO_MOVE:
+                return CachedResult([], INF, 0, source='first_move')
+            d_row, d_col, length = moves[move]
+            current += d_row * cols + d_col
+            row, col = divmod(current, cols)
+            path.append((row, col))
+            cost += length * grid.get_cost(row, col)
+        return CachedResult(path, cost, 0, source='first_move')
+
+    def save(self, path):
+        """Write the table to a file / Grava a tabela num arquivo"""
+        with open(path, 'wb') as handle:
+            _write_header(handle, FIRST_MOVE_MAGIC, (self.rows, self.cols), self.connectivity, len(self.starts),
+                          False, 1.0, self.digest)
+            handle.write(self.offsets.tobytes())
+            handle.write(self.starts.tobytes())
+            handle.write(self.moves)
+
+    @classmethod
+    def load(cls, path, grid=None):
+        """Read a table from a file / Lê uma tabela de um arquivo
+
+        With `grid`, raises ValueError unless the file was built from the
+        same contents. Com `grid`, gera ValueError se o arquivo foi feito
+        para outro conteúdo.
+        """
+        rows, cols, connectivity, runs, _, _, digest = _read_header(path, FIRST_MOVE_MAGIC)
+        _check_grid(path, grid, rows, cols, digest)
+        with open(path, 'rb') as handle:
+            handle.seek(HEADER_SIZE)
+            offsets = array('I')
+            offsets.fromfile(handle, rows * cols + 1)
+            starts = array('I')
+            starts.fromfile(handle, runs)
+            moves = handle.read(runs)
+        if len(moves) != runs:
+            raise ValueError(f"{path}: expected {runs} runs, file is truncated")
+        return cls(rows, cols, connectivity, offsets, starts, moves, digest)
+
+
+def build_first_move_table(grid, connectivity=4, workers=None, max_cells=FIRST_MOVE_MAX_CELLS):
+    """One Dijkstra per cell, compressed per source / Um Dijkstra por célula, comprimido por origem
+
+    Sources are split into chunks across a pool of `workers` processes.
+    Raises ValueError for grids above `max_cells` cells.
+    As origens são divididas entre `workers` processos. Gera ValueError
+    para grades com mais de `max_cells` células.
+    """
+    grid = as_grid_map(grid)
+    size = grid.size
+    if size > max_cells:
+        raise ValueError(f"A first-move table needs one Dijkstra per cell; {size} cells exceed {max_cells}")
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, -(-size // (4 * workers)))
+    tasks = [(range(first, min(first + chunk, size)), connectivity) for first in range(0, size, chunk)]
+    rows = [None] * size
+    for finished in _map_pool(grid, _first_move_task, tasks, workers):
+        for source, starts, moves in finished:
+            rows[source] = (starts, moves)
+
+    offsets = array('I', [0])
+    starts = array('I')
+    moves = bytearray()
+    for row_starts, row_moves in rows:
+        starts.frombytes(row_starts)
+        moves += row_moves
+        offsets.append(len(moves))
+    return FirstMoveTable(grid.rows, grid.cols, connectivity, offsets, starts, bytes(moves), grid_digest(grid))
@@ -0,0 +1,300 @@
+"""Map file formats / Formatos de arquivo de mapa
+
+Readers for the MovingAI benchmark formats (https://movingai.com/benchmarks/):
+`.map` grids and `.scen` scenario lists. In `.map` files '.', 'G' and 'S'
+are passable and every other terrain is treated as a wall.
+Leitores dos formatos de benchmark do MovingAI: grades `.map` e listas de
+cenários `.scen`. Em `.map`, '.', 'G' e 'S' são livres e o resto é parede.
+
+The native `.gmap` format is a 64-byte header (magic, format version,
+rows, cols, start and end, -1 when unset, and flags) followed by one byte
+per cell in the row-major layout of GridMap.cells. With GMAP_HAS_COSTS set,
+the cells are padded to a multiple of 8 bytes and followed by one
+little-endian float64 cost per cell, the layout of GridMap.costs. Cells stay
+one byte each instead of one bit so that load_grid_map() can memory-map the
+file and hand the mapping to GridMap as is: the search reads the page cache
+directly and nothing is copied into Python lists. Version 1 files, with a
+32-byte header and no flags, are still read.
+O formato nativo `.gmap` é um cabeçalho de 64 bytes seguido de um byte por
+célula, na mesma ordem de GridMap.cells, e, com GMAP_HAS_COSTS, de um
+float64 de custo por célula. Um byte por célula (e não um bit) permite que
+load_grid_map() mapeie o arquivo em memória e o entregue ao GridMap sem
+cópia. Arquivos da versão 1 continuam legíveis.
+
+Occupancy images (PGM, PNG) and plain text maps can be imported with
+import_map().
+Imagens de ocupação (PGM, PNG) e mapas em texto são importados por
+import_map().
+"""
+import mmap
+import os
+import struct
+
+from grid_map import FREE, GridMap, WALL
+
+MOVINGAI_PASSABLE = frozenset('.GS')  # Passable terrain symbols / Símbolos de terreno livre
+GMAP_MAGIC = b'GMAP'  # First bytes of a .gmap file / Primeiros bytes de um .gmap
+GMAP_VERSION = 2  # Format version written / Versão do formato gravada
+GMAP_HEADER = struct.Struct('<4sI6iI')  # magic, version, rows, cols, start, end, flags
+GMAP_HEADER_SIZES = {1: 32, 2: 64}  # Header bytes before the cells per version / Bytes de cabeçalho por versão
+GMAP_HAS_COSTS = 1  # Flag: a cost section follows the cells / Flag: uma seção de custos segue as células
+TEXT_FREE = frozenset('.0 ')  # Passable symbols of text maps / Símbolos livres de mapas em texto
+
+
+class MapScenario:
+    """One MovingAI query / Uma consulta do MovingAI"""
+    def __init__(self, bucket, map_name, start, end, optimal_length):
+        self.bucket = bucket  # Difficulty bucket / Faixa de dificuldade
+        self.map_name = map_name  # Map file the query refers to / Arquivo de mapa da consulta
+        self.start = start  # (row, col) start / Início (linha, coluna)
+        self.end = end  # (row, col) goal / Objetivo (linha, coluna)
+        self.optimal_length = optimal_length  # Octile optimal cost / Custo ótimo octile
+
+
+def _check_size(path, rows, cols):
+    """Reject maps without cells / Rejeita mapas sem células"""
+    if rows <= 0 or cols <= 0:
+        raise ValueError(f"{path}: map has no cells ({rows}x{cols})")
+
+
+def _check_endpoint(path, name, row, col, rows, cols):
+    """Endpoint read from a file, None if unset / Extremo lido de um arquivo, None se ausente"""
+    if row < 0 and col < 0:
+        return None
+    if not (0 <= row < rows and 0 <= col < cols):
+        raise ValueError(f"{path}: {name} ({row}, {col}) lies outside the {rows}x{cols} map")
+    return row, col
+
+
+def load_movingai_map(path):
+    """Read a MovingAI `.map` file / Lê um arquivo `.map` do MovingAI"""
+    with open(path, encoding='ascii') as handle:
+        header = {}
+        for line in handle:
+            line = line.strip()
+            if line == 'map':
+                break
+            if line:
+                key, _, value = line.partition(' ')
+                header[key] = value.strip()
+        rows, cols = int(header['height']), int(header['width'])
+        _check_size(path, rows, cols)
+        cells = bytearray(rows * cols)
+        for row in range(rows):
+            line = handle.readline().rstrip('\r\n')
+            if len(line) < cols:
+                raise ValueError(f"{path}: row {row} has {len(line)} cells, expected {cols}")
+            cells[row * cols:(row + 1) * cols] = bytes(
+                FREE if symbol in MOVINGAI_PASSABLE else WALL for symbol in line[:cols])
+    return GridMap(rows, cols, cells)
+
+
+def load_movingai_scenarios(path):
+    """Read a MovingAI `.scen` file / Lê um arquivo `.scen` do MovingAI"""
+    scenarios = []
+    with open(path, encoding='ascii') as handle:
+        for line in handle:
+            fields = line.split()
+            if len(fields) < 9 or fields[0] == 'version':
+                continue
+            bucket, map_name = int(fields[0]), fields[1]
+            start_x, start_y, goal_x, goal_y = (int(value) for value in fields[4:8])
+            scenarios.append(MapScenario(bucket, map_name, (start_y, start_x), (goal_y, goal_x),
+                                         float(fields[8])))
+    return scenarios
+
+
+def save_movingai_map(grid, path):
+    """Write a grid as a MovingAI `.map` file / Grava a grade como arquivo `.map` do MovingAI"""
+    cols = grid.cols
+    with open(path, 'w', encoding='ascii') as handle:
+        handle.write(f"type octile\nheight {grid.rows}\nwidth {cols}\nmap\n")
+        for row in range(grid.rows):
+            line = grid.cells[row * cols:(row + 1) * cols]
+            handle.write(''.join('@' if value == WALL else '.' for value in line) + '\n')
+
+
+def scenario_map_path(scen_path, scenario):
+    """Map file of a scenario, relative to the `.scen` file / Mapa de um cenário, relativo ao `.scen`"""
+    return os.path.join(os.path.dirname(scen_path), os.path.basename(scenario.map_name))
+
+
+def save_grid_map(grid, path, start=None, end=None):
+    """Write a grid as a `.gmap` file / Grava a grade como arquivo `.gmap`"""
+    start_row, start_col = start if start is not None else (-1, -1)
+    end_row, end_col = end if end is not None else (-1, -1)
+    flags = GMAP_HAS_COSTS if grid.costs is not None else 0
+    header = GMAP_HEADER.pack(GMAP_MAGIC, GMAP_VERSION, grid.rows, grid.cols,
+                              start_row, start_col, end_row, end_col, flags)
+    with open(path, 'wb') as handle:
+        handle.write(header.ljust(GMAP_HEADER_SIZES[GMAP_VERSION], b'\0'))
+        handle.write(grid.cells)
+        if flags & GMAP_HAS_COSTS:
+            # Keep the costs 8-byte aligned for mapping / Mantém os custos alinhados a 8 bytes
+            handle.write(bytes(-grid.size % 8))
+            handle.write(memoryview(grid.costs).cast('B'))
+
+
+def load_grid_map(path, writable=False):
+    """Memory-map a `.gmap` file / Mapeia um arquivo `.gmap` em memória
+
+    Returns (grid, start, end); start and end are None when the file has
+    none. The grid's cells and costs are views of the mapping, read-only by
+    default; with `writable` the mapping is copy-on-write, so edits stay in
+    memory and never reach the file.
+    Retorna (grade, início, fim). As células e os custos são visões do
+    mapeamento, somente leitura por padrão; com `writable` as edições ficam
+    só na memória.
+    """
+    with open(path, 'rb') as handle:
+        mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_COPY if writable else mmap.ACCESS_READ)
+    if len(mapping) < GMAP_HEADER_SIZES[1]:
+        mapping.close()
+        raise ValueError(f"{path}: too short for a .gmap header")
+    magic, version = struct.unpack_from('<4sI', mapping)
+    if magic != GMAP_MAGIC or version not in GMAP_HEADER_SIZES or len(mapping) < GMAP_HEADER_SIZES[version]:
+        mapping.close()
+        raise ValueError(f"{path}: not a .gmap file of version {', '.join(map(str, GMAP_HEADER_SIZES))}")
+    if version == 1:
+        flags = 0
+        rows, cols, start_row, start_col, end_row, end_col = struct.unpack_from('<6i', mapping, 8)
+    else:
+        _, _, rows, cols, start_row, start_col, end_row, end_col, flags = GMAP_HEADER.unpack_from(mapping)
+    try:
+        _check_size(path, rows, cols)
+        start = _check_endpoint(path, 'start', start_row, start_col, rows, cols)
+        end = _check_endpoint(path, 'end', end_row, end_col, rows, cols)
+    except ValueError:
+        mapping.close()
+        raise
+    size = rows * cols
+    offset = GMAP_HEADER_SIZES[version]
+    costs_offset = offset + size + -size % 8
+    expected = costs_offset + 8 * size if flags & GMAP_HAS_COSTS else offset + size
+    if len(mapping) < expected:
+        mapping.close()
+        raise ValueError(f"{path}: expected {size} cells, file is truncated")
+    view = memoryview(mapping)
+    cells = view[offset:offset + size]
+    costs = view[costs_offset:costs_offset + 8 * size].cast('d') if flags & GMAP_HAS_COSTS else None
+    if not writable:
+        cells = cells.toreadonly()
+        costs = costs.toreadonly() if costs is not None else None
+    return GridMap(rows, cols, cells, costs), start, end
+
+
+def load_text_map(path):
+    """Read a text map, one line per row / Lê um mapa em texto, uma linha por linha da grade
+
+    '.', '0' and spaces are free, 'S' and 'G' mark the start and goal and
+    any other symbol is a wall. Short lines are padded with walls.
+    Returns (grid, start, end).
+    '.', '0' e espaços são livres, 'S' e 'G' marcam início e objetivo e o
+    resto é parede.
+    """
+    with open(path, encoding='utf-8') as handle:
+        lines = [line.rstrip('\r\n') for line in handle]
+    while lines and not lines[-1].strip():
+        lines.pop()
+    rows, cols = len(lines), max((len(line) for line in lines), default=0)
+    _check_size(path, rows, cols)
+    cells = bytearray([WALL]) * (rows * cols)
+    start = end = None
+    for row, line in enumerate(lines):
+        for col, symbol in enumerate(line):
+            if symbol == 'S':
+                start = (row, col)
+            elif symbol == 'G':
+                end = (row, col)
+            elif symbol not in TEXT_FREE:
+                continue
+            cells[row * cols + col] = FREE
+    return GridMap(rows, cols, cells), start, end
+
+
+def _pgm_token(data, position):
+    """Next header token of a PGM file and the position after it / Próximo token do cabeçalho PGM"""
+    while True:
+        while data[position:position + 1].isspace():
+            position += 1
+        if data[position:position + 1] != b'#':
+            break
+        position = data.index(b'\n', position) + 1
+    end = position
+    while end < len(data) and not data[end:end + 1].isspace():
+        end += 1
+    return data[position:end], end
+
+
+def load_pgm_map(path, threshold=0.5):
+    """Read a PGM occupancy image / Lê uma imagem de ocupação PGM
+
+    Pixels darker than `threshold` (a fraction of the maximum gray value)
+    are walls, as in ROS occupancy maps. Handles binary (P5) and ASCII (P2)
+    files with 8- or 16-bit samples.
+    Pixels mais escuros que `threshold` são paredes, como nos mapas do ROS.
+    """
+    import numpy as np
+
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    magic, position = _pgm_token(data, 0)
+    if magic not in (b'P2', b'P5'):
+        raise ValueError(f"{path}: not a PGM file")
+    cols, position = _pgm_token(data, position)
+    rows, position = _pgm_token(data, position)
+    max_value, position = _pgm_token(data, position)
+    rows, cols, max_value = int(rows), int(cols), int(max_value)
+    _check_size(path, rows, cols)
+    if magic == b'P5':
+        dtype = np.uint8 if max_value < 256 else np.dtype('>u2')
+        pixels = np.frombuffer(data, dtype, rows * cols, position + 1)
+    else:
+        pixels = np.array(data[position:].split()[:rows * cols], dtype=np.int64)
+    return _threshold_image(pixels, rows, cols, max_value, threshold), None, None
+
+
+def load_png_map(path, threshold=0.5):
+    """Read a PNG occupancy image / Lê uma imagem de ocupação PNG
+
+    Decoded with pygame; pixels whose luminance is below `threshold` are
+    walls. Lido com o pygame; pixels com luminância abaixo de `threshold`
+    são paredes.
+    """
+    import numpy as np
+    import pygame
+
+    surface = pygame.image.load(path)
+    cols, rows = surface.get_size()
+    _check_size(path, rows, cols)
+    rgb = np.frombuffer(pygame.image.tobytes(surface, 'RGB'), np.uint8).reshape(-1, 3)
+    luminance = rgb @ np.array([0.299, 0.587, 0.114])
+    return _threshold_image(luminance, rows, cols, 255, threshold), None, None
+
+
+def _threshold_image(pixels, rows, cols, max_value, threshold):
+    """GridMap from gray values / GridMap a partir de tons de cinza"""
+    import numpy as np
+
+    cells = np.where(np.asarray(pixels) < threshold * max_value, WALL, FREE).astype(np.uint8)
+    return GridMap(rows, cols, bytearray(cells.tobytes()))
+
+
+def import_map(path, threshold=0.5):
+    """Load any supported map file by extension / Carrega qualquer mapa suportado pela extensão
+
+    `.gmap` is memory-mapped (copy-on-write), `.map` is read as MovingAI,
+    `.pgm`/`.pnm` and `.png` as occupancy images and anything else as a
+    text map. Returns (grid, start, end).
+    Retorna (grade, início, fim).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.gmap':
+        return load_grid_map(path, writable=True)
+    if extension == '.map':
+        return load_movingai_map(path), None, None
+    if extension in ('.pgm', '.pnm'):
+        return load_pgm_map(path, threshold)
+    if extension == '.png':
+        return load_png_map(path, threshold)
+    return load_text_map(path)
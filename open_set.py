@@ -0,0 +1,226 @@
+"""Open-set structures for the search core / Estruturas de lista aberta para o núcleo de busca
+
+Every open set orders nodes by f, then by h (lower first, so deeper nodes win
+ties), then by flat index, which makes expansion order deterministic.
+Toda lista aberta ordena por f, depois por h (menor primeiro) e por fim pelo
+índice plano, tornando a ordem de expansão determinística.
+
+All of them share one interface / Todas compartilham a mesma interface:
+
+    reset(generation)            start a new search / inicia uma nova busca
+    push(node, f, h)             insert a new node / insere um novo nó
+    decrease_key(node, f, h)     lower the key of an open node / reduz a chave de um nó aberto
+    pop()                        best open node or -1 / melhor nó aberto ou -1
+
+Liveness is read from the SearchBuffers they are built on: an entry is stale
+when its node is closed or its f no longer equals g + h.
+A validade é lida dos SearchBuffers: uma entrada é obsoleta quando o nó está
+fechado ou seu f não é mais igual a g + h.
+"""
+import heapq
+from array import array
+
+COMPACT_MIN = 1024  # Smallest heap worth compacting / Menor heap que vale compactar
+
+
+class LazyOpenSet:
+    """Binary heap with lazy deletion / Heap binário com remoção preguiçosa
+
+    A decrease-key pushes a fresh entry and leaves the old one behind; stale
+    entries are skipped on pop and the heap is rebuilt once they outnumber
+    live ones, so memory stays within twice the open-set size.
+    Um decrease-key insere uma nova entrada; as obsoletas são ignoradas no pop
+    e o heap é reconstruído quando passam a ser maioria.
+    """
+    def __init__(self, buffers):
+        self.buffers = buffers  # Search state / Estado da busca
+        self.heap = []  # (f, h, node) entries / Entradas (f, h, nó)
+        self.generation = 0  # Current search stamp / Carimbo da busca atual
+        self.stale = 0  # Superseded entries still in the heap / Entradas substituídas ainda no heap
+        self.pushes = 0  # Entries pushed / Entradas inseridas
+        self.stale_pops = 0  # Stale entries skipped / Entradas obsoletas ignoradas
+
+    def reset(self, generation):
+        """Start a new search / Inicia uma nova busca"""
+        self.heap.clear()
+        self.generation = generation
+        self.stale = 0
+        self.pushes = 0
+        self.stale_pops = 0
+
+    def __len__(self):
+        return len(self.heap) - self.stale
+
+    def push(self, node, f, h):
+        """Insert a new node / Insere um novo nó"""
+        heapq.heappush(self.heap, (f, h, node))
+        self.pushes += 1
+
+    def decrease_key(self, node, f, h):
+        """Lower the key of an open node / Reduz a chave de um nó aberto"""
+        heapq.heappush(self.heap, (f, h, node))
+        self.pushes += 1
+        self.stale += 1
+        if self.stale > COMPACT_MIN and self.stale * 2 > len(self.heap):
+            self.compact()
+
+    def compact(self):
+        """Drop stale entries and rebuild the heap / Remove entradas obsoletas e reconstrói o heap"""
+        g, closed, generation = self.buffers.g, self.buffers.closed, self.generation
+        self.heap = [entry for entry in self.heap
+                     if closed[entry[2]] != generation and entry[0] == g[entry[2]] + entry[1]]
+        heapq.heapify(self.heap)
+        self.stale = 0
+
+    def pop(self):
+        """Remove and return the best open node, or -1 / Remove e retorna o melhor nó aberto, ou -1"""
+        heap = self.heap
+        g, closed, generation = self.buffers.g, self.buffers.closed, self.generation
+        while heap:
+            f, h, node = heapq.heappop(heap)
+            if closed[node] != generation and f == g[node] + h:
+                return node
+            self.stale_pops += 1
+            if self.stale:
+                self.stale -= 1
+        return -1
+
+
+class IndexedOpenSet:
+    """Indexed binary heap with in-place decrease-key / Heap binário indexado com decrease-key no lugar
+
+    Each open node appears exactly once; its heap slot is kept in a flat
+    position array so a decrease-key sifts the existing entry up.
+    Cada nó aberto aparece uma única vez; sua posição fica num array plano.
+    """
+    def __init__(self, buffers):
+        self.buffers = buffers  # Search state / Estado da busca
+        self.heap = []  # (f, h, node) entries / Entradas (f, h, nó)
+        self.position = array('i')  # Heap slot of each open node / Posição de cada nó aberto no heap
+        self.pushes = 0  # Entries pushed / Entradas inseridas
+        self.stale_pops = 0  # Always zero, kept for a uniform interface / Sempre zero, por uniformidade
+
+    def reset(self, generation):
+        """Start a new search / Inicia uma nova busca"""
+        self.heap.clear()
+        self.pushes = 0
+        if len(self.position) < self.buffers.size:
+            self.position.extend(array('i', [0]) * (self.buffers.size - len(self.position)))
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, node, f, h):
+        """Insert a new node / Insere um novo nó"""
+        self.heap.append((f, h, node))
+        self.pushes += 1
+        self._sift_up(len(self.heap) - 1)
+
+    def decrease_key(self, node, f, h):
+        """Lower the key of an open node / Reduz a chave de um nó aberto"""
+        index = self.position[node]
+        self.heap[index] = (f, h, node)
+        self.pushes += 1
+        self._sift_up(index)
+
+    def pop(self):
+        """Remove and return the best open node, or -1 / Remove e retorna o melhor nó aberto, ou -1"""
+        heap = self.heap
+        if not heap:
+            return -1
+        best = heap[0][2]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        return best
+
+    def _sift_up(self, index):
+        heap, position = self.heap, self.position
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            heap[index] = heap[parent]
+            position[heap[index][2]] = index
+            index = parent
+        heap[index] = entry
+        position[entry[2]] = index
+
+    def _sift_down(self, index):
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            heap[index] = heap[child]
+            position[heap[index][2]] = index
+            index = child
+        heap[index] = entry
+        position[entry[2]] = index
+
+
+class BucketOpenSet:
+    """Bucket queue for integer f values / Fila de baldes para valores inteiros de f
+
+    Bucket k holds the nodes with f == k as a small (h, node) heap, and a
+    cursor walks the buckets upwards. Only valid when every g and h is an
+    integer, e.g. Manhattan distance on a unit-cost 4-connected grid.
+    O balde k guarda os nós com f == k; só vale quando g e h são inteiros.
+    """
+    def __init__(self, buffers):
+        self.buffers = buffers  # Search state / Estado da busca
+        self.buckets = []  # (h, node) heaps indexed by f / Heaps (h, nó) indexados por f
+        self.cursor = 0  # Lowest possibly non-empty bucket / Menor balde possivelmente não vazio
+        self.generation = 0  # Current search stamp / Carimbo da busca atual
+        self.pushes = 0  # Entries pushed / Entradas inseridas
+        self.stale_pops = 0  # Stale entries skipped / Entradas obsoletas ignoradas
+
+    def reset(self, generation):
+        """Start a new search / Inicia uma nova busca"""
+        self.buckets.clear()
+        self.cursor = 0
+        self.generation = generation
+        self.pushes = 0
+        self.stale_pops = 0
+
+    def push(self, node, f, h):
+        """Insert a new node / Insere um novo nó"""
+        key = int(f)
+        buckets = self.buckets
+        while len(buckets) <= key:
+            buckets.append([])
+        heapq.heappush(buckets[key], (h, node))
+        self.pushes += 1
+        if key < self.cursor:
+            self.cursor = key
+
+    decrease_key = push
+
+    def pop(self):
+        """Remove and return the best open node, or -1 / Remove e retorna o melhor nó aberto, ou -1"""
+        buckets = self.buckets
+        g, closed, generation = self.buffers.g, self.buffers.closed, self.generation
+        while self.cursor < len(buckets):
+            bucket = buckets[self.cursor]
+            while bucket:
+                h, node = heapq.heappop(bucket)
+                if closed[node] != generation and self.cursor == g[node] + h:
+                    return node
+                self.stale_pops += 1
+            self.cursor += 1
+        return -1
+
+
+OPEN_SET_TYPES = {
+    'lazy': LazyOpenSet,
+    'indexed': IndexedOpenSet,
+    'bucket': BucketOpenSet,
+}
@@ -0,0 +1,407 @@
+"""Headless A* search core / Núcleo de busca A* sem interface gráfica
+
+This module has no pygame dependency and performs no drawing, sleeping or
+display initialization, so it can be imported by batch jobs and tools.
+Este módulo não depende do pygame e não desenha, não dorme e não inicializa
+a tela, podendo ser importado por tarefas em lote e ferramentas.
+
+Search state lives in flat arrays indexed by `row * cols + col` and is reused
+between queries: a generation stamp marks which entries belong to the current
+search, so starting a new one costs O(1) instead of O(rows * cols).
+O estado da busca fica em arrays planos reutilizados entre consultas; um
+carimbo de geração indica quais entradas pertencem à busca atual.
+"""
+import math
+from array import array
+
+from grid_map import GridMap, WALL
+from open_set import OPEN_SET_TYPES
+
+INF = float('inf')
+GENERATION_LIMIT = 2 ** 32 - 1  # Largest stamp stored in an 'I' array / Maior carimbo num array 'I'
+INTEGER_HEURISTICS = {'manhattan', 'chebyshev'}  # Heuristics with integer values / Heurísticas com valores inteiros
+SQRT2 = math.sqrt(2)  # Diagonal step cost / Custo do passo diagonal
+
+# Moves as (d_row, d_col, cost) / Movimentos como (d_linha, d_coluna, custo)
+MOVES_4 = [(-1, 0, 1), (1, 0, 1), (0, -1, 1), (0, 1, 1)]
+MOVES_8 = MOVES_4 + [(-1, -1, SQRT2), (-1, 1, SQRT2), (1, -1, SQRT2), (1, 1, SQRT2)]
+
+
+class SearchBuffers:
+    """Reusable flat search state / Estado de busca plano reutilizável"""
+    def __init__(self, size=0):
+        self.size = 0  # Capacity in cells / Capacidade em células
+        self.generation = 0  # Current search stamp / Carimbo da busca atual
+        self.g = array('d')  # Cost from start / Custo desde o início
+        self.parent = array('i')  # Flat index of the predecessor / Índice plano do antecessor
+        self.seen = array('I')  # Stamp of the search that set g / Carimbo da busca que definiu g
+        self.closed = array('I')  # Stamp of the search that expanded the cell / Carimbo da busca que expandiu a célula
+        self.closed_count = 0  # Expansions in the current search / Expansões na busca atual
+        self.open_sets = {}  # Open-set instances by kind / Listas abertas por tipo
+        self.ensure(size)
+
+    def ensure(self, size):
+        """Grow buffers to hold `size` cells / Aumenta os buffers para `size` células"""
+        if size > self.size:
+            extra = size - self.size
+            self.g.extend(array('d', [INF]) * extra)
+            self.parent.extend(array('i', [-1]) * extra)
+            self.seen.extend(array('I', [0]) * extra)
+            self.closed.extend(array('I', [0]) * extra)
+            self.size = size
+
+    def begin(self, size):
+        """Start a new search and return its stamp / Inicia uma nova busca e retorna seu carimbo"""
+        self.ensure(size)
+        self.generation += 1
+        if self.generation > GENERATION_LIMIT:
+            # Stamps wrapped around: clear once and start over / Carimbos estouraram: limpa e recomeça
+            self.seen = array('I', [0]) * self.size
+            self.closed = array('I', [0]) * self.size
+            self.generation = 1
+        self.closed_count = 0
+        return self.generation
+
+    def open_set(self, kind):
+        """Reusable open set of the given kind / Lista aberta reutilizável do tipo dado"""
+        if kind not in self.open_sets:
+            if kind not in OPEN_SET_TYPES:
+                raise ValueError(f"Unknown open set '{kind}', expected one of {sorted(OPEN_SET_TYPES)}")
+            self.open_sets[kind] = OPEN_SET_TYPES[kind](self)
+        return self.open_sets[kind]
+
+    def g_value(self, index, generation):
+        """g of a cell for a given search / g de uma célula para uma busca"""
+        if self.seen[index] == generation:
+            return self.g[index]
+        return INF
+
+
+# Buffers shared by calls that do not pass their own / Buffers compartilhados por chamadas sem buffers próprios
+_shared_buffers = SearchBuffers()
+
+
+class GScoreView:
+    """Read-only {(row, col): g} view over search buffers / Visão somente leitura de g sobre os buffers"""
+    def __init__(self, buffers, generation, cols):
+        self.buffers = buffers
+        self.generation = generation
+        self.cols = cols
+
+    def get(self, cell, default=None):
+        """g of a cell or `default` if unreached / g da célula ou `default` se não alcançada"""
+        index = cell[0] * self.cols + cell[1]
+        if self.buffers.seen[index] == self.generation:
+            return self.buffers.g[index]
+        return default
+
+    def __getitem__(self, cell):
+        value = self.get(cell)
+        if value is None:
+            raise KeyError(cell)
+        return value
+
+    def __contains__(self, cell):
+        return self.get(cell) is not None
+
+
+class ClosedSetView:
+    """Read-only set-like view of expanded cells / Visão somente leitura das células expandidas"""
+    def __init__(self, buffers, generation, cols, count):
+        self.buffers = buffers
+        self.generation = generation
+        self.cols = cols
+        self.count = count
+
+    def __contains__(self, cell):
+        return self.buffers.closed[cell[0] * self.cols + cell[1]] == self.generation
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        closed = self.buffers.closed
+        for index in range(len(closed)):
+            if closed[index] == self.generation:
+                yield divmod(index, self.cols)
+
+
+class SearchResult:
+    """Outcome of a single search / Resultado de uma única busca
+
+    `g_scores` and `explored` are views over the search buffers and stay
+    valid only until those buffers are used for another search.
+    `g_scores` e `explored` são visões dos buffers e só valem até que eles
+    sejam usados em outra busca.
+    """
+    def __init__(self, path, cost, g_scores, explored, visited_count, pushes=0, jump_points=None):
+        self.path = path  # Cells from start to end, both included / Células do início ao fim, ambos incluídos
+        self.cost = cost  # Total path cost / Custo total do caminho
+        self.g_scores = g_scores  # Best known cost per cell / Melhor custo conhecido por célula
+        self.explored = explored  # Expanded cells / Células expandidas
+        self.visited_count = visited_count  # Number of expansions / Número de expansões
+        self.pushes = pushes  # Open-set insertions / Inserções na lista aberta
+        self.jump_points = jump_points  # Jump points found by JPS / Pontos de salto encontrados pelo JPS
+
+    @property
+    def found(self):
+        """Whether a path was found / Se um caminho foi encontrado"""
+        return bool(self.path)
+
+    @property
+    def path_length(self):
+        """Number of steps in the path / Número de passos do caminho"""
+        return max(len(self.path) - 1, 0)
+
+
+def calculate_heuristic(point_a, point_b, h_type):
+    """Calculate heuristic value between two points / Calcula valor heurístico entre dois pontos"""
+    x1, y1 = point_a
+    x2, y2 = point_b
+
+    if h_type == 'manhattan':
+        return abs(x1 - x2) + abs(y1 - y2)
+    if h_type == 'octile':
+        dx, dy = abs(x1 - x2), abs(y1 - y2)
+        return max(dx, dy) + (SQRT2 - 1) * min(dx, dy)
+    if h_type == 'chebyshev':
+        return max(abs(x1 - x2), abs(y1 - y2))
+    return math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
+
+
+def as_grid_map(grid):
+    """Accept a GridMap or a list of lists / Aceita um GridMap ou uma lista de listas"""
+    if isinstance(grid, GridMap):
+        return grid
+    return GridMap.from_rows(grid)
+
+
+def flat_values(values):
+    """1-D float view of a heuristic field / Visão 1-D de floats de um campo heurístico
+
+    Accepts anything exporting float64 buffers (NumPy arrays of any shape,
+    array('d')) without copying, or a plain flat sequence.
+    Aceita qualquer buffer float64 sem copiar, ou uma sequência plana.
+    """
+    try:
+        view = memoryview(values)
+    except TypeError:
+        return values
+    if view.ndim != 1 or view.format != 'd':
+        view = view.cast('B').cast('d')
+    return view
+
+
+def trace_path(parent, start_index, end_index, cols):
+    """Follow parent links back to the start / Segue os antecessores até o início"""
+    path = [divmod(end_index, cols)]
+    current = end_index
+    while current != start_index:
+        current = parent[current]
+        path.append(divmod(current, cols))
+    path.reverse()
+    return path
+
+
+def resolve_open_set(open_set, heuristic_type, connectivity=4, weight=1, integer_steps=True):
+    """Pick the open-set kind for a search / Escolhe o tipo de lista aberta para uma busca"""
+    integer_costs = (connectivity == 4 and heuristic_type in INTEGER_HEURISTICS and weight == 1
+                     and integer_steps)
+    if open_set == 'auto':
+        return 'bucket' if integer_costs else 'lazy'
+    if open_set == 'bucket' and not integer_costs:
+        raise ValueError(f"Bucket open set needs integer costs, got heuristic '{heuristic_type}' "
+                         f"with {connectivity}-connectivity and weight {weight}")
+    return open_set
+
+
+def find_path(grid, start, end, heuristic_type='euclidean', on_expand=None, buffers=None,
+              open_set='auto', algorithm='astar', connectivity=4, h_field=None, cost_bound=None, weight=1,
+              instrument=None):
+    """Find path using A* algorithm / Encontra caminho usando algoritmo A*
+
+    `grid` is a GridMap or a list of rows where 1 marks a wall. `on_expand`,
+    if given, is called as on_expand(g_scores, explored) after every
+    expansion. `buffers` defaults to a module-wide SearchBuffers.
+    `open_set` is 'lazy', 'indexed', 'bucket' or 'auto' (bucket queue for
+    integer heuristics, lazy heap otherwise). `algorithm` is 'astar', 'jps'
+    (Jump Point Search, always 8-connected) or 'bidirectional' (see
+    bidirectional.py). `connectivity` is 4 or 8;
+    diagonal steps cost sqrt(2) and may not cut wall corners. `h_field`
+    holds precomputed h-values per cell (see heuristics.py); when given, the
+    heuristic is read from it instead of being computed. `cost_bound` (A*
+    only) is a known upper bound on the path cost; cells whose f exceeds it
+    are never queued, which stays exact with an admissible heuristic.
+    `weight` turns the search into Weighted A*, ordering by g + weight * h;
+    the path found then costs at most `weight` times the optimum. A GridMap
+    with `costs` is searched as weighted terrain (see terrain.py).
+    `instrument`, an instrumentation.Instrumentation, collects counters,
+    timings and events of the search; without it the search runs
+    uninstrumented.
+    `grid` é um GridMap ou uma lista de linhas onde 1 marca uma parede.
+    `on_expand`, se fornecido, é chamado a cada expansão. `buffers` usa por
+    padrão um SearchBuffers compartilhado pelo módulo. `open_set` escolhe a
+    estrutura da lista aberta, `algorithm` entre A*, JPS e bidirecional, `connectivity`
+    entre vizinhança 4 ou 8, `h_field` fornece valores h pré-calculados e
+    `cost_bound` descarta células cujo f passa de um limite conhecido.
+    `weight` ativa o A* ponderado, com custo até `weight` vezes o ótimo.
+    `instrument` coleta contadores, tempos e eventos da busca.
+    """
+    steps = iter_search(grid, start, end, heuristic_type, buffers, open_set, algorithm, connectivity,
+                        h_field, cost_bound, weight, instrument)
+    while True:
+        try:
+            progress = next(steps)
+        except StopIteration as stop:
+            return stop.value
+        if on_expand is not None:
+            on_expand(*progress)
+
+
+def iter_search(grid, start, end, heuristic_type='euclidean', buffers=None, open_set='auto',
+                algorithm='astar', connectivity=4, h_field=None, cost_bound=None, weight=1, instrument=None):
+    """Step through a search one expansion at a time / Percorre uma busca uma expansão por vez
+
+    Returns a generator that yields (g_scores, explored) after every
+    expansion and returns the SearchResult through StopIteration.value (or
+    `result = yield from iter_search(...)`). Closing the generator cancels
+    the search. Arguments are the same as for find_path.
+    Retorna um gerador que produz (g_scores, explored) a cada expansão e
+    devolve o SearchResult em StopIteration.value. Fechar o gerador cancela
+    a busca.
+    """
+    buffers = buffers or _shared_buffers
+    if weight < 1:
+        raise ValueError(f"Weight must be at least 1, got {weight}")
+    if h_field is not None:
+        h_field = flat_values(h_field)
+    grid = as_grid_map(grid)
+    if algorithm == 'jps':
+        if cost_bound is not None:
+            raise ValueError("cost_bound is only supported by A*")
+        if grid.costs is not None:
+            raise ValueError("JPS needs uniform costs, use A* on weighted terrain")
+        from jps import iter_jump_point_search
+        steps = iter_jump_point_search(grid, start, end, heuristic_type, buffers, open_set, h_field, weight,
+                                       instrument)
+        return steps if instrument is None else instrument.wrap(steps, grid)
+    if algorithm not in ('astar', 'bidirectional'):
+        raise ValueError(f"Unknown algorithm '{algorithm}', expected 'astar', 'jps' or 'bidirectional'")
+    if connectivity not in (4, 8):
+        raise ValueError(f"Connectivity must be 4 or 8, got {connectivity}")
+    if algorithm == 'bidirectional':
+        if cost_bound is not None or weight != 1:
+            raise ValueError("Bidirectional search supports neither cost_bound nor weight")
+        from bidirectional import iter_bidirectional_search
+        steps = iter_bidirectional_search(grid, start, end, heuristic_type, buffers, connectivity, h_field,
+                                          instrument)
+    elif grid.costs is not None:
+        from terrain import iter_terrain_search
+        steps = iter_terrain_search(grid, start, end, heuristic_type, buffers, open_set, connectivity, h_field,
+                                    cost_bound, weight, instrument)
+    else:
+        steps = _astar_steps(grid, start, end, heuristic_type, buffers, open_set, connectivity, h_field,
+                             cost_bound, weight, instrument)
+    if instrument is None:
+        return steps
+    return instrument.wrap(steps, grid)
+
+
+def _astar_steps(grid, start, end, heuristic_type, buffers, open_set, connectivity, h_field, cost_bound, weight,
+                 instrument=None):
+    """A* as a generator, see iter_search / A* como gerador, ver iter_search"""
+    grid = as_grid_map(grid)
+    rows, cols = grid.rows, grid.cols
+    cells = grid.cells
+
+    generation = buffers.begin(grid.size)
+    g, parent, seen, closed = buffers.g, buffers.parent, buffers.seen, buffers.closed
+    g_scores = GScoreView(buffers, generation, cols)
+    explored = ClosedSetView(buffers, generation, cols, 0)
+
+    start_index = start[0] * cols + start[1]
+    end_index = end[0] * cols + end[1]
+    last_row = rows - 1
+    last_col = cols - 1
+    bound = INF if cost_bound is None else cost_bound
+
+    g[start_index] = 0
+    parent[start_index] = -1
+    seen[start_index] = generation
+
+    moves = [(d_row, d_col, d_row * cols + d_col, cost)
+             for d_row, d_col, cost in (MOVES_8 if connectivity == 8 else MOVES_4)]
+    open_nodes = buffers.open_set(resolve_open_set(open_set, heuristic_type, connectivity, weight))
+    open_nodes.reset(generation)
+    heuristic = calculate_heuristic
+    if instrument is not None:
+        open_nodes = instrument.open_set(open_nodes, closed, generation)
+        heuristic = instrument.heuristic(calculate_heuristic)
+        moves = instrument.moves(moves)
+    if h_field is not None:
+        start_h = h_field[start_index] * weight
+    else:
+        start_h = heuristic(start, end, heuristic_type) * weight
+    open_nodes.push(start_index, start_h, start_h)
+    pop, push, decrease_key = open_nodes.pop, open_nodes.push, open_nodes.decrease_key
+    progress = (g_scores, explored)
+    closed_count = 0
+    found = False
+
+    while True:
+        current = pop()
+        if current < 0:
+            break
+
+        if current == end_index:
+            found = True
+            break
+
+        closed[current] = generation
+        closed_count += 1
+        explored.count = closed_count
+        yield progress
+
+        x, y = divmod(current, cols)
+        current_g = g[current]
+        for d_row, d_col, delta, step_cost in moves:
+            row = x + d_row
+            col = y + d_col
+            if row < 0 or row > last_row or col < 0 or col > last_col:
+                continue
+            neighbor = current + delta
+            if cells[neighbor] == WALL or closed[neighbor] == generation:
+                continue
+            # Diagonals may not cut a wall corner / Diagonais não podem cortar o canto de uma parede
+            if d_row and d_col and (cells[current + d_col] == WALL or cells[current + d_row * cols] == WALL):
+                continue
+
+            tentative_g = current_g + step_cost
+            if seen[neighbor] != generation:
+                if h_field is not None:
+                    h_score = h_field[neighbor]
+                else:
+                    h_score = heuristic((row, col), end, heuristic_type)
+                if tentative_g + h_score > bound:
+                    continue
+                h_score *= weight
+                parent[neighbor] = current
+                g[neighbor] = tentative_g
+                seen[neighbor] = generation
+                push(neighbor, tentative_g + h_score, h_score)
+            elif tentative_g < g[neighbor]:
+                parent[neighbor] = current
+                g[neighbor] = tentative_g
+                if h_field is not None:
+                    h_score = h_field[neighbor]
+                else:
+                    h_score = heuristic((row, col), end, heuristic_type)
+                h_score *= weight
+                decrease_key(neighbor, tentative_g + h_score, h_score)
+
+    explored.count = closed_count
+    buffers.closed_count = closed_count
+    if not found:
+        return SearchResult([], INF, g_scores, explored, closed_count, open_nodes.pushes)
+    path = trace_path(parent, start_index, end_index, cols)
+    return SearchResult(path, g[end_index], g_scores, explored, closed_count, open_nodes.pushes)
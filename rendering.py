@@ -0,0 +1,378 @@
+"""Retained-mode grid renderer / Renderizador de grade em modo retido
+
+The renderer remembers what every cell looked like on the last frame and
+only redraws cells whose appearance changed, returning their rectangles for
+pygame.display.update(). Walls, background and grid lines are kept in a
+static layer used for full redraws, and number glyphs are rendered once and
+reused.
+O renderizador lembra a aparência de cada célula no último quadro e só
+redesenha as que mudaram, retornando seus retângulos para
+pygame.display.update(). Paredes, fundo e linhas ficam numa camada estática
+e os números são renderizados uma única vez.
+
+GridRenderer still visits every cell in Python, which is fine for the
+default 20x20 to 40x40 grids but not for maps of millions of cells or a
+zoomed, panned view. ViewportRenderer covers those: it builds the colors of
+the visible cells as a NumPy array and blits them as a single surface, and
+draws lines, markers and values only when cells are large enough to show
+them.
+O GridRenderer ainda percorre cada célula em Python. O ViewportRenderer
+atende mapas grandes e visões com zoom: monta as cores das células visíveis
+num array do NumPy e as desenha numa única superfície.
+"""
+import math
+
+import numpy as np
+import pygame
+from pygame import gfxdraw
+
+from grid_map import WALL
+
+# Cell colors in drawing priority, lowest first / Cores das células em ordem de prioridade
+LAYERS = ('background', 'terrain', 'visited', 'visited_backward', 'wall', 'path', 'start', 'end')
+LAYER = {name: index for index, name in enumerate(LAYERS)}
+TEXT_MIN_CELL = 24  # Smallest cell in pixels that shows g-values / Menor célula em pixels que mostra valores g
+DETAIL_MIN_CELL = 6  # Smallest cell that shows lines and markers / Menor célula que mostra linhas e marcadores
+
+
+class GridRenderer:
+    """Draws a grid, redrawing only changed cells / Desenha a grade, redesenhando só o que mudou"""
+    def __init__(self, surface, colors, font):
+        self.surface = surface  # Target surface / Superfície de destino
+        self.colors = colors  # Color table / Tabela de cores
+        self.font = font  # Font for cell values / Fonte dos valores das células
+        self.glyphs = {}  # Rendered value texts / Textos de valores já renderizados
+        self.layout = None  # (rows, cols, cell_size, offset_x, offset_y)
+        self.states = []  # Last drawn state per cell / Último estado desenhado por célula
+        self.static_layer = None  # Background, walls and lines / Fundo, paredes e linhas
+        self.static_walls = None  # Wall bytes baked into the layer / Paredes gravadas na camada
+        self.static_clusters = None  # Cluster size baked into the layer / Tamanho de cluster gravado na camada
+        self.needs_full_redraw = True  # Redraw everything next frame / Redesenhar tudo no próximo quadro
+        self.cluster_size = None  # Cluster overlay spacing, None when hidden / Espaçamento dos clusters, None se oculto
+
+    def invalidate(self):
+        """Force a full redraw on the next frame / Força um redesenho completo no próximo quadro"""
+        self.needs_full_redraw = True
+
+    def glyph(self, text):
+        """Cached rendering of a value / Renderização em cache de um valor"""
+        surface = self.glyphs.get(text)
+        if surface is None:
+            surface = self.font.render(text, True, self.colors['cell_text'])
+            self.glyphs[text] = surface
+        return surface
+
+    def cell_rect(self, row, col):
+        """Screen rectangle of a cell / Retângulo de uma célula na tela"""
+        _, _, cell_size, offset_x, offset_y = self.layout
+        return pygame.Rect(col * cell_size + offset_x, row * cell_size + offset_y, cell_size, cell_size)
+
+    def _build_static_layer(self, grid):
+        rows, cols, cell_size, _, _ = self.layout
+        layer = pygame.Surface((cols * cell_size, rows * cell_size))
+        layer.fill(self.colors['background'])
+        for index in range(rows * cols):
+            row, col = divmod(index, cols)
+            rect = pygame.Rect(col * cell_size, row * cell_size, cell_size, cell_size)
+            if grid.cells[index] == WALL:
+                pygame.draw.rect(layer, self.colors['wall'], rect)
+            pygame.draw.rect(layer, self.colors['grid_line'], rect, 1)
+        self.static_layer = layer
+        self.static_walls = bytes(grid.cells)
+        self.static_clusters = self.cluster_size
+        if self.cluster_size:
+            for row in range(0, rows, self.cluster_size):
+                pygame.draw.line(layer, self.colors['cluster_line'], (0, row * cell_size),
+                                 (cols * cell_size, row * cell_size))
+            for col in range(0, cols, self.cluster_size):
+                pygame.draw.line(layer, self.colors['cluster_line'], (col * cell_size, 0),
+                                 (col * cell_size, rows * cell_size))
+
+    def _draw_cluster_edges(self, row, col, rect):
+        """Redraw cluster lines crossing a cell / Redesenha as linhas de cluster sobre uma célula"""
+        color = self.colors['cluster_line']
+        if row % self.cluster_size == 0:
+            pygame.draw.line(self.surface, color, rect.topleft, (rect.right - 1, rect.top))
+        if col % self.cluster_size == 0:
+            pygame.draw.line(self.surface, color, rect.topleft, (rect.left, rect.bottom - 1))
+
+    def _draw_cell(self, row, col, state):
+        color_key, text, marker = state
+        rect = self.cell_rect(row, col)
+        pygame.draw.rect(self.surface, self.colors[color_key], rect)
+        if color_key != 'path':
+            pygame.draw.rect(self.surface, self.colors['grid_line'], rect, 1)
+        if self.cluster_size:
+            self._draw_cluster_edges(row, col, rect)
+        if text:
+            self.surface.blit(self.glyph(text), (rect.x + 5, rect.y + 5))
+        if marker:
+            radius = max(rect.width // 5, 2)
+            gfxdraw.filled_circle(self.surface, rect.centerx, rect.centery, radius, self.colors[marker])
+            gfxdraw.aacircle(self.surface, rect.centerx, rect.centery, radius, self.colors['grid_line'])
+        return rect
+
+    def render(self, grid, layout, start, end, g_values, explored=None, final_path=(),
+               jump_points=(), show_values=True, entrances=(), cluster_size=None):
+        """Bring the screen up to date and return dirty rectangles / Atualiza a tela e retorna os retângulos sujos
+
+        `layout` is (rows, cols, cell_size, offset_x, offset_y). With
+        `cluster_size`, cluster borders are drawn every that many cells and
+        `entrances` are marked.
+        """
+        rows, cols = layout[0], layout[1]
+        full_redraw = self.needs_full_redraw or layout != self.layout or cluster_size != self.cluster_size
+        if full_redraw:
+            self.layout = layout
+            self.cluster_size = cluster_size
+            if self.static_layer is None or self.static_walls != bytes(grid.cells) or \
+                    self.static_clusters != cluster_size or \
+                    self.static_layer.get_size() != (cols * layout[2], rows * layout[2]):
+                self._build_static_layer(grid)
+            self.surface.fill(self.colors['background'])
+            self.surface.blit(self.static_layer, (layout[3], layout[4]))
+            self.states = [('wall' if grid.cells[index] == WALL else 'background', None, None)
+                           for index in range(rows * cols)]
+            self.needs_full_redraw = False
+
+        path_cells = set(final_path)
+        jump_cells = set(jump_points)
+        entrance_cells = set(entrances)
+        cells = grid.cells
+        costs = grid.costs
+        backward = getattr(explored, 'backward', None)  # Second frontier of a bidirectional search / Segunda frente de uma busca bidirecional
+        states = self.states
+        dirty = []
+        for row in range(rows):
+            for col in range(cols):
+                cell = (row, col)
+                if cell in path_cells:
+                    color_key = 'path'
+                elif cells[row * cols + col] == WALL:
+                    color_key = 'wall'
+                elif cell == start:
+                    color_key = 'start'
+                elif cell == end:
+                    color_key = 'end'
+                elif explored and cell in explored:
+                    color_key = 'visited_backward' if backward is not None and cell in backward else 'visited'
+                elif costs is not None and costs[row * cols + col] != 1:
+                    color_key = 'terrain'
+                else:
+                    color_key = 'background'
+
+                text = None
+                if show_values and color_key != 'path':
+                    value = g_values.get(cell)
+                    if value is not None and value != float('inf'):
+                        text = f"{value:g}"
+
+                if cell in jump_cells:
+                    marker = 'jump_point'
+                elif cell in entrance_cells:
+                    marker = 'entrance'
+                else:
+                    marker = None
+                state = (color_key, text, marker)
+                index = row * cols + col
+                if states[index] != state:
+                    states[index] = state
+                    dirty.append(self._draw_cell(row, col, state))
+
+        if full_redraw:
+            return [self.surface.get_rect()]
+        return dirty
+
+
+def _reduce_blocks(layers, block):
+    """Highest layer of each block x block tile / Maior camada de cada bloco
+
+    Strided maxima over the whole array are much faster than a reshape
+    followed by max() over the small block axes.
+    Máximos com passo sobre o array inteiro são bem mais rápidos que
+    reshape seguido de max() nos eixos pequenos.
+    """
+    height, width = layers.shape
+    if height % block or width % block:
+        padded = np.zeros((-(-height // block) * block, -(-width // block) * block), np.uint8)
+        padded[:height, :width] = layers
+        layers = padded
+    reduced = layers[0::block].copy()
+    for offset in range(1, block):
+        np.maximum(reduced, layers[offset::block], out=reduced)
+    result = reduced[:, 0::block].copy()
+    for offset in range(1, block):
+        np.maximum(result, reduced[:, offset::block], out=result)
+    return result
+
+
+class ViewportRenderer:
+    """Vectorized renderer with zoom and pan / Renderizador vetorizado com zoom e deslocamento
+
+    `layout` is the same (rows, cols, cell_size, offset_x, offset_y) as for
+    GridRenderer, but cell_size may be fractional and the offsets negative:
+    the grid's top-left corner sits at `offset` inside `area`. Below one
+    pixel per cell, blocks of cells are reduced to their highest-priority
+    color (see LAYERS), so the path and endpoints stay visible.
+    `layout` é o mesmo do GridRenderer, mas cell_size pode ser fracionário
+    e os deslocamentos negativos. Abaixo de um pixel por célula, cada bloco
+    assume a cor de maior prioridade, mantendo caminho e extremos visíveis.
+    """
+    def __init__(self, surface, colors, font, area):
+        self.surface = surface  # Target surface / Superfície de destino
+        self.colors = colors  # Color table / Tabela de cores
+        self.font = font  # Font for cell values / Fonte dos valores das células
+        self.area = pygame.Rect(area)  # Screen rectangle of the grid view / Retângulo da visão da grade
+        self.palette = np.array([colors[name] for name in LAYERS], np.uint8)  # Layer -> RGB / Camada -> RGB
+        self.glyphs = {}  # Rendered value texts / Textos de valores já renderizados
+        self.base = None  # Wall and terrain layer per cell / Camada de paredes e terreno por célula
+        self.base_version = None  # GridMap.version of `base` / Versão da grade de `base`
+
+    def glyph(self, text):
+        """Cached rendering of a value / Renderização em cache de um valor"""
+        surface = self.glyphs.get(text)
+        if surface is None:
+            surface = self.font.render(text, True, self.colors['cell_text'])
+            self.glyphs[text] = surface
+        return surface
+
+    def _base_layer(self, grid):
+        """Walls and terrain, rebuilt when the grid changes / Paredes e terreno, refeitos quando a grade muda"""
+        if self.base_version != grid.version or self.base is None or self.base.shape != (grid.rows, grid.cols):
+            shape = (grid.rows, grid.cols)
+            base = np.zeros(shape, np.uint8)
+            if grid.costs is not None:
+                base[np.frombuffer(grid.costs, np.float64).reshape(shape) != 1] = LAYER['terrain']
+            base[np.frombuffer(grid.cells, np.uint8).reshape(shape) == WALL] = LAYER['wall']
+            self.base = base
+            self.base_version = grid.version
+        return self.base
+
+    @staticmethod
+    def _stamp_mask(view, shape, window):
+        """Window mask of a ClosedSetView's generation stamps / Máscara dos carimbos de um ClosedSetView"""
+        closed = np.frombuffer(view.buffers.closed, np.uint32)[:shape[0] * shape[1]].reshape(shape)
+        return closed[window] == view.generation
+
+    @staticmethod
+    def _explored_masks(explored, shape, window):
+        """(visited, backward) masks of the window, None if unknown / Máscaras da janela, None se desconhecidas"""
+        if explored is None:
+            return None, None
+        backward = getattr(explored, 'backward', None)
+        if backward is not None:
+            # Bidirectional frontiers / Frentes da busca bidirecional
+            return (ViewportRenderer._stamp_mask(explored.forward, shape, window),
+                    ViewportRenderer._stamp_mask(backward, shape, window))
+        if getattr(explored, 'buffers', None) is not None:
+            return ViewportRenderer._stamp_mask(explored, shape, window), None
+        visited = np.zeros(shape, bool)
+        for row, col in explored:
+            visited[row, col] = True
+        return visited[window], None
+
+    def cell_at(self, layout, position):
+        """Grid cell under a screen position, or None / Célula sob uma posição da tela, ou None"""
+        rows, cols, cell_size, offset_x, offset_y = layout
+        row = math.floor((position[1] - self.area.y - offset_y) / cell_size)
+        col = math.floor((position[0] - self.area.x - offset_x) / cell_size)
+        return (row, col) if 0 <= row < rows and 0 <= col < cols else None
+
+    def render(self, grid, layout, start, end, g_values, explored=None, final_path=(),
+               jump_points=(), show_values=True, entrances=(), cluster_size=None):
+        """Draw the visible part of the grid / Desenha a parte visível da grade
+
+        Takes the same arguments as GridRenderer.render and returns the
+        view rectangle as the only dirty rectangle.
+        Recebe os mesmos argumentos de GridRenderer.render.
+        """
+        rows, cols, cell_size, offset_x, offset_y = layout
+        area = self.area
+        self.surface.set_clip(area)
+        self.surface.fill(self.colors['background'], area)
+
+        # Visible cells / Células visíveis
+        first_row = max(0, math.floor(-offset_y / cell_size))
+        first_col = max(0, math.floor(-offset_x / cell_size))
+        last_row = min(rows, math.ceil((area.height - offset_y) / cell_size))
+        last_col = min(cols, math.ceil((area.width - offset_x) / cell_size))
+        if first_row >= last_row or first_col >= last_col:
+            self.surface.set_clip(None)
+            return [area]
+        window = (slice(first_row, last_row), slice(first_col, last_col))
+
+        layers = self._base_layer(grid)[window].copy()
+        visited, backward = self._explored_masks(explored, (rows, cols), window)
+        # Layers are ordered so that a maximum keeps walls over visited cells / A ordem das camadas mantém paredes sobre visitadas
+        if visited is not None:
+            np.maximum(layers, visited.view(np.uint8) * np.uint8(LAYER['visited']), out=layers)
+        if backward is not None:
+            np.maximum(layers, backward.view(np.uint8) * np.uint8(LAYER['visited_backward']), out=layers)
+        for cell, name in ((start, 'start'), (end, 'end')):
+            if first_row <= cell[0] < last_row and first_col <= cell[1] < last_col:
+                layers[cell[0] - first_row, cell[1] - first_col] = LAYER[name]
+        if final_path:
+            path = np.array(final_path, np.int64).reshape(-1, 2)
+            inside = ((path[:, 0] >= first_row) & (path[:, 0] < last_row) &
+                      (path[:, 1] >= first_col) & (path[:, 1] < last_col))
+            layers[path[inside, 0] - first_row, path[inside, 1] - first_col] = LAYER['path']
+
+        if cell_size < 1:
+            layers = _reduce_blocks(layers, math.ceil(1 / cell_size))
+
+        pixels = pygame.surfarray.make_surface(self.palette[layers].transpose(1, 0, 2))
+        size = (max(1, round((last_col - first_col) * cell_size)), max(1, round((last_row - first_row) * cell_size)))
+        left = area.x + offset_x + first_col * cell_size
+        top = area.y + offset_y + first_row * cell_size
+        self.surface.blit(pygame.transform.scale(pixels, size), (round(left), round(top)))
+
+        if cell_size >= DETAIL_MIN_CELL:
+            self._draw_details(layout, window, g_values, final_path, jump_points, show_values, entrances,
+                               cluster_size)
+        elif cluster_size and cluster_size * cell_size >= DETAIL_MIN_CELL:
+            self._draw_lines(layout, window, cluster_size, self.colors['cluster_line'])
+        self.surface.set_clip(None)
+        return [area]
+
+    def _cell_origin(self, layout, row, col):
+        _, _, cell_size, offset_x, offset_y = layout
+        return (round(self.area.x + offset_x + col * cell_size), round(self.area.y + offset_y + row * cell_size))
+
+    def _draw_lines(self, layout, window, spacing, color):
+        """Lines every `spacing` cells across the window / Linhas a cada `spacing` células na janela"""
+        rows_slice, cols_slice = window
+        left, top = self._cell_origin(layout, rows_slice.start, cols_slice.start)
+        right, bottom = self._cell_origin(layout, rows_slice.stop, cols_slice.stop)
+        for row in range(-(-rows_slice.start // spacing) * spacing, rows_slice.stop + 1, spacing):
+            y = self._cell_origin(layout, row, 0)[1]
+            pygame.draw.line(self.surface, color, (left, y), (right, y))
+        for col in range(-(-cols_slice.start // spacing) * spacing, cols_slice.stop + 1, spacing):
+            x = self._cell_origin(layout, 0, col)[0]
+            pygame.draw.line(self.surface, color, (x, top), (x, bottom))
+
+    def _draw_details(self, layout, window, g_values, final_path, jump_points, show_values, entrances,
+                      cluster_size):
+        """Grid lines, markers and values of visible cells / Linhas, marcadores e valores das células visíveis"""
+        cell_size = layout[2]
+        rows_slice, cols_slice = window
+        self._draw_lines(layout, window, 1, self.colors['grid_line'])
+        if cluster_size:
+            self._draw_lines(layout, window, cluster_size, self.colors['cluster_line'])
+
+        radius = max(int(cell_size) // 5, 2)
+        for cells, marker in ((jump_points, 'jump_point'), (entrances, 'entrance')):
+            for row, col in cells:
+                if rows_slice.start <= row < rows_slice.stop and cols_slice.start <= col < cols_slice.stop:
+                    x, y = self._cell_origin(layout, row, col)
+                    center = (x + int(cell_size) // 2, y + int(cell_size) // 2)
+                    gfxdraw.filled_circle(self.surface, *center, radius, self.colors[marker])
+                    gfxdraw.aacircle(self.surface, *center, radius, self.colors['grid_line'])
+
+        if show_values and cell_size >= TEXT_MIN_CELL:
+            path_cells = set(final_path)
+            for row in range(rows_slice.start, rows_slice.stop):
+                for col in range(cols_slice.start, cols_slice.stop):
+                    value = g_values.get((row, col))
+                    if value is not None and value != float('inf') and (row, col) not in path_cells:
+                        x, y = self._cell_origin(layout, row, col)
+                        self.surface.blit(self.glyph(f"{value:g}"), (x + 5, y + 5))
@@ -0,0 +1,180 @@
+"""Cache of search results keyed by grid version / Cache de resultados de busca por versão da grade
+
+Results are stored per (grid version, start, end, heuristic, algorithm,
+connectivity, weight) with LRU eviction. Since GridMap.version changes on
+every edit, entries for an old map can never be served, and a repeated
+query on an unchanged map costs a dictionary lookup.
+Resultados ficam guardados por (versão da grade, início, fim, heurística,
+algoritmo, conectividade, peso) com remoção LRU. Como a versão muda a cada
+edição, entradas de um mapa antigo nunca são servidas.
+
+Any stretch of an optimal path is itself optimal, so a query whose start and
+end both lie on a cached optimal path (same grid version, heuristic and
+connectivity) is answered with that slice, walked backwards if needed. On
+weighted terrain moves are not symmetric, so slices are only taken forwards.
+Qualquer trecho de um caminho ótimo também é ótimo: uma consulta cujos
+início e fim estão num caminho ótimo em cache é respondida com esse trecho.
+
+    result = path_cache.find_path(grid, start, end, 'manhattan')
+    print(result.source, path_cache.hits, path_cache.misses)
+"""
+from collections import OrderedDict
+
+import pathfinding
+from pathfinding import SQRT2
+
+
+def is_exact(heuristic_type, connectivity=4, weight=1):
+    """Whether a search is guaranteed optimal / Se a busca é garantidamente ótima
+
+    Manhattan overestimates diagonal moves, so it is only admissible with
+    4-connectivity; any weight above 1 gives up optimality.
+    Manhattan superestima movimentos diagonais e só é admissível com
+    vizinhança 4; pesos acima de 1 abrem mão da otimalidade.
+    """
+    return weight == 1 and (connectivity == 4 or heuristic_type != 'manhattan')
+
+
+class CachedResult:
+    """Search outcome kept by the cache / Resultado de busca guardado pelo cache
+
+    Unlike SearchResult it holds no views over search buffers, only the
+    path and its statistics. `source` is 'search' for a fresh result,
+    'cache' for an exact hit, 'subpath' for a slice of a cached path and
+    'first_move' for a walk of a landmarks.FirstMoveTable.
+    Ao contrário do SearchResult não guarda visões dos buffers. `source` é
+    'search', 'cache', 'subpath' ou 'first_move'.
+    """
+    def __init__(self, path, cost, visited_count, pushes=0, jump_points=None, source='search'):
+        self.path = path  # Cells from start to end / Células do início ao fim
+        self.cost = cost  # Total path cost / Custo total do caminho
+        self.visited_count = visited_count  # Expansions of the original search / Expansões da busca original
+        self.pushes = pushes  # Open-set insertions of the original search / Inserções da busca original
+        self.jump_points = jump_points  # Jump points found by JPS / Pontos de salto do JPS
+        self.source = source  # Where the result came from / Origem do resultado
+
+    @property
+    def found(self):
+        """Whether a path was found / Se um caminho foi encontrado"""
+        return bool(self.path)
+
+    @property
+    def path_length(self):
+        """Number of steps in the path / Número de passos do caminho"""
+        return max(len(self.path) - 1, 0)
+
+
+class _Entry:
+    """Stored result with its path index / Resultado guardado com o índice do caminho"""
+    def __init__(self, result, optimal, grid):
+        self.result = result  # CachedResult as stored / CachedResult guardado
+        self.optimal = optimal  # Whether slices may be reused / Se trechos podem ser reutilizados
+        self.positions = {cell: step for step, cell in enumerate(result.path)} if optimal else {}
+        self.prefix_costs = _prefix_costs(result.path, grid) if optimal else []
+        self.symmetric = grid.costs is None  # Whether reversed slices are valid / Se trechos invertidos valem
+
+
+def _prefix_costs(path, grid):
+    """Cost from the first cell to each cell of a path / Custo da primeira célula a cada célula do caminho"""
+    costs = [0.0]
+    for (row_a, col_a), (row_b, col_b) in zip(path, path[1:]):
+        length = SQRT2 if row_a != row_b and col_a != col_b else 1
+        costs.append(costs[-1] + length * grid.get_cost(row_b, col_b))
+    return costs
+
+
+class PathCache:
+    """LRU cache of search results / Cache LRU de resultados de busca
+
+    Only GridMap inputs can be cached, since plain lists carry no version.
+    Só entradas GridMap podem ir para o cache, pois listas não têm versão.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries  # Result count limit / Limite de resultados
+        self.entries = OrderedDict()  # Query key -> _Entry / _Entry por chave de consulta
+        self.hits = 0  # Exact lookups served / Consultas exatas atendidas
+        self.subpath_hits = 0  # Lookups served by a path slice / Consultas atendidas por um trecho
+        self.misses = 0  # Lookups that needed a search / Consultas que exigiram busca
+
+    @staticmethod
+    def key(grid, start, end, heuristic_type, algorithm='astar', connectivity=4, weight=1):
+        """Cache key of a query / Chave de cache de uma consulta"""
+        if algorithm == 'jps':
+            connectivity = 8
+        return (grid.version, tuple(start), tuple(end), heuristic_type, algorithm, connectivity, weight)
+
+    def lookup(self, grid, start, end, heuristic_type, algorithm='astar', connectivity=4, weight=1):
+        """Cached result or None, counting hits and misses / Resultado em cache ou None, contando acertos e falhas"""
+        key = self.key(grid, start, end, heuristic_type, algorithm, connectivity, weight)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            stored = entry.result
+            return CachedResult(stored.path, stored.cost, stored.visited_count, stored.pushes,
+                                stored.jump_points, 'cache')
+
+        if is_exact(heuristic_type, key[5], weight):
+            result = self._slice(key)
+            if result is not None:
+                self.subpath_hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    def _slice(self, key):
+        """Answer from a cached optimal path through both ends / Responde com um caminho ótimo que passa pelos dois extremos"""
+        version, start, end, heuristic_type, _, connectivity, _ = key
+        for entry_key, entry in reversed(self.entries.items()):
+            if (not entry.optimal or entry_key[0] != version or entry_key[3] != heuristic_type
+                    or entry_key[5] != connectivity):
+                continue
+            first = entry.positions.get(start)
+            last = entry.positions.get(end)
+            if first is None or last is None or (first > last and not entry.symmetric):
+                continue
+            self.entries.move_to_end(entry_key)
+            path = entry.result.path
+            if first <= last:
+                cells = path[first:last + 1]
+            else:
+                cells = path[last:first + 1][::-1]
+            cost = abs(entry.prefix_costs[last] - entry.prefix_costs[first])
+            return CachedResult(cells, cost, 0, 0, None, 'subpath')
+        return None
+
+    def store(self, grid, start, end, heuristic_type, result, algorithm='astar', connectivity=4, weight=1):
+        """Keep a finished search and return it as a CachedResult / Guarda uma busca concluída e a retorna como CachedResult"""
+        key = self.key(grid, start, end, heuristic_type, algorithm, connectivity, weight)
+        cached = CachedResult(list(result.path), result.cost, result.visited_count,
+                              getattr(result, 'pushes', 0), getattr(result, 'jump_points', None))
+        self.entries[key] = _Entry(cached, result.found and is_exact(heuristic_type, key[5], weight), grid)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return cached
+
+    def find_path(self, grid, start, end, heuristic_type='euclidean', algorithm='astar', connectivity=4,
+                  weight=1, **options):
+        """pathfinding.find_path through the cache / pathfinding.find_path passando pelo cache
+
+        Extra keyword arguments (buffers, open_set, h_field, ...) go to
+        find_path on a miss; they must not change the answer.
+        Argumentos extras vão para find_path numa falha e não podem mudar
+        a resposta.
+        """
+        grid = pathfinding.as_grid_map(grid)
+        cached = self.lookup(grid, start, end, heuristic_type, algorithm, connectivity, weight)
+        if cached is not None:
+            return cached
+        result = pathfinding.find_path(grid, start, end, heuristic_type, algorithm=algorithm,
+                                       connectivity=connectivity, weight=weight, **options)
+        return self.store(grid, start, end, heuristic_type, result, algorithm, connectivity, weight)
+
+    def clear(self):
+        """Drop every cached result / Descarta todos os resultados"""
+        self.entries.clear()
+
+
+# Process-wide cache / Cache do processo
+path_cache = PathCache()
@@ -0,0 +1,174 @@
+"""Weighted-terrain search / Busca em terreno com pesos
+
+On a grid with `costs`, entering a cell costs its weight times the step
+length (1 straight, sqrt(2) diagonal); walls stay impassable and diagonals
+may not cut wall corners. Heuristics are scaled by the cheapest free cell,
+which keeps every geometric heuristic admissible: octile is the tightest
+for 8-connectivity, Manhattan for 4.
+Numa grade com `costs`, entrar numa célula custa seu peso vezes o
+comprimento do passo. As heurísticas são multiplicadas pelo menor custo de
+célula livre, o que as mantém admissíveis.
+
+Neighbor generation is precomputed: edge_table() builds, in one NumPy pass
+per direction, the cost of every move out of every cell (inf when blocked,
+out of bounds or cutting a corner). The inner loop then reads one float per
+direction instead of checking bounds, walls and corners. Tables are cached
+per grid and rebuilt when GridMap.version changes.
+A geração de vizinhos é pré-calculada: edge_table() monta, numa passada do
+NumPy por direção, o custo de cada movimento a partir de cada célula. As
+tabelas ficam em cache por grade e são refeitas quando a versão muda.
+
+    grid.set_cost(4, 7, 5.0)   # mud / lama
+    result = find_path(grid, start, end, 'octile', connectivity=8)
+"""
+import weakref
+
+import numpy as np
+
+from grid_map import WALL
+from pathfinding import (INF, ClosedSetView, GScoreView, MOVES_4, MOVES_8, SearchResult, calculate_heuristic,
+                         resolve_open_set, trace_path)
+
+_tables = weakref.WeakKeyDictionary()  # grid -> {connectivity: EdgeTable} / Tabelas por grade
+
+
+class EdgeTable:
+    """Precomputed move costs of a weighted grid / Custos de movimento pré-calculados de uma grade com pesos"""
+    def __init__(self, version, edges, min_cost, integer_costs):
+        self.version = version  # Grid version the table was built for / Versão da grade da tabela
+        self.edges = edges  # (flat delta, cost per source cell) per move / (delta plano, custo por célula) por movimento
+        self.min_cost = min_cost  # Cheapest free cell / Célula livre mais barata
+        self.integer_costs = integer_costs  # Whether every move cost is an integer / Se todo custo é inteiro
+
+
+def build_edge_table(grid, connectivity=4):
+    """Move costs out of every cell, computed with NumPy / Custos de saída de cada célula, calculados com NumPy"""
+    rows, cols = grid.rows, grid.cols
+    walls = np.frombuffer(grid.cells, np.uint8).reshape(rows, cols) == WALL
+    costs = np.frombuffer(grid.costs, np.float64).reshape(rows, cols)
+
+    edges = []
+    for d_row, d_col, length in (MOVES_8 if connectivity == 8 else MOVES_4):
+        # Sources whose target lies inside the grid / Origens cujo destino está dentro da grade
+        source = (slice(max(-d_row, 0), rows - max(d_row, 0)), slice(max(-d_col, 0), cols - max(d_col, 0)))
+        target = (slice(max(d_row, 0), rows + min(d_row, 0)), slice(max(d_col, 0), cols + min(d_col, 0)))
+        passable = ~walls[target]
+        if d_row and d_col:
+            beside_row = (source[0], target[1])
+            beside_col = (target[0], source[1])
+            passable &= ~walls[beside_row] & ~walls[beside_col]
+        step = np.full((rows, cols), INF)
+        step[source] = np.where(passable, length * costs[target], INF)
+        edges.append((d_row * cols + d_col, memoryview(step.ravel())))
+
+    free_costs = costs[~walls]
+    min_cost = float(free_costs.min()) if free_costs.size else 1.0
+    integer_costs = connectivity == 4 and bool(np.all(free_costs == np.floor(free_costs)))
+    return EdgeTable(grid.version, edges, min_cost, integer_costs)
+
+
+def edge_table(grid, connectivity=4):
+    """Cached edge table for the grid's current version / Tabela de arestas em cache para a versão atual"""
+    tables = _tables.setdefault(grid, {})
+    table = tables.get(connectivity)
+    if table is None or table.version != grid.version:
+        table = build_edge_table(grid, connectivity)
+        tables[connectivity] = table
+    return table
+
+
+def iter_terrain_search(grid, start, end, heuristic_type, buffers, open_set, connectivity, h_field, cost_bound,
+                        weight, instrument=None):
+    """A* over a weighted grid as a generator / A* sobre uma grade com pesos como gerador
+
+    Reached through pathfinding.iter_search() when the grid has `costs`;
+    yields and returns like the uniform-cost search.
+    Usado por pathfinding.iter_search() quando a grade tem `costs`.
+    """
+    table = edge_table(grid, connectivity)
+    edges, h_scale = table.edges, table.min_cost
+    cols = grid.cols
+
+    generation = buffers.begin(grid.size)
+    g, parent, seen, closed = buffers.g, buffers.parent, buffers.seen, buffers.closed
+    g_scores = GScoreView(buffers, generation, cols)
+    explored = ClosedSetView(buffers, generation, cols, 0)
+
+    start_index = start[0] * cols + start[1]
+    end_index = end[0] * cols + end[1]
+    bound = INF if cost_bound is None else cost_bound
+
+    g[start_index] = 0
+    parent[start_index] = -1
+    seen[start_index] = generation
+
+    integer_costs = table.integer_costs and h_scale == int(h_scale)
+    open_nodes = buffers.open_set(resolve_open_set(open_set, heuristic_type, connectivity, weight, integer_costs))
+    open_nodes.reset(generation)
+    heuristic = calculate_heuristic
+    if instrument is not None:
+        open_nodes = instrument.open_set(open_nodes, closed, generation)
+        heuristic = instrument.heuristic(calculate_heuristic)
+        edges = instrument.moves(edges)
+    if h_field is not None:
+        start_h = h_field[start_index] * h_scale * weight
+    else:
+        start_h = heuristic(start, end, heuristic_type) * h_scale * weight
+    open_nodes.push(start_index, start_h, start_h)
+    pop, push, decrease_key = open_nodes.pop, open_nodes.push, open_nodes.decrease_key
+    progress = (g_scores, explored)
+    closed_count = 0
+    found = False
+
+    while True:
+        current = pop()
+        if current < 0:
+            break
+
+        if current == end_index:
+            found = True
+            break
+
+        closed[current] = generation
+        closed_count += 1
+        explored.count = closed_count
+        yield progress
+
+        current_g = g[current]
+        for delta, move_costs in edges:
+            step_cost = move_costs[current]
+            if step_cost == INF:
+                continue
+            neighbor = current + delta
+            if closed[neighbor] == generation:
+                continue
+
+            tentative_g = current_g + step_cost
+            if seen[neighbor] != generation:
+                if h_field is not None:
+                    h_score = h_field[neighbor] * h_scale
+                else:
+                    h_score = heuristic(divmod(neighbor, cols), end, heuristic_type) * h_scale
+                if tentative_g + h_score > bound:
+                    continue
+                h_score *= weight
+                parent[neighbor] = current
+                g[neighbor] = tentative_g
+                seen[neighbor] = generation
+                push(neighbor, tentative_g + h_score, h_score)
+            elif tentative_g < g[neighbor]:
+                parent[neighbor] = current
+                g[neighbor] = tentative_g
+                if h_field is not None:
+                    h_score = h_field[neighbor] * h_scale
+                else:
+                    h_score = heuristic(divmod(neighbor, cols), end, heuristic_type) * h_scale
+                h_score *= weight
+                decrease_key(neighbor, tentative_g + h_score, h_score)
+
+    explored.count = closed_count
+    buffers.closed_count = closed_count
+    if not found:
+        return SearchResult([], INF, g_scores, explored, closed_count, open_nodes.pushes)
+    path = trace_path(parent, start_index, end_index, cols)
+    return SearchResult(path, g[end_index], g_scores, explored, closed_count, open_nodes.pushes)
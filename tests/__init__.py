@@ -0,0 +1,5 @@
+"""Tests of the search engine / Testes do motor de busca
+
+Run from the repository root with `python -m unittest discover tests` or
+`python -m pytest`. Execute na raiz do repositório.
+"""
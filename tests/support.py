@@ -0,0 +1,75 @@
+"""Random grids and a reference search for the tests / Grades aleatórias e uma busca de referência para os testes"""
+import heapq
+import math
+
+from grid_map import WALL, GridMap
+
+TERRAIN_COSTS = (1.0, 1.0, 2.0, 3.5, 5.0)  # Weights drawn for terrain cells / Pesos sorteados para o terreno
+
+
+def random_grid(rng, rows, cols, wall_ratio=0.25, weighted=False):
+    """Grid with random walls and, if `weighted`, random costs / Grade com paredes e custos aleatórios"""
+    grid = GridMap(rows, cols, bytearray(WALL if rng.random() < wall_ratio else 0 for _ in range(rows * cols)))
+    if weighted:
+        for row in range(rows):
+            for col in range(cols):
+                grid.set_cost(row, col, rng.choice(TERRAIN_COSTS))
+    return grid
+
+
+def random_query(rng, grid):
+    """Random (start, end) pair, both freed / Par (início, fim) aleatório, ambos liberados"""
+    start = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+    end = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+    grid.set(*start, 0)
+    grid.set(*end, 0)
+    return start, end
+
+
+def _moves(connectivity):
+    straight = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    diagonal = [(-1, -1), (-1, 1), (1, -1), (1, 1)] if connectivity == 8 else []
+    return straight + diagonal
+
+
+def step_cost(grid, cell_a, cell_b):
+    """Cost of one legal move, None if illegal / Custo de um movimento legal, None se ilegal"""
+    (row_a, col_a), (row_b, col_b) = cell_a, cell_b
+    d_row, d_col = row_b - row_a, col_b - col_a
+    if max(abs(d_row), abs(d_col)) != 1 or not grid.in_bounds(row_b, col_b) or grid.get(row_b, col_b) == WALL:
+        return None
+    if d_row and d_col and (grid.get(row_a, col_b) == WALL or grid.get(row_b, col_a) == WALL):
+        return None
+    return (math.sqrt(2) if d_row and d_col else 1.0) * grid.get_cost(row_b, col_b)
+
+
+def path_cost(grid, path, connectivity=8):
+    """Cost of a cell path, None if any move is illegal / Custo de um caminho, None se algum movimento for ilegal"""
+    total = 0.0
+    for cell_a, cell_b in zip(path, path[1:]):
+        if connectivity == 4 and cell_a[0] != cell_b[0] and cell_a[1] != cell_b[1]:
+            return None
+        cost = step_cost(grid, cell_a, cell_b)
+        if cost is None:
+            return None
+        total += cost
+    return total
+
+
+def reference_cost(grid, start, end, connectivity=4):
+    """Plain Dijkstra over the grid, inf if unreachable / Dijkstra simples sobre a grade, inf se inalcançável"""
+    distance = {start: 0.0}
+    queue = [(0.0, start)]
+    while queue:
+        cost, cell = heapq.heappop(queue)
+        if cell == end:
+            return cost
+        if cost > distance[cell]:
+            continue
+        for d_row, d_col in _moves(connectivity):
+            neighbor = (cell[0] + d_row, cell[1] + d_col)
+            move = step_cost(grid, cell, neighbor)
+            if move is not None and cost + move < distance.get(neighbor, math.inf):
+                distance[neighbor] = cost + move
+                heapq.heappush(queue, (cost + move, neighbor))
+    return math.inf
@@ -0,0 +1,110 @@
+"""Every algorithm against find_path on random grids / Cada algoritmo contra find_path em grades aleatórias"""
+import math
+import random
+import unittest
+
+from anytime import iter_anytime_search
+from batch import PathBatch
+from hpa import HierarchicalPlanner
+from incremental import DStarLite
+from pathfinding import SearchBuffers, find_path
+from tests.support import path_cost, random_grid, random_query, reference_cost
+
+TOLERANCE = 1e-9
+
+
+def cases(seed, count, weighted=False, max_side=24):
+    """(grid, start, end, connectivity, heuristic) tuples / Tuplas de casos de teste"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        grid = random_grid(rng, rng.randint(2, max_side), rng.randint(2, max_side), rng.uniform(0.1, 0.35),
+                           weighted)
+        start, end = random_query(rng, grid)
+        connectivity = rng.choice((4, 8))
+        yield grid, start, end, connectivity, 'octile' if connectivity == 8 else 'manhattan'
+
+
+class EquivalenceTest(unittest.TestCase):
+    def assert_same_cost(self, result, expected, grid, connectivity):
+        self.assertEqual(result.found, expected.found)
+        if expected.found:
+            self.assertAlmostEqual(result.cost, expected.cost, delta=TOLERANCE)
+            self.assertAlmostEqual(path_cost(grid, result.path, connectivity), result.cost, delta=TOLERANCE)
+
+    def test_find_path_matches_dijkstra(self):
+        for weighted in (False, True):
+            for grid, start, end, connectivity, heuristic in cases(1, 150, weighted):
+                result = find_path(grid, start, end, heuristic, connectivity=connectivity)
+                expected = reference_cost(grid, start, end, connectivity)
+                if math.isinf(expected):
+                    self.assertFalse(result.found)
+                else:
+                    self.assertAlmostEqual(result.cost, expected, delta=TOLERANCE)
+                    self.assertEqual(result.path[0], start)
+                    self.assertEqual(result.path[-1], end)
+
+    def test_jps(self):
+        for grid, start, end, _, _ in cases(2, 150):
+            expected = find_path(grid, start, end, 'octile', connectivity=8)
+            result = find_path(grid, start, end, 'octile', algorithm='jps')
+            self.assert_same_cost(result, expected, grid, 8)
+
+    def test_bidirectional(self):
+        buffers = SearchBuffers()
+        for weighted in (False, True):
+            for grid, start, end, connectivity, heuristic in cases(3, 150, weighted):
+                expected = find_path(grid, start, end, heuristic, connectivity=connectivity)
+                result = find_path(grid, start, end, heuristic, buffers=buffers, algorithm='bidirectional',
+                                   connectivity=connectivity)
+                self.assert_same_cost(result, expected, grid, connectivity)
+
+    def test_d_star_lite(self):
+        for weighted in (False, True):
+            for grid, start, end, connectivity, heuristic in cases(4, 100, weighted):
+                expected = find_path(grid, start, end, heuristic, connectivity=connectivity)
+                result = DStarLite(grid, start, end, heuristic, connectivity).compute_path()
+                self.assert_same_cost(result, expected, grid, connectivity)
+
+    def test_hpa_exact(self):
+        for weighted in (False, True):
+            for grid, start, end, connectivity, heuristic in cases(5, 100, weighted, max_side=30):
+                expected = find_path(grid, start, end, heuristic, connectivity=connectivity)
+                planner = HierarchicalPlanner(grid, 6, heuristic, connectivity, refinement='exact')
+                self.assert_same_cost(planner.find_path(start, end), expected, grid, connectivity)
+
+    def test_hpa_near_optimal_paths_are_valid(self):
+        for weighted in (False, True):
+            for grid, start, end, connectivity, heuristic in cases(6, 100, weighted, max_side=30):
+                expected = find_path(grid, start, end, heuristic, connectivity=connectivity)
+                result = HierarchicalPlanner(grid, 6, heuristic, connectivity, precompute=False).find_path(start, end)
+                self.assertEqual(result.found, expected.found)
+                if expected.found:
+                    self.assertAlmostEqual(path_cost(grid, result.path, connectivity), result.cost,
+                                           delta=TOLERANCE)
+                    self.assertGreaterEqual(result.cost, expected.cost - TOLERANCE)
+
+    def test_anytime_ends_optimal(self):
+        for weighted in (False, True):
+            for grid, start, end, connectivity, heuristic in cases(7, 100, weighted):
+                expected = find_path(grid, start, end, heuristic, connectivity=connectivity)
+                solutions = list(iter_anytime_search(grid, start, end, heuristic, connectivity=connectivity))
+                self.assertEqual(bool(solutions), expected.found)
+                for solution in solutions:
+                    self.assertLessEqual(solution.cost, solution.bound * expected.cost + TOLERANCE)
+                if solutions:
+                    self.assert_same_cost(solutions[-1], expected, grid, connectivity)
+
+    def test_batch(self):
+        for weighted in (False, True):
+            rng = random.Random(8)
+            grid = random_grid(rng, 30, 30, 0.25, weighted)
+            queries = [random_query(rng, grid) for _ in range(40)]
+            results = PathBatch(grid, queries, 'octile', workers=2, connectivity=8).run()
+            self.assertEqual([result.index for result in results], list(range(len(queries))))
+            for result, (start, end) in zip(results, queries):
+                expected = find_path(grid, start, end, 'octile', connectivity=8)
+                self.assert_same_cost(result, expected, grid, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""D* Lite repairs against full reruns / Reparos do D* Lite contra buscas do zero"""
+import random
+import unittest
+
+from grid_map import WALL
+from incremental import DStarLite
+from pathfinding import find_path
+from tests.support import TERRAIN_COSTS, path_cost, random_grid, random_query
+
+TOLERANCE = 1e-9
+
+
+class DStarLiteRepairTest(unittest.TestCase):
+    def check(self, planner, grid, start, end, connectivity, heuristic):
+        result = planner.compute_path()
+        expected = find_path(grid, start, end, heuristic, connectivity=connectivity)
+        self.assertEqual(result.found, expected.found)
+        if expected.found:
+            self.assertAlmostEqual(result.cost, expected.cost, delta=TOLERANCE)
+            self.assertAlmostEqual(path_cost(grid, result.path, connectivity), result.cost, delta=TOLERANCE)
+        return result
+
+    def test_repairs_match_reruns(self):
+        rng = random.Random(1)
+        for weighted in (False, True):
+            for _ in range(20):
+                grid = random_grid(rng, rng.randint(6, 20), rng.randint(6, 20), 0.2, weighted)
+                start, end = random_query(rng, grid)
+                connectivity = rng.choice((4, 8))
+                heuristic = 'octile' if connectivity == 8 else 'manhattan'
+                planner = DStarLite(grid, start, end, heuristic, connectivity)
+                self.check(planner, grid, start, end, connectivity, heuristic)
+                for _ in range(15):
+                    edits = set()
+                    for _ in range(rng.randint(1, 4)):
+                        cell = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+                        if cell in (start, end):
+                            continue
+                        if weighted and rng.random() < 0.5:
+                            grid.set_cost(*cell, rng.choice(TERRAIN_COSTS))
+                        else:
+                            grid.set(*cell, WALL - grid.get(*cell))
+                        edits.add(cell)
+                    planner.update_cells(edits)
+                    self.check(planner, grid, start, end, connectivity, heuristic)
+
+    def test_repair_does_less_work_than_a_rerun(self):
+        grid = random_grid(random.Random(2), 40, 40, 0.1)
+        start, end = (0, 0), (39, 39)
+        grid.set(*start, 0)
+        grid.set(*end, 0)
+        planner = DStarLite(grid, start, end, 'manhattan')
+        first = planner.compute_path()
+        grid.set(*first.path[len(first.path) // 2], WALL)
+        planner.update_cells([first.path[len(first.path) // 2]])
+        repaired = self.check(planner, grid, start, end, 4, 'manhattan')
+        self.assertLess(repaired.visited_count, first.visited_count)
+
+    def test_moving_start_and_goal(self):
+        rng = random.Random(3)
+        grid = random_grid(rng, 25, 25, 0.2)
+        start, end = random_query(rng, grid)
+        planner = DStarLite(grid, start, end, 'octile', 8)
+        for _ in range(10):
+            result = self.check(planner, grid, start, end, 8, 'octile')
+            if result.path_length > 1 and rng.random() < 0.7:
+                start = result.path[1]
+                planner.move_start(start)
+            else:
+                end = random_query(rng, grid)[1]
+                planner.set_goal(end)
+                planner.move_start(start)
+
+    def test_cancelled_repair_resumes(self):
+        grid = random_grid(random.Random(4), 30, 30, 0.2)
+        start, end = random_query(random.Random(5), grid)
+        planner = DStarLite(grid, start, end, 'manhattan')
+        steps = planner.iter_compute_path()
+        for _ in range(10):
+            if next(steps, None) is None:
+                break
+        steps.close()
+        self.check(planner, grid, start, end, 4, 'manhattan')
+
+
+if __name__ == '__main__':
+    unittest.main()
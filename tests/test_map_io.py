@@ -0,0 +1,74 @@
+"""Map files / Arquivos de mapa"""
+import os
+import random
+import struct
+import tempfile
+import unittest
+
+from grid_map import GridMap
+from map_io import GMAP_MAGIC, import_map, load_grid_map, save_grid_map
+from tests.support import random_grid
+
+
+class GridMapFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_round_trip_with_costs(self):
+        grid = random_grid(random.Random(1), 13, 7, weighted=True)
+        save_grid_map(grid, self.path('terrain.gmap'), (2, 3), (12, 6))
+        loaded, start, end = load_grid_map(self.path('terrain.gmap'))
+        self.assertEqual((loaded.rows, loaded.cols), (13, 7))
+        self.assertEqual(bytes(loaded.cells), bytes(grid.cells))
+        self.assertEqual(list(loaded.costs), list(grid.costs))
+        self.assertEqual((start, end), ((2, 3), (12, 6)))
+
+    def test_round_trip_without_costs(self):
+        grid = random_grid(random.Random(2), 5, 9)
+        save_grid_map(grid, self.path('plain.gmap'))
+        loaded, start, end = load_grid_map(self.path('plain.gmap'))
+        self.assertEqual(bytes(loaded.cells), bytes(grid.cells))
+        self.assertIsNone(loaded.costs)
+        self.assertEqual((start, end), (None, None))
+
+    def test_mapping_is_read_only_unless_writable(self):
+        save_grid_map(random_grid(random.Random(3), 4, 4, weighted=True), self.path('map.gmap'))
+        loaded, _, _ = load_grid_map(self.path('map.gmap'))
+        with self.assertRaises(TypeError):
+            loaded.cells[0] = 1
+        writable, _, _ = load_grid_map(self.path('map.gmap'), writable=True)
+        writable.set_cost(0, 0, 9.0)
+        reloaded, _, _ = load_grid_map(self.path('map.gmap'))
+        self.assertNotEqual(reloaded.get_cost(0, 0), 9.0)
+
+    def test_version_1_files_load(self):
+        grid = random_grid(random.Random(4), 3, 5)
+        with open(self.path('old.gmap'), 'wb') as handle:
+            handle.write(GMAP_MAGIC + struct.pack('<I6i', 1, 3, 5, 0, 0, 2, 4))
+            handle.write(grid.cells)
+        loaded, start, end = load_grid_map(self.path('old.gmap'))
+        self.assertEqual(bytes(loaded.cells), bytes(grid.cells))
+        self.assertEqual((start, end), ((0, 0), (2, 4)))
+
+    def test_endpoints_outside_the_map_are_rejected(self):
+        save_grid_map(GridMap(4, 4), self.path('bad.gmap'), (0, 0), (3, 7))
+        with self.assertRaises(ValueError):
+            load_grid_map(self.path('bad.gmap'))
+
+    def test_empty_maps_are_rejected(self):
+        with open(self.path('empty.txt'), 'w', encoding='utf-8'):
+            pass
+        with open(self.path('empty.map'), 'w', encoding='ascii') as handle:
+            handle.write("type octile\nheight 0\nwidth 4\nmap\n")
+        save_grid_map(GridMap(0, 3), self.path('empty.gmap'))
+        for name in ('empty.txt', 'empty.map', 'empty.gmap'):
+            with self.subTest(name=name), self.assertRaises(ValueError):
+                import_map(self.path(name))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Result cache and subpath slicing / Cache de resultados e trechos de caminhos"""
+import random
+import unittest
+
+from grid_map import GridMap
+from pathfinding import find_path
+from result_cache import PathCache
+from tests.support import path_cost, random_grid, random_query
+
+TOLERANCE = 1e-9
+
+
+class PathCacheTest(unittest.TestCase):
+    def test_exact_hit(self):
+        cache = PathCache()
+        grid = GridMap(10, 10)
+        first = cache.find_path(grid, (0, 0), (9, 9), 'manhattan')
+        second = cache.find_path(grid, (0, 0), (9, 9), 'manhattan')
+        self.assertEqual((first.source, second.source), ('search', 'cache'))
+        self.assertEqual(second.path, first.path)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_edit_invalidates(self):
+        cache = PathCache()
+        grid = GridMap(10, 10)
+        cache.find_path(grid, (0, 0), (9, 9), 'manhattan')
+        grid.set(5, 5, 1)
+        self.assertEqual(cache.find_path(grid, (0, 0), (9, 9), 'manhattan').source, 'search')
+
+    def test_subpath_slices_are_optimal(self):
+        rng = random.Random(1)
+        for weighted in (False, True):
+            for _ in range(60):
+                grid = random_grid(rng, rng.randint(5, 20), rng.randint(5, 20), 0.2, weighted)
+                start, end = random_query(rng, grid)
+                connectivity = rng.choice((4, 8))
+                heuristic = 'octile' if connectivity == 8 else 'manhattan'
+                cache = PathCache()
+                full = cache.find_path(grid, start, end, heuristic, connectivity=connectivity)
+                if full.path_length < 2:
+                    continue
+                first, last = sorted(rng.sample(range(len(full.path)), 2))
+                if rng.random() < 0.5:
+                    first, last = last, first
+                sliced = cache.lookup(grid, full.path[first], full.path[last], heuristic,
+                                      connectivity=connectivity)
+                if first > last and weighted:
+                    # Reversed slices are not valid on terrain / Trechos invertidos não valem com terreno
+                    self.assertIsNone(sliced)
+                    continue
+                self.assertIn(sliced.source, ('subpath', 'cache'))
+                self.assertEqual((sliced.path[0], sliced.path[-1]), (full.path[first], full.path[last]))
+                self.assertAlmostEqual(path_cost(grid, sliced.path, connectivity), sliced.cost, delta=TOLERANCE)
+                expected = find_path(grid, full.path[first], full.path[last], heuristic,
+                                     connectivity=connectivity)
+                self.assertAlmostEqual(sliced.cost, expected.cost, delta=TOLERANCE)
+
+    def test_no_slices_of_inexact_searches(self):
+        cache = PathCache()
+        grid = GridMap(10, 10)
+        full = cache.find_path(grid, (0, 0), (9, 9), 'octile', connectivity=8, weight=2)
+        self.assertIsNone(cache.lookup(grid, full.path[1], full.path[-2], 'octile', connectivity=8, weight=2))
+
+
+if __name__ == '__main__':
+    unittest.main()